@@ -22,9 +22,17 @@ fileConfig(config.config_file_name)
 
 from app.core.config import get_settings  # noqa
 from app.models import Base  # noqa
+from app.models.search import is_search_object  # noqa
 
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip the trigger-maintained search index, which the models do not declare."""
+    table_name = getattr(getattr(object, "table", None), "name", None)
+    return not is_search_object(name, type_, table_name)
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -59,6 +67,7 @@ def run_migrations_offline():
         literal_binds=True,
         compare_type=True,
         render_as_batch=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -86,6 +95,7 @@ def run_migrations_online():
             target_metadata=target_metadata,
             compare_type=True,
             render_as_batch=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
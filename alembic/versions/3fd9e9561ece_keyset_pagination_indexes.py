@@ -0,0 +1,70 @@
+"""keyset pagination indexes
+
+Revision ID: 3fd9e9561ece
+Revises: 28118591ef78
+Create Date: 2026-10-17 16:10:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3fd9e9561ece'
+down_revision: Union[str, None] = '28118591ef78'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('categories', schema=None) as batch_op:
+        batch_op.create_index('ix_categories_name_id', ['name', 'id'], unique=False)
+        batch_op.create_index('ix_categories_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('stocks', schema=None) as batch_op:
+        batch_op.create_index('ix_stocks_location_id', ['location', 'id'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_email_id', ['email', 'id'], unique=False)
+        batch_op.create_index('ix_users_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_orders_user_id_id', ['user_id', 'id'], unique=False)
+        batch_op.create_index(
+            'ix_orders_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False
+        )
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index('ix_products_name_id', ['name', 'id'], unique=False)
+        batch_op.create_index('ix_products_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('products_stock', schema=None) as batch_op:
+        batch_op.create_index('ix_products_stock_sale_price_id', ['sale_price', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('products_stock', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_stock_sale_price_id')
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_created_at_id')
+        batch_op.drop_index('ix_products_name_id')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_user_id_created_at_id')
+        batch_op.drop_index('ix_orders_user_id_id')
+        batch_op.drop_index('ix_orders_created_at_id')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_created_at_id')
+        batch_op.drop_index('ix_users_email_id')
+
+    with op.batch_alter_table('stocks', schema=None) as batch_op:
+        batch_op.drop_index('ix_stocks_location_id')
+
+    with op.batch_alter_table('categories', schema=None) as batch_op:
+        batch_op.drop_index('ix_categories_created_at_id')
+        batch_op.drop_index('ix_categories_name_id')
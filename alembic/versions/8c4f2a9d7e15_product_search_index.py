@@ -0,0 +1,130 @@
+"""product search index
+
+Revision ID: 8c4f2a9d7e15
+Revises: 61370848428a
+Create Date: 2026-10-17 18:02:41.630914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f2a9d7e15'
+down_revision: Union[str, None] = '61370848428a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The statements of app/models/search.py as of this revision, inlined so the
+# migration does not change when the model module does.
+POSTGRESQL_DDL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    """
+    CREATE OR REPLACE FUNCTION products_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(NEW.barcode, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(
+                (SELECT name FROM categories WHERE id = NEW.category_id), '')), 'B')
+            || setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$
+    """,
+    'DROP TRIGGER IF EXISTS products_search_vector ON products',
+    """
+    CREATE TRIGGER products_search_vector
+    BEFORE INSERT OR UPDATE OF name, barcode, description, category_id ON products
+    FOR EACH ROW EXECUTE FUNCTION products_search_vector()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION categories_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE products SET category_id = category_id WHERE category_id = NEW.id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    'DROP TRIGGER IF EXISTS categories_search_vector ON categories',
+    """
+    CREATE TRIGGER categories_search_vector
+    AFTER UPDATE OF name ON categories
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION categories_search_vector()
+    """,
+    'CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin (search_vector)',
+    'CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)',
+    'UPDATE products SET category_id = category_id WHERE search_vector IS NULL',
+)
+
+SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, barcode, category, description, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, name, barcode, category, description)
+        SELECT NEW.id, NEW.name, NEW.barcode,
+               (SELECT name FROM categories WHERE id = NEW.category_id), NEW.description;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_update
+    AFTER UPDATE OF name, barcode, description, category_id ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = OLD.id;
+        INSERT INTO products_fts (rowid, name, barcode, category, description)
+        SELECT NEW.id, NEW.name, NEW.barcode,
+               (SELECT name FROM categories WHERE id = NEW.category_id), NEW.description;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS categories_fts_update AFTER UPDATE OF name ON categories BEGIN
+        UPDATE products_fts SET category = NEW.name
+        WHERE rowid IN (SELECT id FROM products WHERE category_id = NEW.id);
+    END
+    """,
+    """
+    INSERT INTO products_fts (rowid, name, barcode, category, description)
+    SELECT p.id, p.name, p.barcode, c.name, p.description
+    FROM products AS p JOIN categories AS c ON c.id = p.category_id
+    WHERE p.id NOT IN (SELECT rowid FROM products_fts)
+    """,
+)
+
+
+SEARCH_DDL = {'postgresql': POSTGRESQL_DDL, 'sqlite': SQLITE_DDL}
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    for statement in SEARCH_DDL.get(connection.dialect.name, ()):
+        connection.exec_driver_sql(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS categories_search_vector ON categories')
+        op.execute('DROP FUNCTION IF EXISTS categories_search_vector()')
+        op.execute('DROP TRIGGER IF EXISTS products_search_vector ON products')
+        op.execute('DROP FUNCTION IF EXISTS products_search_vector()')
+        op.execute('DROP INDEX IF EXISTS ix_products_name_trgm')
+        op.execute('DROP INDEX IF EXISTS ix_products_search_vector')
+        op.execute('ALTER TABLE products DROP COLUMN IF EXISTS search_vector')
+    else:
+        op.execute('DROP TRIGGER IF EXISTS categories_fts_update')
+        op.execute('DROP TRIGGER IF EXISTS products_fts_delete')
+        op.execute('DROP TRIGGER IF EXISTS products_fts_update')
+        op.execute('DROP TRIGGER IF EXISTS products_fts_insert')
+        op.execute('DROP TABLE IF EXISTS products_fts')
@@ -0,0 +1,67 @@
+"""product availability summary
+
+Revision ID: b2d7e4c91a36
+Revises: 8c4f2a9d7e15
+Create Date: 2026-10-17 19:24:08.271553
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d7e4c91a36'
+down_revision: Union[str, None] = '8c4f2a9d7e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('product_availability',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('total_qty', sa.Integer(), nullable=False),
+    sa.Column('min_price', sa.Float(), nullable=True),
+    sa.Column('max_price', sa.Float(), nullable=True),
+    sa.Column('location_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    with op.batch_alter_table('product_availability', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_product_availability_category_id_min_price', ['category_id', 'min_price'], unique=False
+        )
+        batch_op.create_index('ix_product_availability_min_price', ['min_price'], unique=False)
+
+    with op.batch_alter_table('products_stock', schema=None) as batch_op:
+        batch_op.create_index('ix_products_stock_product_id_stock_id', ['product_id', 'stock_id'], unique=False)
+
+    # Fill the new table with the summary of every product. The table is empty,
+    # so the upsert of app/services/availability.py is a plain insert here.
+    op.get_bind().execute(
+        sa.text(
+            'INSERT INTO product_availability '
+            '(product_id, category_id, total_qty, min_price, max_price, location_count, updated_at) '
+            'SELECT products.id, products.category_id, coalesce(sum(products_stock.qty), 0), '
+            'min(products_stock.sale_price), max(products_stock.sale_price), count(products_stock.id), '
+            ':updated_at '
+            'FROM products LEFT OUTER JOIN products_stock ON products_stock.product_id = products.id '
+            'GROUP BY products.id, products.category_id'
+        ).bindparams(sa.bindparam('updated_at', datetime.utcnow(), type_=sa.DateTime()))
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('products_stock', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_stock_product_id_stock_id')
+
+    with op.batch_alter_table('product_availability', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_availability_min_price')
+        batch_op.drop_index('ix_product_availability_category_id_min_price')
+
+    op.drop_table('product_availability')
@@ -0,0 +1,74 @@
+"""daily sales rollups
+
+Revision ID: d41a6f0c8e27
+Revises: b2d7e4c91a36
+Create Date: 2026-10-17 20:11:37.905214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a6f0c8e27'
+down_revision: Union[str, None] = 'b2d7e4c91a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sales_daily_categories',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.PrimaryKeyConstraint('day', 'category_id')
+    )
+    op.create_table('sales_daily_products',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    with op.batch_alter_table('sales_daily_products', schema=None) as batch_op:
+        batch_op.create_index('ix_sales_daily_products_product_id_day', ['product_id', 'day'], unique=False)
+
+    # Fill both rollups from the orders placed so far, leaving cancelled ones
+    # out, as app/services/sales.py recomputes them at this revision.
+    op.execute(
+        'INSERT INTO sales_daily_products (day, product_id, category_id, units, revenue, order_count) '
+        'SELECT date(orders.created_at), order_items.product_id, products.category_id, '
+        'sum(order_items.quantity), sum(order_items.quantity * order_items.price_at_order), '
+        'count(DISTINCT orders.id) '
+        'FROM order_items JOIN orders ON orders.id = order_items.order_id '
+        'JOIN products ON products.id = order_items.product_id '
+        "WHERE orders.status != 'CANCELLED' "
+        'GROUP BY date(orders.created_at), order_items.product_id, products.category_id'
+    )
+    op.execute(
+        'INSERT INTO sales_daily_categories (day, category_id, units, revenue, order_count) '
+        'SELECT date(orders.created_at), products.category_id, '
+        'sum(order_items.quantity), sum(order_items.quantity * order_items.price_at_order), '
+        'count(DISTINCT orders.id) '
+        'FROM order_items JOIN orders ON orders.id = order_items.order_id '
+        'JOIN products ON products.id = order_items.product_id '
+        "WHERE orders.status != 'CANCELLED' "
+        'GROUP BY date(orders.created_at), products.category_id'
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sales_daily_products', schema=None) as batch_op:
+        batch_op.drop_index('ix_sales_daily_products_product_id_day')
+
+    op.drop_table('sales_daily_products')
+    op.drop_table('sales_daily_categories')
@@ -0,0 +1,42 @@
+"""order item category
+
+Revision ID: e5b9a3c07f14
+Revises: d41a6f0c8e27
+Create Date: 2026-10-17 21:04:52.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b9a3c07f14'
+down_revision: Union[str, None] = 'd41a6f0c8e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+
+    # Existing lines take their product's current category, the one the
+    # rollups were built with.
+    op.execute(
+        'UPDATE order_items SET category_id = '
+        '(SELECT products.category_id FROM products WHERE products.id = order_items.product_id)'
+    )
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.alter_column('category_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_order_items_category_id_categories', 'categories', ['category_id'], ['id']
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_order_items_category_id_categories', type_='foreignkey')
+        batch_op.drop_column('category_id')
@@ -1,3 +1,4 @@
+import copy
 from abc import abstractmethod
 from typing import Any
 
@@ -22,7 +23,16 @@ class FinalResponse(BaseModel):
 
 
 class BaseResource(Resource):
-    # add more things here later on...
+    """Base of the legacy API resources.
+
+    ``fastapi_restful`` registers a single instance of each resource, shared by
+    every request the worker serves. The pipeline (``run_preprocess``,
+    ``process_flow``, ``run_postprocess``) never runs on that instance: each
+    request gets its own copy from :meth:`_request_context`, so state stored on
+    ``self`` while serving it (``self.db``, ``self.request_data``,
+    ``self.response_data``, ...) is invisible to overlapping requests.
+    Class attributes stay shared; don't mutate them in place.
+    """
 
     request_schema = None
     response_schema = None
@@ -78,7 +88,15 @@ class BaseResource(Resource):
         self.response_message = ""
         self.early_response = False
 
+    def _request_context(self) -> "BaseResource":
+        """Return a fresh copy of the registered instance for one request."""
+        return copy.copy(self)
+
     async def _process_request(self, request: Request, db: AsyncSession):
+        # Run the pipeline on a per-request copy, never on the shared instance
+        return await self._request_context()._handle_request(request, db)
+
+    async def _handle_request(self, request: Request, db: AsyncSession):
         # Set pre request vars
         await self._base_req_params(request, db)
         await self.set_pre_request_vars()
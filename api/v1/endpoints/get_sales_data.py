@@ -1,10 +1,96 @@
+from decimal import Decimal
+
+import numpy as np
 import pandas as pd
 from fastapi import status
-from collections import defaultdict
 
 import crud
 from api.base_resource import GetResource
-from ..schemas.get_sales_data import GetSalesDataRequest, GetSalesDataResponse
+from ..schemas.get_sales_data import (
+    Buckets,
+    GetSalesDataRequest,
+    GetSalesDataResponse,
+)
+
+BUCKET_FREQUENCIES = {
+    Buckets.daily: "D",
+    Buckets.weekly: "W",
+    Buckets.monthly: "M",
+    Buckets.yearly: "Y",
+}
+
+# (metric key, columns the sales are grouped by)
+BREAKDOWNS = (
+    ("categories", ["category_id", "category_name"]),
+    ("products", ["product_id", "product_name"]),
+)
+
+
+def sales_frame(rows) -> pd.DataFrame:
+    """
+    Columns of the ``crud.sale.get_sales_data`` or ``get_sales_aggregates``
+    rows, plus ``revenue_cents``.
+
+    Revenue is summed in integer cents so the totals stay exact ``Decimal``
+    amounts once converted back.
+    """
+    if not rows:
+        return pd.DataFrame(
+            {"created_at": pd.Series(dtype="datetime64[ns]"), "revenue_cents": []}
+        )
+    frame = pd.DataFrame(rows, columns=list(rows[0]._fields))
+    if "revenue" in frame:
+        cents = np.rint(frame["revenue"].astype(float).to_numpy() * 100)
+        frame["revenue_cents"] = cents.astype(np.int64)
+    else:
+        cents = np.rint(frame["price_per_unit"].astype(float).to_numpy() * 100)
+        frame["revenue_cents"] = frame["quantity"].to_numpy() * cents.astype(np.int64)
+    return frame
+
+
+def empty_metrics() -> dict:
+    return {
+        "sales": list(),
+        "total_revenue": 0,
+        "revenue_by_categories": dict(),
+        "revenue_by_products": dict(),
+        "quantity_by_categories": dict(),
+        "quantity_by_products": dict(),
+    }
+
+
+def _amount(cents) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def aggregate_sales(frame: pd.DataFrame, bucket: np.ndarray, size: int) -> list[dict]:
+    """
+    Metrics of ``size`` buckets, ``bucket`` holding the bucket index of each
+    sale of ``frame`` (-1 for none). The ``sales`` lists are left empty.
+
+    Keys of the breakdowns keep the order in which they first appear in the
+    sales, as the former per sale loop produced them.
+    """
+    metrics = [empty_metrics() for _ in range(size)]
+    frame = frame.assign(bucket=bucket)
+    frame = frame[frame["bucket"] >= 0]
+    if frame.empty:
+        return metrics
+
+    totals = frame.groupby("bucket", sort=False)["revenue_cents"].sum()
+    for index, cents in totals.items():
+        metrics[index]["total_revenue"] = _amount(cents)
+
+    for name, columns in BREAKDOWNS:
+        grouped = frame.groupby(["bucket", *columns], sort=False)[
+            ["revenue_cents", "quantity"]
+        ].sum()
+        revenue = grouped["revenue_cents"].to_numpy()
+        quantity = grouped["quantity"].to_numpy()
+        for (index, key, label), cents, units in zip(grouped.index, revenue, quantity):
+            metrics[index][f"revenue_by_{name}"][(int(key), label)] = _amount(cents)
+            metrics[index][f"quantity_by_{name}"][(int(key), label)] = int(units)
+    return metrics
 
 
 class GetSalesData(GetResource):
@@ -16,118 +102,67 @@ class GetSalesData(GetResource):
     api_url = "get_sales_data"
 
     async def get_sales_data(self):
-        self.sales = await crud.sale.get_sales_data(
-            self.db,
+        filters = dict(
             start_date=self.request_data.start_date,
             end_date=self.request_data.end_date,
             product_ids=self.request_data.product_ids,
             category_ids=self.request_data.category_ids,
         )
-        self.sales = [s._asdict() for s in self.sales]
-        for sale in self.sales:
-            sale["revenue"] = sale["quantity"] * sale["price_per_unit"]
+        if self.request_data.include_sales_items:
+            rows = await crud.sale.get_sales_data(self.db, **filters)
+        else:
+            # Without the sales in the response, the database sums them per
+            # bucket and product and only those rows are fetched
+            rows = await crud.sale.get_sales_aggregates(
+                self.db, bucket=self.request_data.buckets, **filters
+            )
+        await self.load_sales(rows)
+
+    async def load_sales(self, rows):
+        # Columnar copy of the rows for the aggregations; the per sale dicts are
+        # only built when they are part of the response
+        self.sales_frame = sales_frame(rows)
+        self.sales = []
+        if self.request_data.include_sales_items:
+            self.sales = [s._asdict() for s in rows]
+            for sale in self.sales:
+                sale["revenue"] = sale["quantity"] * sale["price_per_unit"]
 
     async def create_buckets(self):
         # Buckets can be daily, weekly, monthly and yearly
         # Given start and end date construct possible buckets
-        self.buckets = {}
-
-        match (self.request_data.buckets):
-            case "weekly":
-                buckets = pd.DataFrame(
-                    pd.period_range(
-                        start=self.request_data.start_date,
-                        end=self.request_data.end_date,
-                        freq="W",
-                    )
-                )
-            case "monthly":
-                buckets = pd.DataFrame(
-                    pd.period_range(
-                        start=self.request_data.start_date,
-                        end=self.request_data.end_date,
-                        freq="M",
-                    )
-                )
-            case "yearly":
-                buckets = pd.DataFrame(
-                    pd.period_range(
-                        start=self.request_data.start_date,
-                        end=self.request_data.end_date,
-                        freq="Y",
-                    )
-                )
-            case _:
-                buckets = pd.DataFrame(
-                    pd.period_range(
-                        start=self.request_data.start_date,
-                        end=self.request_data.end_date,
-                        freq="D",
-                    )
-                )
-
-        for bucket in buckets[0]:
-            self.buckets[
-                (
-                    bucket.start_time,
-                    bucket.end_time,
-                )
-            ] = {
-                "sales": list(),
-                "total_revenue": 0,
-                "revenue_by_categories": defaultdict(lambda: 0),
-                "revenue_by_products": defaultdict(lambda: 0),
-                "quantity_by_categories": defaultdict(lambda: 0),
-                "quantity_by_products": defaultdict(lambda: 0),
-            }
+        self.periods = pd.period_range(
+            start=self.request_data.start_date,
+            end=self.request_data.end_date,
+            freq=BUCKET_FREQUENCIES.get(self.request_data.buckets, "D"),
+        )
+        self.buckets = {
+            bucket: empty_metrics()
+            for bucket in zip(self.periods.start_time, self.periods.end_time)
+        }
 
     async def populate_buckets(self):
-        for sale in self.sales:
-            for bucket in self.buckets:
-                if sale["created_at"] >= bucket[0] and sale["created_at"] <= bucket[1]:
-                    if self.request_data.include_sales_items:
-                        self.buckets[bucket]["sales"].append(sale)
-                    self.buckets[bucket]["total_revenue"] += sale["revenue"]
-                    self.buckets[bucket]["revenue_by_categories"][
-                        (sale["category_id"], sale["category_name"])
-                    ] += sale["revenue"]
-                    self.buckets[bucket]["revenue_by_products"][
-                        (sale["product_id"], sale["product_name"])
-                    ] += sale["revenue"]
-                    self.buckets[bucket]["quantity_by_categories"][
-                        (sale["category_id"], sale["category_name"])
-                    ] += sale["quantity"]
-                    self.buckets[bucket]["quantity_by_products"][
-                        (sale["product_id"], sale["product_name"])
-                    ] += sale["quantity"]
-                    break
+        # Index of the bucket each sale falls in, -1 for none: the last bucket
+        # starting at or before the sale, if the sale is not past its end
+        starts = self.periods.start_time.to_numpy()
+        ends = self.periods.end_time.to_numpy()
+        created_at = self.sales_frame["created_at"].to_numpy(dtype="datetime64[ns]")
+        bucket = np.searchsorted(starts, created_at, side="right") - 1
+        inside = bucket >= 0
+        inside[inside] = created_at[inside] <= ends[bucket[inside]]
+        bucket = np.where(inside, bucket, -1)
+
+        metrics = aggregate_sales(self.sales_frame, bucket, len(self.periods))
+        for sale, index in zip(self.sales, bucket):
+            if index >= 0:
+                metrics[index]["sales"].append(sale)
+        self.buckets = dict(zip(self.buckets, metrics))
 
     async def populate_metrics(self):
         # Metrics without the buckets headache
-        self.buckets = {
-            "sales": list(),
-            "total_revenue": 0,
-            "revenue_by_categories": defaultdict(lambda: 0),
-            "revenue_by_products": defaultdict(lambda: 0),
-            "quantity_by_categories": defaultdict(lambda: 0),
-            "quantity_by_products": defaultdict(lambda: 0),
-        }
-        if self.request_data.include_sales_items:
-            self.buckets["sales"] = self.sales
-        for sale in self.sales:
-            self.buckets["total_revenue"] += sale["revenue"]
-            self.buckets["revenue_by_categories"][
-                (sale["category_id"], sale["category_name"])
-            ] += sale["revenue"]
-            self.buckets["revenue_by_products"][
-                (sale["product_id"], sale["product_name"])
-            ] += sale["revenue"]
-            self.buckets["quantity_by_categories"][
-                (sale["category_id"], sale["category_name"])
-            ] += sale["quantity"]
-            self.buckets["quantity_by_products"][
-                (sale["product_id"], sale["product_name"])
-            ] += sale["quantity"]
+        bucket = np.zeros(len(self.sales_frame), dtype=np.int64)
+        self.buckets = aggregate_sales(self.sales_frame, bucket, 1)[0]
+        self.buckets["sales"] = self.sales
 
     async def generate_response(self):
         self.status_code = status.HTTP_200_OK
@@ -3,7 +3,7 @@ from fastapi import status
 import crud
 from models.user import User
 from api.base_resource import PostResource
-from core.security import verify_password, create_jwt_token
+from core.security import verify_and_update_password, create_jwt_token
 from ..schemas.login_user import UserLoginRequest, UserLoginResponse
 
 
@@ -27,7 +27,7 @@ class LoginUser(PostResource):
             self.response_data = {}
 
     async def verify_password(self):
-        password_check = verify_password(
+        password_check, self.new_password_hash = await verify_and_update_password(
             self.request_data.password, self.user.hashed_password
         )
         if not password_check:
@@ -36,6 +36,13 @@ class LoginUser(PostResource):
             self.response_message = "User with specified credentials does not exists."
             self.response_data = {}
 
+    async def rehash_password(self):
+        # The stored hash was made with outdated Argon2 parameters
+        if self.new_password_hash:
+            await crud.user.update_password_hash(
+                self.db, db_obj=self.user, hashed_password=self.new_password_hash
+            )
+
     async def generate_access_token(self):
         payload = {
             "user_id": self.user.id,
@@ -64,6 +71,9 @@ class LoginUser(PostResource):
         if self.early_response:
             return
 
+        # Upgrade outdated password hashes
+        await self.rehash_password()
+
         # Process login flow
         await self.generate_access_token()
         await self.touch_last_login()
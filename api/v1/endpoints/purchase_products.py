@@ -2,7 +2,6 @@ from fastapi import status
 from starlette_context import context
 
 import crud
-from models.product import Product
 from api.base_resource import PostResource
 from crud.schemas import SaleCreate, SaleItemCreate
 from ..schemas.purchase_products import (
@@ -25,62 +24,52 @@ class PurchaseProducts(PostResource):
         self.failed_purchases = []
         self.successful_purchases = []
 
+    async def load_basket(self):
+        # Lock the requested products, then their non-empty lots, always in the
+        # same order so concurrent baskets queue up instead of deadlocking or
+        # overselling a lot. The locks are held until create_sales_data commits.
+        product_ids = sorted({item.product_id for item in self.request_data.items})
+        products = await crud.product.get_active_for_update(self.db, ids=product_ids)
+        self.products = {product.id: product for product in products}
+        self.inventories = {product_id: [] for product_id in self.products}
+        if self.products:
+            lots = await crud.inventory.get_available_for_update(
+                self.db, product_ids=list(self.products)
+            )
+            for lot in lots:
+                self.inventories[lot.product_id].append(lot)
+
     async def purchase_product(self, item: Item):
         # Important
         # This should ideally happen in a queue orchestrated by a task manager like Celery
         # to ensure that the inventory is updated only after the payment is successful
         # but for the sake of simplicity, we are doing it here
 
-        # Get Product Information
-        product = await crud.product.get_active(self.db, id=item.product_id)
+        product = self.products.get(item.product_id)
         if not product:
             self.failed_purchases.append(item)
             return
 
-        # Get Product Inventory Information
-        inventories = await crud.inventory.get_by_product_id(
-            self.db, product_id=item.product_id
-        )
-        if not inventories:
-            self.failed_purchases.append(item)
-            return
-
-        # Ensure sum of inventory quantity is greater than or equal to requested quantity
-        total_quantity = sum([x.quantity for x in inventories])
+        # Lots are loaded oldest first; earlier lines of the basket may have
+        # emptied some of them already
+        inventories = self.inventories[item.product_id]
+        total_quantity = sum(x.quantity for x in inventories)
         if total_quantity < item.quantity:
             self.failed_purchases.append(item)
             return
 
-        # Sort it by oldest inventories first
-        inventories = sorted(inventories, key=lambda x: x.created_at)
-
-        modified_inventories = []
-
-        # Deplete Inventory
+        # Deplete Inventory, FIFO
         left_quantity = item.quantity
         for inventory in inventories:
-            if inventory.quantity >= left_quantity:
-                inventory.quantity -= left_quantity
-                left_quantity = 0
-                modified_inventories.append(inventory)
+            if not left_quantity:
                 break
-            else:
-                left_quantity -= inventory.quantity
-                inventory.quantity = 0
-                modified_inventories.append(inventory)
-
-        if modified_inventories:
-            await crud.inventory.bulk_update(self.db, db_objs=modified_inventories)
-            # Update Product
-            await crud.product.update(
-                self.db,
-                db_obj=product,
-                obj_in={"quantity": product.quantity - item.quantity},
-            )
+            taken = min(inventory.quantity, left_quantity)
+            inventory.quantity -= taken
+            left_quantity -= taken
+        product.quantity -= item.quantity
 
         # Create Sale Item object
         sale_item = SaleItemCreate(
-            sale_id=0,  # to be populated later
             product_id=item.product_id,
             quantity=item.quantity,
             price_per_unit=product.price,
@@ -89,24 +78,20 @@ class PurchaseProducts(PostResource):
         self.successful_purchases.append(sale_item)
 
     async def purchase_products(self):
+        await self.load_basket()
         for item in self.request_data.items:
             await self.purchase_product(item)
 
     async def create_sales_data(self):
-        self.sale = SaleCreate(
+        # The lot and product changes above are written by this single commit
+        sale = SaleCreate(
             user_id=context.data["user"]["id"],
             total_amount=sum(
                 [x.quantity * x.price_per_unit for x in self.successful_purchases]
             ),
         )
-        self.sale = await crud.sale.create(self.db, obj_in=self.sale)
-
-        # Update Sale Item with sale_id
-        for sale_item in self.successful_purchases:
-            sale_item.sale_id = self.sale.id
-
-        self.successful_purchases = await crud.sale_item.bulk_create(
-            self.db, objs_in=self.successful_purchases
+        self.sale, self.successful_purchases = await crud.sale.create_with_items(
+            self.db, obj_in=sale, items_in=self.successful_purchases
         )
 
     async def generate_response(self):
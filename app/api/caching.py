@@ -0,0 +1,74 @@
+"""ETag and ``If-None-Match`` handling for cached catalogue reads."""
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+from app.core.catalogue_cache import catalogue_cache
+
+# Clients may keep the body but must revalidate it before every reuse.
+CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+@dataclass(frozen=True)
+class CatalogueLookup:
+    """Outcome of checking the catalogue cache before running a query.
+
+    ``response`` is set when the request can be answered without the
+    database, either with 304 or with a cached body. Otherwise the endpoint
+    loads the data and hands the result to :meth:`respond`.
+    """
+
+    etag: str | None
+    response: Response | None = None
+
+    def respond(self, payload: BaseModel) -> Response | BaseModel:
+        """Cache ``payload`` under the looked up ETag and return it."""
+
+        if self.etag is None:
+            return payload
+        body = payload.model_dump_json().encode()
+        catalogue_cache.set_body(self.etag, body)
+        return _json(body, self.etag)
+
+
+def _json(body: bytes, etag: str) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def catalogue_lookup(request: Request, key: str, scopes: Sequence[str]) -> CatalogueLookup:
+    """Answer a catalogue read from its ETag or cached body when possible.
+
+    ``key`` identifies the response (resource and query parameters) and
+    ``scopes`` lists the version counters it depends on.
+    """
+
+    etag = catalogue_cache.etag(key, scopes)
+    if etag is None:
+        return CatalogueLookup(etag=None)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        catalogue_cache.record_not_modified()
+        return CatalogueLookup(
+            etag=etag,
+            response=Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+            ),
+        )
+    body = catalogue_cache.get_body(etag)
+    if body is not None:
+        return CatalogueLookup(etag=etag, response=_json(body, etag))
+    return CatalogueLookup(etag=etag)
@@ -1,22 +1,20 @@
 """Reusable FastAPI dependencies."""
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 
+from app.core.principals import Principal, principal_cache
 from app.core.security import verify_token
-from app.db.session import get_db
+from app.core.timing import timed_auth
+from app.db.session import read_async_session, read_session
 from app.models import User, UserRoleEnum
 
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials=Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """Return the currently authenticated user based on the JWT token."""
+def _token_subject(token: str) -> str:
+    """Return the email stored in the ``sub`` claim of a valid token."""
 
-    token = credentials.credentials
     try:
         payload = verify_token(token)
     except ValueError as exc:
@@ -32,21 +30,76 @@ def get_current_user(
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = db.query(User).filter(User.email == email).first()
+    return email
+
+
+def _remember(email: str, user: User | None) -> Principal:
+    """Cache the principal resolved for ``email``; unknown users are not cached."""
+
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    if not user.is_active:
+    principal = Principal.from_user(user)
+    principal_cache.set(email, principal)
+    return principal
+
+
+def _ensure_active(principal: Principal) -> Principal:
+    """Reject deactivated users."""
+
+    if not principal.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is inactive")
-    return user
+    return principal
 
 
-def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
-    """Ensure that the current user has administrative privileges."""
+def _ensure_admin(principal: Principal) -> Principal:
+    """Reject users without administrative privileges."""
 
-    if current_user.role != UserRoleEnum.ADMIN:
+    if principal.role != UserRoleEnum.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
-    return current_user
+    return principal
+
+
+async def get_current_user(request: Request, credentials=Depends(security)) -> Principal:
+    """Return the currently authenticated user based on the JWT token.
+
+    The principal is served from :data:`principal_cache` when possible; a
+    database session is only opened on a cache miss, on a replica when the
+    request is routed to one.
+    """
+
+    with timed_auth():
+        email = _token_subject(credentials.credentials)
+        principal = principal_cache.get(email)
+        if principal is None:
+            async with read_async_session(request) as db:
+                result = await db.execute(select(User).where(User.email == email))
+                principal = _remember(email, result.scalars().first())
+        return _ensure_active(principal)
+
+
+async def get_current_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
+    """Ensure that the current user has administrative privileges."""
+
+    return _ensure_admin(current_user)
+
+
+def get_current_user_sync(request: Request, credentials=Depends(security)) -> Principal:
+    """Sync counterpart of :func:`get_current_user` used by the threadpool routers."""
+
+    with timed_auth():
+        email = _token_subject(credentials.credentials)
+        principal = principal_cache.get(email)
+        if principal is None:
+            with read_session(request) as db:
+                principal = _remember(email, db.query(User).filter(User.email == email).first())
+        return _ensure_active(principal)
+
+
+def get_current_admin_sync(current_user: Principal = Depends(get_current_user_sync)) -> Principal:
+    """Sync counterpart of :func:`get_current_admin` used by the threadpool routers."""
+
+    return _ensure_admin(current_user)
@@ -0,0 +1,154 @@
+"""Keyset (seek) pagination helpers for list endpoints.
+
+Pages are addressed by the sort key and id of the last row that was returned
+rather than by an offset, so the database can seek straight to the next page
+through an index on ``(sort_key, id)``. Latency therefore stays flat no matter
+how deep a client pages.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from collections.abc import Mapping
+from typing import Any, Sequence
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, tuple_
+
+from app.schemas.pagination import SortOrder
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+@dataclass(frozen=True)
+class PageParams:
+    """Cursor and page size requested by the client."""
+
+    cursor: str | None
+    limit: int
+
+
+def page_params(
+    cursor: str | None = Query(default=None, description="Opaque cursor returned as next_cursor"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> PageParams:
+    """FastAPI dependency collecting the pagination query parameters."""
+
+    return PageParams(cursor=cursor, limit=limit)
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_cursor(order_by: str, order: SortOrder, values: Sequence[Any]) -> str:
+    """Serialise the position of the last returned row into an opaque token."""
+
+    payload = {
+        "k": order_by,
+        "o": order.value,
+        "v": [value.isoformat() if isinstance(value, datetime) else value for value in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: str, order: SortOrder) -> list[Any]:
+    """Return the raw key values stored in ``cursor``.
+
+    Cursors are bound to the ordering they were produced for, so reusing one
+    with a different ``order_by``/``order`` is rejected instead of silently
+    skipping rows.
+    """
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        key, direction, values = payload["k"], payload["o"], payload["v"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise _invalid_cursor() from exc
+    if key != order_by or direction != order.value or not isinstance(values, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match the requested ordering",
+        )
+    return values
+
+
+def _coerce(column, value: Any) -> Any:
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:  # pragma: no cover - custom column types
+        return value
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        return python_type(value)
+    except (TypeError, ValueError) as exc:
+        raise _invalid_cursor() from exc
+
+
+def _key_columns(model, order_by: Enum | str) -> list:
+    name = order_by.value if isinstance(order_by, Enum) else order_by
+    if name == "id":
+        return [model.id]
+    return [getattr(model, name), model.id]
+
+
+def paginate(
+    stmt: Select,
+    model,
+    params: PageParams,
+    order_by: Enum | str = "id",
+    order: SortOrder = SortOrder.ASC,
+) -> Select:
+    """Apply keyset ordering, the seek predicate and the page limit to ``stmt``.
+
+    The statement is ordered by ``(order_by, id)`` so ties on the sort key are
+    broken deterministically. One extra row is fetched to find out whether a
+    further page exists; :func:`build_page` trims it again.
+    """
+
+    columns = _key_columns(model, order_by)
+    key_name = columns[0].key
+    descending = order == SortOrder.DESC
+    if params.cursor is not None:
+        raw_values = decode_cursor(params.cursor, key_name, order)
+        if len(raw_values) != len(columns):
+            raise _invalid_cursor()
+        values = [_coerce(column, value) for column, value in zip(columns, raw_values)]
+        if len(columns) == 1:
+            left, right = columns[0], values[0]
+        else:
+            left, right = tuple_(*columns), tuple_(*values)
+        stmt = stmt.where(left < right if descending else left > right)
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    return stmt.order_by(*ordering).limit(params.limit + 1)
+
+
+def build_page(
+    rows: Sequence[Any],
+    model,
+    params: PageParams,
+    order_by: Enum | str = "id",
+    order: SortOrder = SortOrder.ASC,
+) -> dict[str, Any]:
+    """Turn the rows fetched by a :func:`paginate` statement into a page payload.
+
+    Rows may be ORM objects, ``Row`` tuples or plain mappings.
+    """
+
+    items = list(rows[: params.limit])
+    next_cursor = None
+    if len(rows) > params.limit and items:
+        columns = _key_columns(model, order_by)
+        last = items[-1]
+        if isinstance(last, Mapping):
+            values = [last[column.key] for column in columns]
+        else:
+            values = [getattr(last, column.key) for column in columns]
+        next_cursor = encode_cursor(columns[0].key, order, values)
+    return {"items": items, "next_cursor": next_cursor}
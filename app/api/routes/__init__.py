@@ -1,7 +1,13 @@
 """Exports API routers for easy inclusion in the application."""
 from fastapi import APIRouter
 
-from app.api.routes import auth, categories, orders, products, stocks, users
+from app.api.routes import auth
+from app.core.config import get_settings
+
+if get_settings().DB_ASYNC_ENABLED:
+    from app.api.routes import analytics, categories, exports, orders, products, stocks, users
+else:
+    from app.api.routes.sync import analytics, categories, exports, orders, products, stocks, users
 
 api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(auth.router)
@@ -10,5 +16,7 @@ api_router.include_router(categories.router)
 api_router.include_router(products.router)
 api_router.include_router(stocks.router)
 api_router.include_router(orders.router)
+api_router.include_router(exports.router)
+api_router.include_router(analytics.router)
 
 __all__ = ["api_router"]
@@ -1,84 +1,121 @@
 """Endpoints for category management."""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any
 
-from app.api.deps import get_current_admin, get_current_user
-from app.db.session import get_db
-from app.models import Category, User
-from app.schemas.category import CategoryCreate, CategoryRead, CategoryUpdate
-
-router = APIRouter(prefix="/categories", tags=["categories"])
-
-
-@router.get("/", response_model=list[CategoryRead], summary="List categories")
-def list_categories(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
-) -> list[Category]:
-    """Return a list of categories available for browsing."""
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-    return db.query(Category).all()
+from app.api.caching import catalogue_lookup
+from app.api.deps import get_current_admin, get_current_user
+from app.api.pagination import PageParams, build_page, page_params, paginate
+from app.core.autocomplete import autocomplete
+from app.core.catalogue_cache import CATEGORIES, catalogue_cache, category_scope
+from app.core.principals import Principal
+from app.core.query_budget import query_budget
+from app.core.timing import TimedRoute
+from app.db.session import get_async_db
+from app.models import Category
+from app.schemas.category import CategoryCreate, CategoryRead, CategorySortKey, CategoryUpdate
+from app.schemas.pagination import Page, SortOrder
+
+router = APIRouter(prefix="/categories", tags=["categories"], route_class=TimedRoute)
+
+
+@router.get("/", response_model=Page[CategoryRead], summary="List categories")
+@query_budget(max_statements=2)
+async def list_categories(
+    request: Request,
+    order_by: CategorySortKey = CategorySortKey.ID,
+    order: SortOrder = SortOrder.ASC,
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """Return a page of categories available for browsing."""
+
+    lookup = catalogue_lookup(
+        request, f"categories:list:{order_by.value}:{order.value}:{page.cursor}:{page.limit}", [CATEGORIES]
+    )
+    if lookup.response is not None:
+        return lookup.response
+    stmt = paginate(select(Category), Category, page, order_by, order)
+    result = await db.execute(stmt)
+    return lookup.respond(
+        Page[CategoryRead].model_validate(build_page(result.scalars().all(), Category, page, order_by, order))
+    )
 
 
 @router.post("/", response_model=CategoryRead, summary="Create category")
-def create_category(
+async def create_category(
     payload: CategoryCreate,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Category:
     """Create a new product category. Administrator only."""
 
     category = Category(**payload.model_dump())
     db.add(category)
-    db.commit()
-    db.refresh(category)
+    await db.commit()
+    catalogue_cache.bump(CATEGORIES)
+    await db.refresh(category)
+    autocomplete.upsert_category(category.id, category.name)
     return category
 
 
 @router.get("/{category_id}", response_model=CategoryRead, summary="Retrieve category")
-def get_category(
+@query_budget(max_statements=2)
+async def get_category(
     category_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> Category:
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
     """Return a single category by identifier."""
 
-    category = db.query(Category).filter(Category.id == category_id).first()
+    lookup = catalogue_lookup(request, category_scope(category_id), [category_scope(category_id)])
+    if lookup.response is not None:
+        return lookup.response
+    category = await db.get(Category, category_id)
     if category is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-    return category
+    return lookup.respond(CategoryRead.model_validate(category))
 
 
 @router.patch("/{category_id}", response_model=CategoryRead, summary="Update category")
-def update_category(
+async def update_category(
     category_id: int,
     payload: CategoryUpdate,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Category:
     """Update an existing category."""
 
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = await db.get(Category, category_id)
     if category is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(category, field, value)
     db.add(category)
-    db.commit()
-    db.refresh(category)
+    await db.commit()
+    catalogue_cache.bump(CATEGORIES, category_scope(category_id))
+    await db.refresh(category)
+    autocomplete.upsert_category(category.id, category.name)
     return category
 
 
 @router.delete("/{category_id}", response_model=CategoryRead, summary="Delete category")
-def delete_category(
+async def delete_category(
     category_id: int,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Category:
     """Delete a category."""
 
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = await db.get(Category, category_id)
     if category is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
-    db.delete(category)
-    db.commit()
+    await db.delete(category)
+    await db.commit()
+    catalogue_cache.bump(CATEGORIES, category_scope(category_id))
+    autocomplete.remove_category(category_id)
     return category
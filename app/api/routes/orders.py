@@ -1,91 +1,103 @@
 """Order related endpoints."""
+from typing import Any
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_admin, get_current_user
-from app.db.session import get_db
-from app.models import Order, OrderItem, OrderStatus, ProductStock, User, UserRoleEnum
-from app.schemas.order import OrderCreate, OrderRead, OrderStatusUpdate
+from app.api.pagination import PageParams, build_page, page_params, paginate
+from app.core.catalogue_cache import STOCK, catalogue_cache, product_scope
+from app.core.principals import Principal
+from app.core.query_budget import query_budget
+from app.core.timing import TimedRoute
+from app.db.session import get_async_db
+from app.models import Order, UserRoleEnum
+from app.schemas.order import OrderCreate, OrderRead, OrderSortKey, OrderStatusUpdate
+from app.schemas.pagination import Page, SortOrder
+from app.services.orders import fetch_order_reads, order_read_query, place_order
 from app.services.payments import process_payment_placeholder
+from app.services.sales import record_status_change
+
+router = APIRouter(prefix="/orders", tags=["orders"], route_class=TimedRoute)
+
+
+async def _read_order(db: AsyncSession, order_id: int) -> dict[str, Any] | None:
+    """Return the ``OrderRead`` payload of a single order."""
 
-router = APIRouter(prefix="/orders", tags=["orders"])
+    orders = await db.run_sync(fetch_order_reads, order_read_query().where(Order.id == order_id))
+    return orders[0] if orders else None
 
 
-@router.get("/", response_model=list[OrderRead], summary="List user orders")
-def list_orders(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
-) -> list[Order]:
+@router.get("/", response_model=Page[OrderRead], summary="List user orders")
+@query_budget(max_statements=3)
+async def list_orders(
+    order_by: OrderSortKey = OrderSortKey.ID,
+    order: SortOrder = SortOrder.ASC,
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
     """List orders belonging to the current user or all orders for admins."""
 
-    if current_user.role == UserRoleEnum.ADMIN:
-        return db.query(Order).all()
-    return db.query(Order).filter(Order.user_id == current_user.id).all()
+    stmt = order_read_query()
+    if current_user.role != UserRoleEnum.ADMIN:
+        stmt = stmt.where(Order.user_id == current_user.id)
+    stmt = paginate(stmt, Order, page, order_by, order)
+    orders = await db.run_sync(fetch_order_reads, stmt)
+    return build_page(orders, Order, page, order_by, order)
 
 
 @router.post("/", response_model=OrderRead, status_code=status.HTTP_201_CREATED, summary="Create order")
-def create_order(
+@query_budget(max_statements=12)
+async def create_order(
     payload: OrderCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Order:
     """Create a new order for the authenticated user."""
 
     if not payload.items:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order must contain items")
-    order = Order(user_id=current_user.id)
-    db.add(order)
-    for item in payload.items:
-        product_stock = db.query(ProductStock).filter(ProductStock.id == item.product_stock_id).first()
-        if product_stock is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product stock not found")
-        if product_stock.qty < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient stock for selected product"
-            )
-        product_stock.qty -= item.quantity
-        order_item = OrderItem(
-            product_id=product_stock.product_id,
-            quantity=item.quantity,
-            price_at_order=product_stock.sale_price,
-        )
-        order.items.append(order_item)
-        db.add(product_stock)
-    db.commit()
-    db.refresh(order)
+    order = await db.run_sync(place_order, current_user.id, payload.items)
+    catalogue_cache.bump(STOCK, *{product_scope(item.product_id) for item in order.items})
     process_payment_placeholder(order)
     return order
 
 
 @router.get("/{order_id}", response_model=OrderRead, summary="Retrieve order")
-def get_order(
+@query_budget(max_statements=3)
+async def get_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> Order:
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
     """Retrieve an order by identifier. Customers can only access their own orders."""
 
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await _read_order(db, order_id)
     if order is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
-    if current_user.role != UserRoleEnum.ADMIN and order.user_id != current_user.id:
+    if current_user.role != UserRoleEnum.ADMIN and order["user_id"] != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to access this order")
     return order
 
 
 @router.patch("/{order_id}/status", response_model=OrderRead, summary="Update order status")
-def update_order_status(
+@query_budget(max_statements=8)
+async def update_order_status(
     order_id: int,
     payload: OrderStatusUpdate,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
-) -> Order:
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
     """Allow administrators to update order statuses."""
 
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Locked so concurrent transitions adjust the sales rollups once.
+    order = await db.get(Order, order_id, with_for_update=True)
     if order is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    previous = order.status
     order.status = payload.status
     db.add(order)
-    db.commit()
-    db.refresh(order)
-    return order
+    await db.run_sync(record_status_change, order_id, previous, payload.status)
+    await db.commit()
+    return await _read_order(db, order_id)
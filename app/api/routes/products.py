@@ -1,84 +1,193 @@
 """Endpoints for product management."""
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any
 
-from app.api.deps import get_current_admin, get_current_user
-from app.db.session import get_db
-from app.models import Product, User
-from app.schemas.product import ProductCreate, ProductRead, ProductUpdate
-
-router = APIRouter(prefix="/products", tags=["products"])
-
-
-@router.get("/", response_model=list[ProductRead], summary="List products")
-def list_products(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
-) -> list[Product]:
-    """List all products available in the catalogue."""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-    return db.query(Product).all()
+from app.api.caching import catalogue_lookup
+from app.api.deps import get_current_admin, get_current_user
+from app.api.pagination import PageParams, build_page, page_params, paginate
+from app.core.autocomplete import autocomplete
+from app.core.catalogue_cache import CATEGORIES, PRODUCTS, STOCK, catalogue_cache, product_scope
+from app.core.principals import Principal
+from app.core.query_budget import query_budget
+from app.core.timing import TimedRoute
+from app.db.session import get_async_db
+from app.models import Product
+from app.schemas.pagination import Page, SortOrder
+from app.schemas.product import (
+    ProductCreate,
+    ProductPage,
+    ProductRead,
+    ProductSortKey,
+    ProductSuggestions,
+    ProductUpdate,
+    Suggestion,
+)
+from app.services.availability import drop_availability, refresh_availability
+from app.services.facets import (
+    ProductFilters,
+    build_facets,
+    category_facet_statement,
+    filter_products,
+    price_boundaries,
+    price_facet_statement,
+    product_filters,
+)
+from app.services.search import build_search_page, search_statement
+
+router = APIRouter(prefix="/products", tags=["products"], route_class=TimedRoute)
+
+
+@router.get("/", response_model=ProductPage, summary="List products")
+@query_budget(max_statements=4)
+async def list_products(
+    request: Request,
+    order_by: ProductSortKey = ProductSortKey.ID,
+    order: SortOrder = SortOrder.ASC,
+    page: PageParams = Depends(page_params),
+    filters: ProductFilters = Depends(product_filters),
+    facets: bool = Query(default=False, description="Also count products per category and price bucket"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """List products available in the catalogue, one keyset page at a time.
+
+    Availability, filters and facet counts are served from the
+    ``product_availability`` summary.
+    """
+
+    key = f"products:list:{order_by.value}:{order.value}:{page.cursor}:{page.limit}"
+    key = f"{key}:{filters.cache_key}:{facets:d}"
+    lookup = catalogue_lookup(request, key, [PRODUCTS, STOCK])
+    if lookup.response is not None:
+        return lookup.response
+    stmt = paginate(filter_products(select(Product), filters), Product, page, order_by, order)
+    result = await db.execute(stmt)
+    payload = build_page(result.scalars().all(), Product, page, order_by, order)
+    if facets:
+        boundaries = price_boundaries()
+        payload["facets"] = build_facets(
+            (await db.execute(category_facet_statement(filters))).all(),
+            (await db.execute(price_facet_statement(filters, boundaries))).all(),
+            boundaries,
+        )
+    return lookup.respond(ProductPage.model_validate(payload))
+
+
+@router.get("/search", response_model=Page[ProductRead], summary="Search products")
+@query_budget(max_statements=2)
+async def search_products(
+    request: Request,
+    q: str = Query(min_length=1, max_length=200, description="Words to look for"),
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """Search products by name, barcode, description and category name, best match first."""
+
+    lookup = catalogue_lookup(
+        request, f"products:search:{q}:{page.cursor}:{page.limit}", [PRODUCTS, CATEGORIES, STOCK]
+    )
+    if lookup.response is not None:
+        return lookup.response
+    result = await db.execute(search_statement(db.get_bind().dialect.name, q, page))
+    return lookup.respond(Page[ProductRead].model_validate(build_search_page(result.all(), page)))
+
+
+@router.get("/suggest", response_model=ProductSuggestions, summary="Suggest products and categories")
+@query_budget(max_statements=1)
+async def suggest_products(
+    prefix: str = Query(min_length=1, max_length=100, description="What the user has typed so far"),
+    limit: int = Query(default=10, ge=1, le=25),
+    current_user: Principal = Depends(get_current_user),
+) -> ProductSuggestions:
+    """Complete ``prefix`` from the in-memory autocomplete index, without touching the database."""
+
+    products, categories = autocomplete.suggest(prefix, limit)
+    return ProductSuggestions(
+        products=[Suggestion(id=ident, name=name) for ident, name in products],
+        categories=[Suggestion(id=ident, name=name) for ident, name in categories],
+    )
 
 
 @router.post("/", response_model=ProductRead, summary="Create product")
-def create_product(
+async def create_product(
     payload: ProductCreate,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Product:
     """Create a new product. Only administrators may perform this action."""
 
     product = Product(**payload.model_dump())
     db.add(product)
-    db.commit()
-    db.refresh(product)
+    await db.flush()
+    await db.run_sync(refresh_availability, [product.id])
+    await db.commit()
+    catalogue_cache.bump(PRODUCTS, STOCK)
+    await db.refresh(product)
+    autocomplete.upsert_product(product.id, product.name, product.category_id)
     return product
 
 
 @router.get("/{product_id}", response_model=ProductRead, summary="Retrieve product")
-def get_product(
+@query_budget(max_statements=2)
+async def get_product(
     product_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> Product:
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
     """Retrieve a single product by identifier."""
 
-    product = db.query(Product).filter(Product.id == product_id).first()
+    lookup = catalogue_lookup(request, product_scope(product_id), [product_scope(product_id)])
+    if lookup.response is not None:
+        return lookup.response
+    product = await db.get(Product, product_id)
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return lookup.respond(ProductRead.model_validate(product))
 
 
 @router.patch("/{product_id}", response_model=ProductRead, summary="Update product")
-def update_product(
+async def update_product(
     product_id: int,
     payload: ProductUpdate,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Product:
     """Update product details."""
 
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(product, field, value)
     db.add(product)
-    db.commit()
-    db.refresh(product)
+    await db.flush()
+    await db.run_sync(refresh_availability, [product_id])
+    await db.commit()
+    catalogue_cache.bump(PRODUCTS, STOCK, product_scope(product_id))
+    await db.refresh(product)
+    autocomplete.upsert_product(product.id, product.name, product.category_id)
     return product
 
 
 @router.delete("/{product_id}", response_model=ProductRead, summary="Delete product")
-def delete_product(
+async def delete_product(
     product_id: int,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Product:
     """Delete a product."""
 
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if product is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    db.delete(product)
-    db.commit()
+    await db.run_sync(drop_availability, product_id)
+    await db.delete(product)
+    await db.commit()
+    catalogue_cache.bump(PRODUCTS, STOCK, product_scope(product_id))
+    autocomplete.remove_product(product_id)
     return product
@@ -1,44 +1,62 @@
 """Endpoints for managing stock locations and product stock levels."""
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_admin, get_current_user
-from app.db.session import get_db
-from app.models import ProductStock, Stock, User
+from app.api.pagination import PageParams, build_page, page_params, paginate
+from app.core.catalogue_cache import STOCK, catalogue_cache, product_scope
+from app.core.principals import Principal
+from app.core.query_budget import allow_statements, query_budget
+from app.core.timing import TimedRoute
+from app.db.session import get_async_db
+from app.models import ProductStock, Stock
+from app.schemas.pagination import Page, SortOrder
 from app.schemas.stock import (
     ProductStockCreate,
     ProductStockRead,
+    ProductStockSortKey,
+    ProductStockSyncReport,
     ProductStockSyncRequest,
     ProductStockUpdate,
     StockCreate,
     StockRead,
+    StockSortKey,
 )
-from app.services.sync import sync_product_stock_from_external_api
+from app.services.availability import refresh_availability
+from app.services.sync import SyncReport, apply_stock_feed, fetch_feed, get_stock_feed, write_chunks
 
-router = APIRouter(prefix="/stocks", tags=["stocks"])
+router = APIRouter(prefix="/stocks", tags=["stocks"], route_class=TimedRoute)
 
 
-@router.get("/", response_model=list[StockRead], summary="List stock locations")
-def list_stocks(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
-) -> list[Stock]:
-    """Return all stock locations."""
+@router.get("/", response_model=Page[StockRead], summary="List stock locations")
+async def list_stocks(
+    order_by: StockSortKey = StockSortKey.ID,
+    order: SortOrder = SortOrder.ASC,
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """Return a page of stock locations."""
 
-    return db.query(Stock).all()
+    stmt = paginate(select(Stock), Stock, page, order_by, order)
+    result = await db.execute(stmt)
+    return build_page(result.scalars().all(), Stock, page, order_by, order)
 
 
 @router.post("/", response_model=StockRead, summary="Create stock location")
-def create_stock(
+async def create_stock(
     payload: StockCreate,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Stock:
     """Create a new stock location. Only administrators can perform this action."""
 
     stock = Stock(**payload.model_dump())
     db.add(stock)
-    db.commit()
-    db.refresh(stock)
+    await db.commit()
+    await db.refresh(stock)
     return stock
 
 
@@ -47,17 +65,20 @@ def create_stock(
     response_model=ProductStockRead,
     summary="Create product stock entry",
 )
-def create_product_stock(
+async def create_product_stock(
     payload: ProductStockCreate,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
 ) -> ProductStock:
     """Create a new product stock association."""
 
     product_stock = ProductStock(**payload.model_dump())
     db.add(product_stock)
-    db.commit()
-    db.refresh(product_stock)
+    await db.flush()
+    await db.run_sync(refresh_availability, [product_stock.product_id])
+    await db.commit()
+    await db.refresh(product_stock)
+    catalogue_cache.bump(STOCK, product_scope(product_stock.product_id))
     return product_stock
 
 
@@ -66,49 +87,70 @@ def create_product_stock(
     response_model=ProductStockRead,
     summary="Update product stock",
 )
-def update_product_stock(
+async def update_product_stock(
     product_stock_id: int,
     payload: ProductStockUpdate,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
 ) -> ProductStock:
     """Update product stock quantity or price. Intended primarily for sync results."""
 
-    product_stock = db.query(ProductStock).filter(ProductStock.id == product_stock_id).first()
+    product_stock = await db.get(ProductStock, product_stock_id)
     if product_stock is None:
         raise HTTPException(status_code=404, detail="Product stock not found")
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(product_stock, field, value)
     db.add(product_stock)
-    db.commit()
-    db.refresh(product_stock)
+    await db.flush()
+    await db.run_sync(refresh_availability, [product_stock.product_id])
+    await db.commit()
+    await db.refresh(product_stock)
+    catalogue_cache.bump(STOCK, product_scope(product_stock.product_id))
     return product_stock
 
 
 @router.get(
     "/product-stock",
-    response_model=list[ProductStockRead],
+    response_model=Page[ProductStockRead],
     summary="List product stock entries",
 )
-def list_product_stock(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
-) -> list[ProductStock]:
-    """List product stock entries across all locations."""
+async def list_product_stock(
+    order_by: ProductStockSortKey = ProductStockSortKey.ID,
+    order: SortOrder = SortOrder.ASC,
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """List a page of product stock entries across all locations."""
 
-    return db.query(ProductStock).all()
+    stmt = paginate(select(ProductStock), ProductStock, page, order_by, order)
+    result = await db.execute(stmt)
+    return build_page(result.scalars().all(), ProductStock, page, order_by, order)
 
 
+# One bulk UPDATE per STOCK_SYNC_CHUNK_SIZE changed rows.
 @router.post(
     "/product-stock/sync",
-    response_model=list[ProductStockRead],
+    response_model=ProductStockSyncReport,
     summary="Sync product stock from external API",
 )
-def sync_product_stock(
+@query_budget(max_statements=6)
+async def sync_product_stock(
     payload: ProductStockSyncRequest,
-    _: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
-) -> list[ProductStock]:
-    """Sync product stock price and quantity values via the mocked external API."""
-
-    updated = sync_product_stock_from_external_api(db, payload.product_stock_ids)
-    return updated
+    _: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """Sync product stock price and quantity values from the external feed.
+
+    Only rows whose values differ from the feed are written.
+    """
+
+    ids = list(dict.fromkeys(payload.product_stock_ids))
+    # One bulk UPDATE per chunk of changed rows on top of the fixed budget.
+    allow_statements(write_chunks(len(ids)))
+    report = SyncReport()
+    entries = await run_in_threadpool(fetch_feed, get_stock_feed(), ids, report)
+    await db.run_sync(apply_stock_feed, ids, entries, report)
+    if report.changed:
+        catalogue_cache.bump(STOCK, *{product_scope(row.product_id) for row in report.updated})
+    return report.as_dict()
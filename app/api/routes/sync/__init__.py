@@ -0,0 +1 @@
+"""Threadpool-backed sync routers kept for A/B comparison with the asyncio path."""
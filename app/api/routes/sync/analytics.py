@@ -0,0 +1,47 @@
+"""Admin sales analytics endpoints served from the daily rollups (sync path)."""
+from datetime import date
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_admin_sync
+from app.core.query_budget import query_budget
+from app.core.timing import TimedRoute
+from app.db.session import get_db
+from app.schemas.sales import CategoryRevenueRead, Granularity, PeriodRevenueRead
+from app.services.sales import revenue_by_category_statement, revenue_by_period_statement
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"],
+    dependencies=[Depends(get_current_admin_sync)],
+    route_class=TimedRoute,
+)
+
+
+@router.get("/revenue", response_model=list[PeriodRevenueRead], summary="Revenue by period")
+@query_budget(max_statements=2)
+def revenue_by_period(
+    start: date = Query(description="First day of the range"),
+    end: date = Query(description="Day after the last one of the range"),
+    granularity: Granularity = Granularity.DAY,
+    category_id: int | None = None,
+    db: Session = Depends(get_db),
+) -> Any:
+    """Return units, revenue and orders per day, week or month, optionally for one category."""
+
+    stmt = revenue_by_period_statement(db.get_bind().dialect.name, granularity, start, end, category_id)
+    return db.execute(stmt).mappings().all()
+
+
+@router.get("/revenue/categories", response_model=list[CategoryRevenueRead], summary="Revenue by category")
+@query_budget(max_statements=2)
+def revenue_by_category(
+    start: date = Query(description="First day of the range"),
+    end: date = Query(description="Day after the last one of the range"),
+    db: Session = Depends(get_db),
+) -> Any:
+    """Return units, revenue and orders per category, highest revenue first."""
+
+    return db.execute(revenue_by_category_statement(start, end)).mappings().all()
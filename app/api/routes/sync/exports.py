@@ -0,0 +1,74 @@
+"""Admin bulk export endpoints streaming NDJSON or CSV (sync path)."""
+from datetime import datetime
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.api.deps import get_current_admin_sync
+from app.core.timing import TimedRoute
+from app.models import OrderStatus
+from app.schemas.export import ExportFormat, ExportProgressRead
+from app.services.exports import (
+    MEDIA_TYPES,
+    export_tracker,
+    iter_export,
+    order_export_query,
+    product_export_query,
+    product_stock_export_query,
+)
+
+router = APIRouter(
+    prefix="/exports",
+    tags=["exports"],
+    dependencies=[Depends(get_current_admin_sync)],
+    route_class=TimedRoute,
+)
+
+
+def _stream(stmt: Select, fmt: ExportFormat, kind: str) -> StreamingResponse:
+    return StreamingResponse(
+        iter_export(stmt, fmt, kind),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{fmt.value}"'},
+    )
+
+
+@router.get("/products", summary="Export products")
+def export_products(
+    format: ExportFormat = ExportFormat.NDJSON,
+    category_id: int | None = None,
+) -> StreamingResponse:
+    """Stream every product, optionally limited to one category."""
+
+    return _stream(product_export_query(category_id), format, "products")
+
+
+@router.get("/product-stock", summary="Export product stock")
+def export_product_stock(
+    format: ExportFormat = ExportFormat.NDJSON,
+    category_id: int | None = None,
+    location: str | None = None,
+) -> StreamingResponse:
+    """Stream stock levels per product and location."""
+
+    return _stream(product_stock_export_query(category_id, location), format, "product_stock")
+
+
+@router.get("/orders", summary="Export order lines")
+def export_orders(
+    format: ExportFormat = ExportFormat.NDJSON,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    status: OrderStatus | None = None,
+) -> StreamingResponse:
+    """Stream one row per order line, optionally within ``[created_from, created_to)``."""
+
+    return _stream(order_export_query(created_from, created_to, status), format, "orders")
+
+
+@router.get("/progress", response_model=list[ExportProgressRead], summary="Running exports")
+def export_progress() -> list[dict]:
+    """Report rows and bytes streamed so far by every running export."""
+
+    return export_tracker.active()
@@ -0,0 +1,102 @@
+"""Order related endpoints."""
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_admin_sync, get_current_user_sync
+from app.api.pagination import PageParams, build_page, page_params, paginate
+from app.core.catalogue_cache import STOCK, catalogue_cache, product_scope
+from app.core.principals import Principal
+from app.core.query_budget import query_budget
+from app.core.timing import TimedRoute
+from app.db.session import get_db
+from app.models import Order, UserRoleEnum
+from app.schemas.order import OrderCreate, OrderRead, OrderSortKey, OrderStatusUpdate
+from app.schemas.pagination import Page, SortOrder
+from app.services.orders import fetch_order_reads, order_read_query, place_order
+from app.services.payments import process_payment_placeholder
+from app.services.sales import record_status_change
+
+router = APIRouter(prefix="/orders", tags=["orders"], route_class=TimedRoute)
+
+
+def _read_order(db: Session, order_id: int) -> dict[str, Any] | None:
+    """Return the ``OrderRead`` payload of a single order."""
+
+    orders = fetch_order_reads(db, order_read_query().where(Order.id == order_id))
+    return orders[0] if orders else None
+
+
+@router.get("/", response_model=Page[OrderRead], summary="List user orders")
+@query_budget(max_statements=3)
+def list_orders(
+    order_by: OrderSortKey = OrderSortKey.ID,
+    order: SortOrder = SortOrder.ASC,
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user_sync),
+    db: Session = Depends(get_db),
+) -> dict:
+    """List orders belonging to the current user or all orders for admins."""
+
+    stmt = order_read_query()
+    if current_user.role != UserRoleEnum.ADMIN:
+        stmt = stmt.where(Order.user_id == current_user.id)
+    stmt = paginate(stmt, Order, page, order_by, order)
+    return build_page(fetch_order_reads(db, stmt), Order, page, order_by, order)
+
+
+@router.post("/", response_model=OrderRead, status_code=status.HTTP_201_CREATED, summary="Create order")
+@query_budget(max_statements=12)
+def create_order(
+    payload: OrderCreate,
+    current_user: Principal = Depends(get_current_user_sync),
+    db: Session = Depends(get_db),
+) -> Order:
+    """Create a new order for the authenticated user."""
+
+    if not payload.items:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order must contain items")
+    order = place_order(db, current_user.id, payload.items)
+    catalogue_cache.bump(STOCK, *{product_scope(item.product_id) for item in order.items})
+    process_payment_placeholder(order)
+    return order
+
+
+@router.get("/{order_id}", response_model=OrderRead, summary="Retrieve order")
+@query_budget(max_statements=3)
+def get_order(
+    order_id: int,
+    current_user: Principal = Depends(get_current_user_sync),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Retrieve an order by identifier. Customers can only access their own orders."""
+
+    order = _read_order(db, order_id)
+    if order is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    if current_user.role != UserRoleEnum.ADMIN and order["user_id"] != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to access this order")
+    return order
+
+
+@router.patch("/{order_id}/status", response_model=OrderRead, summary="Update order status")
+@query_budget(max_statements=8)
+def update_order_status(
+    order_id: int,
+    payload: OrderStatusUpdate,
+    _: Principal = Depends(get_current_admin_sync),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Allow administrators to update order statuses."""
+
+    # Locked so concurrent transitions adjust the sales rollups once.
+    order = db.get(Order, order_id, with_for_update=True)
+    if order is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    previous = order.status
+    order.status = payload.status
+    db.add(order)
+    record_status_change(db, order_id, previous, payload.status)
+    db.commit()
+    return _read_order(db, order_id)
@@ -0,0 +1,150 @@
+"""Endpoints for managing stock locations and product stock levels."""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_admin_sync, get_current_user_sync
+from app.api.pagination import PageParams, build_page, page_params, paginate
+from app.core.catalogue_cache import STOCK, catalogue_cache, product_scope
+from app.core.principals import Principal
+from app.core.query_budget import allow_statements, query_budget
+from app.core.timing import TimedRoute
+from app.db.session import get_db
+from app.models import ProductStock, Stock
+from app.schemas.pagination import Page, SortOrder
+from app.schemas.stock import (
+    ProductStockCreate,
+    ProductStockRead,
+    ProductStockSortKey,
+    ProductStockSyncReport,
+    ProductStockSyncRequest,
+    ProductStockUpdate,
+    StockCreate,
+    StockRead,
+    StockSortKey,
+)
+from app.services.availability import refresh_availability
+from app.services.sync import sync_product_stock_from_feed, write_chunks
+
+router = APIRouter(prefix="/stocks", tags=["stocks"], route_class=TimedRoute)
+
+
+@router.get("/", response_model=Page[StockRead], summary="List stock locations")
+def list_stocks(
+    order_by: StockSortKey = StockSortKey.ID,
+    order: SortOrder = SortOrder.ASC,
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user_sync),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Return a page of stock locations."""
+
+    stmt = paginate(select(Stock), Stock, page, order_by, order)
+    return build_page(db.scalars(stmt).all(), Stock, page, order_by, order)
+
+
+@router.post("/", response_model=StockRead, summary="Create stock location")
+def create_stock(
+    payload: StockCreate,
+    _: Principal = Depends(get_current_admin_sync),
+    db: Session = Depends(get_db),
+) -> Stock:
+    """Create a new stock location. Only administrators can perform this action."""
+
+    stock = Stock(**payload.model_dump())
+    db.add(stock)
+    db.commit()
+    db.refresh(stock)
+    return stock
+
+
+@router.post(
+    "/product-stock",
+    response_model=ProductStockRead,
+    summary="Create product stock entry",
+)
+def create_product_stock(
+    payload: ProductStockCreate,
+    _: Principal = Depends(get_current_admin_sync),
+    db: Session = Depends(get_db),
+) -> ProductStock:
+    """Create a new product stock association."""
+
+    product_stock = ProductStock(**payload.model_dump())
+    db.add(product_stock)
+    db.flush()
+    refresh_availability(db, [product_stock.product_id])
+    db.commit()
+    db.refresh(product_stock)
+    catalogue_cache.bump(STOCK, product_scope(product_stock.product_id))
+    return product_stock
+
+
+@router.patch(
+    "/product-stock/{product_stock_id}",
+    response_model=ProductStockRead,
+    summary="Update product stock",
+)
+def update_product_stock(
+    product_stock_id: int,
+    payload: ProductStockUpdate,
+    _: Principal = Depends(get_current_admin_sync),
+    db: Session = Depends(get_db),
+) -> ProductStock:
+    """Update product stock quantity or price. Intended primarily for sync results."""
+
+    product_stock = db.query(ProductStock).filter(ProductStock.id == product_stock_id).first()
+    if product_stock is None:
+        raise HTTPException(status_code=404, detail="Product stock not found")
+    for field, value in payload.model_dump(exclude_unset=True).items():
+        setattr(product_stock, field, value)
+    db.add(product_stock)
+    db.flush()
+    refresh_availability(db, [product_stock.product_id])
+    db.commit()
+    db.refresh(product_stock)
+    catalogue_cache.bump(STOCK, product_scope(product_stock.product_id))
+    return product_stock
+
+
+@router.get(
+    "/product-stock",
+    response_model=Page[ProductStockRead],
+    summary="List product stock entries",
+)
+def list_product_stock(
+    order_by: ProductStockSortKey = ProductStockSortKey.ID,
+    order: SortOrder = SortOrder.ASC,
+    page: PageParams = Depends(page_params),
+    current_user: Principal = Depends(get_current_user_sync),
+    db: Session = Depends(get_db),
+) -> dict:
+    """List a page of product stock entries across all locations."""
+
+    stmt = paginate(select(ProductStock), ProductStock, page, order_by, order)
+    return build_page(db.scalars(stmt).all(), ProductStock, page, order_by, order)
+
+
+# One bulk UPDATE per STOCK_SYNC_CHUNK_SIZE changed rows.
+@router.post(
+    "/product-stock/sync",
+    response_model=ProductStockSyncReport,
+    summary="Sync product stock from external API",
+)
+@query_budget(max_statements=6)
+def sync_product_stock(
+    payload: ProductStockSyncRequest,
+    _: Principal = Depends(get_current_admin_sync),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Sync product stock price and quantity values from the external feed.
+
+    Only rows whose values differ from the feed are written.
+    """
+
+    # One bulk UPDATE per chunk of changed rows on top of the fixed budget.
+    allow_statements(write_chunks(len(set(payload.product_stock_ids))))
+    report = sync_product_stock_from_feed(db, payload.product_stock_ids)
+    if report.changed:
+        catalogue_cache.bump(STOCK, *{product_scope(row.product_id) for row in report.updated})
+    return report.as_dict()
@@ -0,0 +1,55 @@
+"""User management endpoints."""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_admin_sync, get_current_user_sync
+from app.api.pagination import PageParams, build_page, page_params, paginate
+from app.core.principals import Principal, principal_cache
+from app.core.timing import TimedRoute
+from app.db.session import get_db
+from app.models import User
+from app.schemas.pagination import Page, SortOrder
+from app.schemas.user import Message, UserRead, UserRoleUpdate, UserSortKey
+
+router = APIRouter(prefix="/users", tags=["users"], route_class=TimedRoute)
+
+
+@router.get("/me", response_model=UserRead, summary="Retrieve current user")
+def get_me(current_user: Principal = Depends(get_current_user_sync)) -> Principal:
+    """Return the profile of the authenticated user."""
+
+    return current_user
+
+
+@router.get("/", response_model=Page[UserRead], summary="List users")
+def list_users(
+    order_by: UserSortKey = UserSortKey.ID,
+    order: SortOrder = SortOrder.ASC,
+    page: PageParams = Depends(page_params),
+    _: Principal = Depends(get_current_admin_sync),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Return a page of users. Only administrators can access this endpoint."""
+
+    stmt = paginate(select(User), User, page, order_by, order)
+    return build_page(db.scalars(stmt).all(), User, page, order_by, order)
+
+
+@router.patch("/{user_id}/role", response_model=Message, summary="Update user role")
+def update_role(
+    user_id: int,
+    payload: UserRoleUpdate,
+    _: Principal = Depends(get_current_admin_sync),
+    db: Session = Depends(get_db),
+) -> Message:
+    """Allow administrators to update the role of any user."""
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user.role = payload.role
+    db.add(user)
+    db.commit()
+    principal_cache.invalidate(user.email)
+    return Message(detail="User role updated")
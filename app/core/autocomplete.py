@@ -0,0 +1,377 @@
+"""In-process prefix index for search-as-you-type suggestions.
+
+Every word suffix of a normalised product or category name is kept in a
+sorted array of ``(key, id)`` pairs, so ``"steel kettle"`` is found by
+``"ste"`` and by ``"ket"``. Suggestions are ranked by popularity: units
+ordered through ``order_items`` for products, the sum over their products for
+categories.
+
+The best :data:`TOP_K` entities of every prefix up to
+``AUTOCOMPLETE_PREFIX_LENGTH`` characters are precomputed, so the short
+prefixes with the widest ranges are a dictionary lookup. Longer prefixes are
+answered with :func:`bisect.bisect_left` and a scan over their matching
+range, which is narrow. Writes keep the table current incrementally, and they
+replace the arrays and ranked tuples readers see instead of changing them in
+place, so suggestions are served without taking a lock.
+
+The index is built when the app starts and rebuilt every
+``AUTOCOMPLETE_REFRESH_SECONDS``, which refreshes popularity and picks up
+writes served by other workers. Writes served by this process update it
+immediately through :meth:`AutocompleteIndex.upsert_product` and friends.
+"""
+import asyncio
+import bisect
+import heapq
+import logging
+import sys
+import threading
+import time
+import unicodedata
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, select
+
+from app.core.config import get_settings
+from app.core.metrics import CallbackGauge
+
+logger = logging.getLogger(__name__)
+
+# Word suffixes indexed per name; later words are rarely typed first.
+MAX_WORDS = 8
+# Suggestions precomputed per prefix: the largest ``limit`` of /products/suggest.
+TOP_K = 25
+
+Suggestion = tuple[int, str]
+
+
+def normalize(text: str) -> str:
+    """Casefold ``text``, strip accents and reduce punctuation to single spaces."""
+
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    chars = (char if char.isalnum() else " " for char in decomposed if not unicodedata.combining(char))
+    return " ".join("".join(chars).split())
+
+
+def index_keys(name: str) -> list[str]:
+    """Return the keys ``name`` is found under: each suffix starting at a word."""
+
+    words = normalize(name).split()[:MAX_WORDS]
+    return [" ".join(words[start:]) for start in range(len(words))]
+
+
+def _entry_bytes(key: str) -> int:
+    # One (key, id) tuple, its key string and the list slot pointing at it.
+    return sys.getsizeof((key, 0)) + sys.getsizeof(key) + 8
+
+
+def _node_bytes(prefix: str, best: tuple[Suggestion, ...]) -> int:
+    # The prefix string, its ranked tuple and the table slot pointing at them.
+    return sys.getsizeof(prefix) + sys.getsizeof(best) + 16
+
+
+@dataclass
+class PrefixIndex:
+    """Sorted ``(key, id)`` pairs of one kind of entity and the best entities of its short prefixes.
+
+    ``prefixes`` maps every prefix of at most ``prefix_length`` characters to
+    its :data:`TOP_K` most popular entities, or to all of them when fewer
+    match. Writes replace ``entries`` and the tuples of ``prefixes`` rather
+    than mutating them, so :meth:`top` needs no lock.
+    """
+
+    prefix_length: int = 6
+    entries: list[tuple[str, int]] = field(default_factory=list)
+    names: dict[int, str] = field(default_factory=dict)
+    popularity: dict[int, float] = field(default_factory=dict)
+    prefixes: dict[str, tuple[Suggestion, ...]] = field(default_factory=dict)
+    memory_bytes: int = 0
+
+    @classmethod
+    def build(cls, names: dict[int, str], popularity: dict[int, float], prefix_length: int) -> "PrefixIndex":
+        index = cls(prefix_length=prefix_length, names=names, popularity=popularity)
+        index.entries = sorted((key, ident) for ident, name in names.items() for key in index_keys(name))
+        matches: dict[str, set[int]] = {}
+        for key, ident in index.entries:
+            for length in range(1, min(len(key), prefix_length) + 1):
+                matches.setdefault(key[:length], set()).add(ident)
+        index.prefixes = {prefix: index._rank(idents) for prefix, idents in matches.items()}
+        memory = sys.getsizeof(index.entries) + sys.getsizeof(names) + sys.getsizeof(popularity)
+        memory += sys.getsizeof(index.prefixes)
+        memory += sum(_entry_bytes(key) for key, _ in index.entries)
+        memory += sum(sys.getsizeof(name) + sys.getsizeof((0, name)) for name in names.values())
+        memory += sum(_node_bytes(prefix, best) for prefix, best in index.prefixes.items())
+        index.memory_bytes = memory
+        return index
+
+    def _rank_key(self) -> Callable[[int], tuple[float, int]]:
+        popularity = self.popularity
+        return lambda ident: (-popularity.get(ident, 0.0), ident)
+
+    def _rank(self, idents, limit: int = TOP_K) -> tuple[Suggestion, ...]:
+        names = self.names
+        best = heapq.nsmallest(limit, idents, key=self._rank_key())
+        # A concurrent remove may have dropped a name since ``idents`` was read.
+        return tuple((ident, names[ident]) for ident in best if ident in names)
+
+    def _matches(self, prefix: str) -> set[int]:
+        entries = self.entries
+        matches = set()
+        for position in range(bisect.bisect_left(entries, (prefix,)), len(entries)):
+            key, ident = entries[position]
+            if not key.startswith(prefix):
+                break
+            matches.add(ident)
+        return matches
+
+    def _prefixes_of(self, keys: list[str]) -> set[str]:
+        return {key[:length] for key in keys for length in range(1, min(len(key), self.prefix_length) + 1)}
+
+    def _set_prefix(self, prefix: str, best: tuple[Suggestion, ...]) -> None:
+        previous = self.prefixes.get(prefix)
+        if previous is not None:
+            self.memory_bytes -= _node_bytes(prefix, previous)
+        if best:
+            self.prefixes[prefix] = best
+            self.memory_bytes += _node_bytes(prefix, best)
+        else:
+            self.prefixes.pop(prefix, None)
+
+    def add(self, ident: int, name: str) -> None:
+        keys = index_keys(name)
+        self.names[ident] = name
+        entries = self.entries.copy()
+        for key in keys:
+            bisect.insort(entries, (key, ident))
+            self.memory_bytes += _entry_bytes(key)
+        self.entries = entries
+        self.memory_bytes += sys.getsizeof(name) + sys.getsizeof((ident, name))
+
+        rank = self._rank_key()
+        suggestion = (ident, name)
+        for prefix in self._prefixes_of(keys):
+            best = self.prefixes.get(prefix, ())
+            if len(best) < TOP_K or rank(ident) < rank(best[-1][0]):
+                ranked = sorted((*best, suggestion), key=lambda item: rank(item[0]))
+                self._set_prefix(prefix, tuple(ranked[:TOP_K]))
+
+    def remove(self, ident: int) -> None:
+        name = self.names.get(ident)
+        if name is None:
+            return
+        keys = index_keys(name)
+        entries = self.entries.copy()
+        for key in keys:
+            position = bisect.bisect_left(entries, (key, ident))
+            if position < len(entries) and entries[position] == (key, ident):
+                del entries[position]
+                self.memory_bytes -= _entry_bytes(key)
+        self.entries = entries
+        del self.names[ident]
+        self.memory_bytes -= sys.getsizeof(name) + sys.getsizeof((ident, name))
+
+        for prefix in self._prefixes_of(keys):
+            best = self.prefixes.get(prefix, ())
+            if not any(item[0] == ident for item in best):
+                continue
+            if len(best) < TOP_K:
+                # The tuple held every match, so the rest still does.
+                self._set_prefix(prefix, tuple(item for item in best if item[0] != ident))
+            else:
+                self._set_prefix(prefix, self._rank(self._matches(prefix)))
+
+    def rerank(self, ident: int) -> None:
+        """Re-rank the prefixes of ``ident`` after its popularity changed."""
+
+        name = self.names.get(ident)
+        if name is not None:
+            for prefix in self._prefixes_of(index_keys(name)):
+                self._set_prefix(prefix, self._rank(self._matches(prefix)))
+
+    def top(self, prefix: str, limit: int) -> list[Suggestion]:
+        """Return up to ``limit`` entities with a key starting with ``prefix``, most popular first."""
+
+        if len(prefix) <= self.prefix_length:
+            return list(self.prefixes.get(prefix, ())[:limit])
+        return list(self._rank(self._matches(prefix), limit))
+
+
+class AutocompleteIndex:
+    """Product and category prefix indexes shared by the requests of one process.
+
+    Reads take no lock; writes and rebuilds are serialised by ``_lock``.
+    """
+
+    def __init__(self, prefix_length: int) -> None:
+        self.prefix_length = prefix_length
+        self.products = PrefixIndex(prefix_length=prefix_length)
+        self.categories = PrefixIndex(prefix_length=prefix_length)
+        self.product_categories: dict[int, int] = {}
+        self.ready = False
+        self.built_at: float | None = None
+        self.build_seconds: float | None = None
+        self._lock = threading.Lock()
+        # Writes applied while a rebuild reads the database, replayed on its result.
+        self._pending: list[tuple[str, tuple]] | None = None
+        self._refresher: asyncio.Task | None = None
+
+    def suggest(self, prefix: str, limit: int) -> tuple[list[Suggestion], list[Suggestion]]:
+        """Return ``(products, categories)`` whose names have a word starting with ``prefix``."""
+
+        key = normalize(prefix)
+        if not key:
+            return [], []
+        return self.products.top(key, limit), self.categories.top(key, limit)
+
+    def _write(self, method: str, *args) -> None:
+        with self._lock:
+            getattr(self, method)(*args)
+            if self._pending is not None:
+                self._pending.append((method, args))
+
+    def _upsert_product(self, product_id: int, name: str, category_id: int) -> None:
+        self.products.remove(product_id)
+        self.products.add(product_id, name)
+        sold = self.products.popularity.get(product_id, 0.0)
+        previous = self.product_categories.get(product_id)
+        if previous != category_id and sold:
+            popularity = self.categories.popularity
+            if previous is not None:
+                popularity[previous] = popularity.get(previous, 0.0) - sold
+                self.categories.rerank(previous)
+            popularity[category_id] = popularity.get(category_id, 0.0) + sold
+            self.categories.rerank(category_id)
+        self.product_categories[product_id] = category_id
+
+    def _remove_product(self, product_id: int) -> None:
+        self.product_categories.pop(product_id, None)
+        self.products.remove(product_id)
+
+    def _upsert_category(self, category_id: int, name: str) -> None:
+        self.categories.remove(category_id)
+        self.categories.add(category_id, name)
+
+    def _remove_category(self, category_id: int) -> None:
+        self.categories.remove(category_id)
+
+    def upsert_product(self, product_id: int, name: str, category_id: int) -> None:
+        self._write("_upsert_product", product_id, name, category_id)
+
+    def remove_product(self, product_id: int) -> None:
+        self._write("_remove_product", product_id)
+
+    def upsert_category(self, category_id: int, name: str) -> None:
+        self._write("_upsert_category", category_id, name)
+
+    def remove_category(self, category_id: int) -> None:
+        self._write("_remove_category", category_id)
+
+    def rebuild(self) -> None:
+        """Reload names and popularity from the database and swap the indexes in."""
+
+        from app.db.session import read_session
+        from app.models import Category, OrderItem, Product
+
+        started = time.perf_counter()
+        with self._lock:
+            self._pending = []
+        try:
+            with read_session() as db:
+                product_rows = db.execute(select(Product.id, Product.name, Product.category_id)).all()
+                category_names = dict(db.execute(select(Category.id, Category.name)).all())
+                sold = db.execute(
+                    select(OrderItem.product_id, func.sum(OrderItem.quantity)).group_by(OrderItem.product_id)
+                ).all()
+            product_popularity = {product_id: float(units) for product_id, units in sold}
+            product_categories = {product_id: category_id for product_id, _, category_id in product_rows}
+            category_popularity: dict[int, float] = {}
+            for product_id, units in product_popularity.items():
+                category_id = product_categories.get(product_id)
+                if category_id is not None:
+                    category_popularity[category_id] = category_popularity.get(category_id, 0.0) + units
+            product_names = {product_id: name for product_id, name, _ in product_rows}
+            products = PrefixIndex.build(product_names, product_popularity, self.prefix_length)
+            categories = PrefixIndex.build(category_names, category_popularity, self.prefix_length)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self.products, self.categories, self.product_categories = products, categories, product_categories
+            for method, args in pending:
+                getattr(self, method)(*args)
+            self.ready = True
+            self.built_at = time.time()
+            self.build_seconds = time.perf_counter() - started
+        logger.info(
+            "Autocomplete index built in %.2fs: %d product and %d category keys, %d prefixes, ~%d KiB",
+            self.build_seconds,
+            len(products.entries),
+            len(categories.entries),
+            len(products.prefixes) + len(categories.prefixes),
+            (products.memory_bytes + categories.memory_bytes) // 1024,
+        )
+
+    async def start(self, refresh_seconds: float) -> None:
+        """Build the index and keep rebuilding it in the background."""
+
+        try:
+            await asyncio.to_thread(self.rebuild)
+        except Exception:  # noqa: BLE001 - serve without suggestions until the next refresh
+            logger.exception("Autocomplete index build failed")
+        if refresh_seconds > 0:
+            self._refresher = asyncio.create_task(self._refresh(refresh_seconds))
+
+    async def _refresh(self, refresh_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(refresh_seconds)
+            try:
+                await asyncio.to_thread(self.rebuild)
+            except Exception:  # noqa: BLE001 - keep the previous index
+                logger.exception("Autocomplete index refresh failed")
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            name: {
+                "entries": len(index.entries),
+                "prefixes": len(index.prefixes),
+                "memory_bytes": index.memory_bytes,
+            }
+            for name, index in (("products", self.products), ("categories", self.categories))
+        }
+
+
+settings = get_settings()
+autocomplete = AutocompleteIndex(prefix_length=settings.AUTOCOMPLETE_PREFIX_LENGTH)
+
+
+async def start_autocomplete() -> None:
+    if settings.AUTOCOMPLETE_ENABLED:
+        await autocomplete.start(settings.AUTOCOMPLETE_REFRESH_SECONDS)
+
+
+def _gauge(metric: str) -> Callable[[], list[tuple[tuple, float]]]:
+    return lambda: [((name,), values[metric]) for name, values in autocomplete.stats().items()]
+
+
+CallbackGauge(
+    "autocomplete_entries", "Prefix keys held by the autocomplete index.", ("index",), _gauge("entries")
+)
+CallbackGauge(
+    "autocomplete_prefixes",
+    "Prefixes with precomputed suggestions in the autocomplete index.",
+    ("index",),
+    _gauge("prefixes"),
+)
+CallbackGauge(
+    "autocomplete_memory_bytes",
+    "Approximate memory held by the autocomplete index.",
+    ("index",),
+    _gauge("memory_bytes"),
+)
@@ -0,0 +1,337 @@
+"""Versioned read cache for the catalogue endpoints.
+
+Every cached catalogue response is addressed by a strong ETag derived from a
+cache key and the version counters of the scopes it depends on: the category
+and product collections, and each category and product. Writes bump the
+affected counters after they commit, which changes the ETag of every response
+that depended on them, so stale bodies are never served and never need to be
+deleted. A request whose ``If-None-Match`` matches the current ETag can be
+answered with 304 from the counters alone, without opening a database
+connection.
+
+The store is pluggable. :class:`MemoryBackend` is a bounded in-process LRU;
+:class:`RedisBackend` talks the Redis protocol to a shared server (or any
+local stand-in that speaks it). Counters that are missing from the store are
+seeded from the wall clock rather than from zero, so a restarted or evicted
+counter can never repeat a version an old ETag was built from. With the
+in-process backend each worker keeps its own counters, so a write made by
+another worker only becomes visible once the counter expires after
+``CATALOGUE_CACHE_TTL_SECONDS``.
+"""
+import hashlib
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from typing import Any, Protocol
+from urllib.parse import unquote, urlsplit
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = "categories"
+PRODUCTS = "products"
+# Stock levels and prices, i.e. product_availability.
+STOCK = "stock"
+
+
+def category_scope(category_id: int) -> str:
+    return f"category:{category_id}"
+
+
+def product_scope(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+class CacheUnavailable(Exception):
+    """Raised by a backend that cannot reach its store."""
+
+
+class CacheBackend(Protocol):
+    """Minimal key/value store the catalogue cache is built on."""
+
+    def get(self, key: str) -> bytes | None:
+        ...
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        ...
+
+    def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        """Store ``value`` only if ``key`` is absent; return whether it was stored."""
+
+    def incr(self, key: str) -> int:
+        ...
+
+
+class MemoryBackend:
+    """Bounded in-process LRU store with per-entry TTL."""
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float | None, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: bytes, ttl: float | None) -> None:
+        self._entries[key] = (None if ttl is None else self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            current = self._live(key)
+            expires = self._entries[key][0] if current is not None else None
+            value = int(current or 0) + 1
+            self._entries[key] = (expires, str(value).encode())
+            self._entries.move_to_end(key)
+            return value
+
+
+class RedisBackend:
+    """Store backed by a Redis-protocol server.
+
+    Speaks RESP2 over a plain socket, one connection per thread, so no client
+    library is required. ``url`` has the form
+    ``redis://[:password@]host[:port][/db]``.
+    """
+
+    def __init__(self, url: str, timeout: float = 0.25) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> Any:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        stream = sock.makefile("rwb")
+        self._local.sock, self._local.stream = sock, stream
+        if self.password is not None:
+            self._roundtrip("AUTH", self.password)
+        if self.db:
+            self._roundtrip("SELECT", self.db)
+        return stream
+
+    def _close(self) -> None:
+        for name in ("stream", "sock"):
+            handle = getattr(self._local, name, None)
+            if handle is not None:
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+                setattr(self._local, name, None)
+
+    def _roundtrip(self, *args: Any) -> Any:
+        stream = self._local.stream
+        encoded = [arg if isinstance(arg, bytes) else str(arg).encode() for arg in args]
+        payload = [b"*%d\r\n" % len(encoded)]
+        for arg in encoded:
+            payload.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        stream.write(b"".join(payload))
+        stream.flush()
+        return self._read(stream)
+
+    def _read(self, stream: Any) -> Any:
+        line = stream.readline()
+        if not line.endswith(b"\r\n"):
+            raise CacheUnavailable("Connection closed by cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body
+        if kind == b"-":
+            raise CacheUnavailable(body.decode(errors="replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = stream.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read(stream) for _ in range(length)]
+        raise CacheUnavailable(f"Unexpected reply from cache server: {line!r}")
+
+    def command(self, *args: Any) -> Any:
+        """Send one command and return its decoded reply."""
+
+        try:
+            if getattr(self._local, "stream", None) is None:
+                self._connect()
+            return self._roundtrip(*args)
+        except (OSError, ValueError, CacheUnavailable) as exc:
+            self._close()
+            raise CacheUnavailable(str(exc)) from exc
+
+    @staticmethod
+    def _expiry(ttl: float | None) -> list[Any]:
+        return [] if ttl is None else ["PX", max(1, int(ttl * 1000))]
+
+    def get(self, key: str) -> bytes | None:
+        return self.command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        self.command("SET", key, value, *self._expiry(ttl))
+
+    def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        return self.command("SET", key, value, "NX", *self._expiry(ttl)) is not None
+
+    def incr(self, key: str) -> int:
+        return self.command("INCR", key)
+
+
+class CatalogueCache:
+    """Version counters and response bodies for the catalogue endpoints.
+
+    Backend failures never fail a request: reads fall back to the database
+    and a failed bump is logged.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl_seconds: float,
+        version_ttl_seconds: float | None = None,
+        namespace: str = "catalogue",
+    ) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.version_ttl_seconds = version_ttl_seconds
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_not_modified(self) -> None:
+        """Count a request answered with 304 from its ETag."""
+
+        self._count("not_modified")
+
+    def _version_key(self, scope: str) -> str:
+        return f"{self.namespace}:v:{scope}"
+
+    def _seed(self, key: str) -> bytes:
+        # Seed from the clock so a lost counter restarts above any old value.
+        self.backend.add(key, str(time.time_ns()).encode(), self.version_ttl_seconds)
+        return self.backend.get(key) or b"0"
+
+    def _version(self, scope: str) -> bytes:
+        key = self._version_key(scope)
+        return self.backend.get(key) or self._seed(key)
+
+    def etag(self, key: str, scopes: Sequence[str]) -> str | None:
+        """Return the strong ETag of ``key`` at the current scope versions.
+
+        ``None`` means the cache is disabled or unreachable.
+        """
+
+        if not self.enabled:
+            return None
+        try:
+            versions = b",".join(self._version(scope) for scope in scopes)
+        except CacheUnavailable as exc:
+            self._count("errors")
+            logger.warning("Catalogue cache unavailable: %s", exc)
+            return None
+        digest = hashlib.blake2b(key.encode() + b"@" + versions, digest_size=16).hexdigest()
+        return f'"{digest}"'
+
+    def get_body(self, etag: str) -> bytes | None:
+        try:
+            body = self.backend.get(f"{self.namespace}:b:{etag}")
+        except CacheUnavailable:
+            self._count("errors")
+            body = None
+        self._count("misses" if body is None else "hits")
+        return body
+
+    def set_body(self, etag: str, body: bytes) -> None:
+        try:
+            self.backend.set(f"{self.namespace}:b:{etag}", body, self.ttl_seconds)
+        except CacheUnavailable:
+            self._count("errors")
+
+    def bump(self, *scopes: str) -> None:
+        """Invalidate every response that depends on ``scopes``.
+
+        Call it after the write has committed.
+        """
+
+        if not self.enabled:
+            return
+        for scope in scopes:
+            key = self._version_key(scope)
+            try:
+                if self.backend.get(key) is None:
+                    self._seed(key)
+                self.backend.incr(key)
+            except CacheUnavailable as exc:
+                self._count("errors")
+                logger.warning("Could not bump catalogue cache scope %s: %s", scope, exc)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "errors": self.errors,
+            }
+
+
+def build_catalogue_cache() -> CatalogueCache:
+    """Build the cache described by the ``CATALOGUE_CACHE_*`` settings."""
+
+    settings = get_settings()
+    ttl = settings.CATALOGUE_CACHE_TTL_SECONDS
+    if settings.CATALOGUE_CACHE_URL:
+        # Shared counters are authoritative, so they never expire.
+        return CatalogueCache(RedisBackend(settings.CATALOGUE_CACHE_URL), ttl)
+    return CatalogueCache(MemoryBackend(settings.CATALOGUE_CACHE_MAX_ENTRIES), ttl, version_ttl_seconds=ttl)
+
+
+catalogue_cache = build_catalogue_cache()
@@ -2,7 +2,7 @@
 from functools import lru_cache
 from typing import List, Any, Optional
 
-from pydantic import EmailStr, PostgresDsn, field_validator
+from pydantic import AnyUrl, EmailStr, PostgresDsn, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -22,6 +22,50 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
     VERIFICATION_EMAIL_SENDER: Optional[EmailStr] = None
     LOG_LEVEL: str = "INFO"
+    # Authenticated principal cache, see app/core/principals.py. A TTL of 0
+    # disables it.
+    AUTH_CACHE_TTL_SECONDS: float = 30.0
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Argon2 parameters; None keeps the passlib defaults. Stored hashes made
+    # with other parameters are upgraded on the next successful login.
+    ARGON2_TIME_COST: Optional[int] = None
+    ARGON2_MEMORY_COST: Optional[int] = None
+    ARGON2_PARALLELISM: Optional[int] = None
+    # Password hashing pool and login admission control, see app/core/hashing.py.
+    HASH_POOL_WORKERS: int = 2
+    HASH_POOL_MAX_QUEUE: int = 64
+    HASH_POOL_MAX_WAIT_SECONDS: float = 2.0
+
+    # External stock feed for /stocks/product-stock/sync: an http(s) URL or a
+    # JSON/CSV file path. Unset uses the built-in mock data.
+    STOCK_FEED_SOURCE: Optional[str] = None
+    STOCK_SYNC_CHUNK_SIZE: int = 1000
+    # Catalogue read cache, see app/core/catalogue_cache.py. Unset URL keeps an
+    # in-process LRU; a redis:// URL shares it across workers. A TTL of 0
+    # disables it.
+    CATALOGUE_CACHE_URL: Optional[str] = None
+    CATALOGUE_CACHE_TTL_SECONDS: float = 30.0
+    CATALOGUE_CACHE_MAX_ENTRIES: int = 10_000
+    # Per-request SQL budget, see app/core/query_budget.py. Mode is raise, log
+    # or off; unset means log in production and raise everywhere else.
+    SQL_BUDGET_MODE: Optional[str] = None
+    SQL_QUERY_BUDGET: int = 25
+    SQL_REPEAT_LIMIT: int = 5
+    SQL_BUDGET_SAMPLE_RATE: float = 0.01
+    # In-process autocomplete index behind /products/suggest, see
+    # app/core/autocomplete.py. It is rebuilt every refresh interval to pick up
+    # popularity and writes served by other workers; 0 only builds it at startup.
+    # Prefixes up to AUTOCOMPLETE_PREFIX_LENGTH characters keep precomputed
+    # suggestions; longer ones scan their (narrow) range of the index.
+    AUTOCOMPLETE_ENABLED: bool = True
+    AUTOCOMPLETE_REFRESH_SECONDS: float = 600.0
+    AUTOCOMPLETE_PREFIX_LENGTH: int = 6
+    # Upper bounds of the price facet buckets of /products/; the last bucket
+    # is open-ended.
+    PRICE_FACET_BOUNDARIES: List[float] = [10, 25, 50, 100, 250, 500, 1000]
+    # Rows per server-side cursor round trip for the /exports endpoints.
+    EXPORT_PARTITION_SIZE: int = 1000
 
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
@@ -29,7 +73,24 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
 
-    DATABASE_URL: Optional[PostgresDsn] = None
+    # PostgreSQL in deployments; a sqlite:/// file URL works for local benchmarks.
+    DATABASE_URL: Optional[PostgresDsn | AnyUrl] = None
+    # Serve the API routers through the asyncio engine. Disabling it falls back
+    # to the threadpool-backed sync routers, which is handy for A/B benchmarks.
+    DB_ASYNC_ENABLED: bool = True
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Read replicas of DATABASE_URL serving GET requests, see app/db/replicas.py.
+    # Empty sends every request to the primary.
+    DATABASE_REPLICA_URLS: List[str] = []
+    # "round_robin" or "least_connections" (fewest checked-out connections).
+    DB_REPLICA_POLICY: str = "round_robin"
+    DB_REPLICA_HEALTH_INTERVAL_SECONDS: float = 5.0
+    # Replicas further behind the primary leave the rotation (PostgreSQL only; 0 disables).
+    DB_REPLICA_MAX_LAG_SECONDS: float = 0.0
+    # After a write, the client reads from the primary until a replica has
+    # replayed it (PostgreSQL), and for at most this long; 0 disables it.
+    DB_REPLICA_STICKY_SECONDS: float = 5.0
 
     @field_validator("VERIFICATION_EMAIL_SENDER", mode="before")
     def validate_email(cls, v: Optional[str]) -> Optional[str]:
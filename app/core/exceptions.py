@@ -11,6 +11,8 @@ from sqlalchemy.exc import (
 )
 import logging
 
+from app.core.query_budget import QueryBudgetExceeded
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +30,15 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+async def query_budget_exception_handler(request: Request, exc: QueryBudgetExceeded) -> JSONResponse:
+    """Answer a request whose commit was refused by the SQL budget; nothing was written."""
+
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": f"SQL budget exceeded: {exc}"},
+    )
+
+
 async def sqlalchemy_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Handle SQLAlchemy exceptions and return user-friendly error messages."""
     
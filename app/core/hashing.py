@@ -0,0 +1,190 @@
+"""Off-loop password hashing with admission control.
+
+Argon2 is deliberately slow and memory hard. Running it on the event loop, or
+on the shared AnyIO threadpool, lets a burst of logins starve every other
+request. :class:`PasswordHasher` runs hash and verify calls in a dedicated,
+size-bounded process pool instead:
+
+* at most ``workers`` calls execute at once; further calls wait in a queue,
+* at most ``max_queue`` calls may wait, and none waits longer than
+  ``max_wait`` seconds; beyond that :class:`HasherOverloaded` (HTTP 503 with
+  ``Retry-After``) is raised so clients back off instead of piling up,
+* verification reports a replacement hash whenever the stored one was made
+  with outdated Argon2 parameters, so callers can rehash transparently.
+
+The module has no dependency on either settings object; both stacks share the
+instance of :func:`app.core.security.get_password_hasher`.
+"""
+import asyncio
+import math
+import multiprocessing
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.metrics import HASH_LATENCY, HASH_REJECTED, HASH_WAIT
+
+_worker_context: CryptContext | None = None
+
+_HASH_LABELS = ("hash",)
+_VERIFY_LABELS = ("verify",)
+
+
+def _init_worker(context_kwargs: dict[str, Any]) -> None:
+    global _worker_context
+    _worker_context = CryptContext(**context_kwargs)
+
+
+def _hash(password: str) -> str:
+    return _worker_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return _worker_context.verify_and_update(password, hashed_password)
+
+
+def argon2_context_kwargs(
+    time_cost: int | None = None, memory_cost: int | None = None, parallelism: int | None = None
+) -> dict[str, Any]:
+    """Return ``CryptContext`` arguments for Argon2 with the given parameters.
+
+    Parameters left as ``None`` keep the passlib defaults.
+    """
+
+    kwargs: dict[str, Any] = {"schemes": ["argon2"], "deprecated": "auto"}
+    for name, value in (
+        ("time_cost", time_cost),
+        ("memory_cost", memory_cost),
+        ("parallelism", parallelism),
+    ):
+        if value is not None:
+            kwargs[f"argon2__{name}"] = value
+    return kwargs
+
+
+class HasherOverloaded(HTTPException):
+    """Raised when a hashing call cannot be admitted in time."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is temporarily overloaded, please retry shortly",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class PasswordHasher:
+    """Process-pool backed Argon2 hasher with a bounded wait queue."""
+
+    def __init__(
+        self,
+        context_kwargs: dict[str, Any],
+        workers: int = 2,
+        max_queue: int = 64,
+        max_wait: float = 2.0,
+    ) -> None:
+        self.context_kwargs = context_kwargs
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._executor: ProcessPoolExecutor | None = None
+        # One semaphore per event loop: a semaphore is bound to the loop it
+        # was first awaited on.
+        self._slots: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.rejected = 0
+        self.completed = 0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+        self.wait_seconds_total = 0.0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.context_kwargs,),
+            )
+        return self._executor
+
+    def _reject(self) -> HasherOverloaded:
+        self.rejected += 1
+        HASH_REJECTED.inc()
+        return HasherOverloaded(retry_after=max(1, math.ceil(self.max_wait)))
+
+    def _loop_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.workers)
+        return slots
+
+    async def _run(self, fn, labels: tuple, *args):
+        slots = self._loop_slots()
+        if self.queue_depth >= self.max_queue:
+            raise self._reject()
+        self.queue_depth += 1
+        queued = time.perf_counter()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            raise self._reject() from None
+        finally:
+            self.queue_depth -= 1
+        started = time.perf_counter()
+        self.wait_seconds_total += started - queued
+        HASH_WAIT.observe(labels, started - queued)
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool(), fn, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight -= 1
+            self.completed += 1
+            self.hash_seconds_total += elapsed
+            self.hash_seconds_max = max(self.hash_seconds_max, elapsed)
+            HASH_LATENCY.observe(labels, elapsed)
+            slots.release()
+
+    async def hash(self, password: str) -> str:
+        """Return a new Argon2 hash of ``password``."""
+
+        return await self._run(_hash, _HASH_LABELS, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """Verify ``password`` and return ``(valid, new_hash)``.
+
+        ``new_hash`` is only set when the password is valid and the stored
+        hash was produced with parameters other than the current ones.
+        """
+
+        return await self._run(_verify_and_update, _VERIFY_LABELS, password, hashed_password)
+
+    def stats(self) -> dict[str, float]:
+        """Return queue depth and hashing latency counters."""
+
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "hash_seconds_total": self.hash_seconds_total,
+            "hash_seconds_max": self.hash_seconds_max,
+            "wait_seconds_total": self.wait_seconds_total,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,277 @@
+"""Prometheus metrics for both API stacks.
+
+Collectors are designed for the request hot path: a sample is recorded by
+looking up a tuple of label values that already exist as objects (method,
+route template, status code, engine name) and bumping a few numbers under a
+lock. Nothing is formatted until :func:`render` runs on a scrape of
+``/metrics``.
+
+The module does not read either settings object, so the legacy stack can
+instrument its engines with it too.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.timing import RequestTimings, current_timings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_registry: list["_Metric"] = []
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.type}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(_Metric):
+    """Monotonic counter keyed by a tuple of label values."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class _Series:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """Histogram with fixed upper bounds keyed by a tuple of label values."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, _Series] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = _Series(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.sum += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            snapshot = [(labels, list(s.counts), s.sum) for labels, s in self._series.items()]
+        bounds = [*self.buckets, float("inf")]
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are produced by ``callback`` at scrape time."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Iterable[tuple[tuple, float]]],
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.callback():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency up to the last body byte.",
+    ("method", "route", "status"),
+)
+ROUTE_SQL_STATEMENTS = Counter(
+    "http_request_sql_statements_total", "SQL statements executed while serving a route.", ("method", "route")
+)
+ROUTE_SQL_LATENCY = Histogram(
+    "http_request_sql_duration_seconds",
+    "Total SQL time per request.",
+    ("method", "route"),
+    buckets=SQL_BUCKETS,
+)
+SQL_LATENCY = Histogram(
+    "db_statement_duration_seconds", "Duration of single SQL statements.", ("engine",), buckets=SQL_BUCKETS
+)
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection.", ("engine",), buckets=SQL_BUCKETS
+)
+HASH_LATENCY = Histogram(
+    "password_hash_duration_seconds",
+    "Argon2 hash and verify time in the hashing pool.",
+    ("operation",),
+    buckets=HASH_BUCKETS,
+)
+HASH_WAIT = Histogram(
+    "password_hash_wait_seconds", "Time calls waited for a hashing slot.", ("operation",), buckets=HASH_BUCKETS
+)
+HASH_REJECTED = Counter("password_hash_rejected_total", "Hashing calls rejected by admission control.")
+
+_engines: dict[str, Engine] = {}
+
+
+def _pool_stats(attribute: str) -> Callable[[], Iterable[tuple[tuple, float]]]:
+    def collect() -> Iterable[tuple[tuple, float]]:
+        for name, engine in list(_engines.items()):
+            getter = getattr(engine.pool, attribute, None)
+            if getter is not None:
+                yield (name,), getter()
+
+    return collect
+
+
+CallbackGauge("db_pool_checked_out", "Connections currently checked out.", ("engine",), _pool_stats("checkedout"))
+CallbackGauge("db_pool_overflow", "Connections open beyond the pool size.", ("engine",), _pool_stats("overflow"))
+CallbackGauge("db_pool_size", "Configured pool size.", ("engine",), _pool_stats("size"))
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Record statement latency, pool state and per-request SQL time for ``engine``.
+
+    Pass ``async_engine.sync_engine`` for asyncio engines.
+    """
+
+    labels = (name,)
+    _engines[name] = engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        context._metrics_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - context._metrics_started
+        SQL_LATENCY.observe(labels, elapsed)
+        timings = current_timings()
+        if timings is not None:
+            timings.db += elapsed
+            timings.db_queries += 1
+            statements = timings.statements
+            statements[statement] = statements.get(statement, 0) + 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def timed_pool(base: type) -> type:
+    """Return a subclass of the pool class ``base`` that records checkout waits.
+
+    The engine name is taken from the pool's ``logging_name``.
+    """
+
+    class TimedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                POOL_WAIT.observe((self.logging_name or "default",), time.perf_counter() - started)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def route_label(scope: dict) -> str:
+    """Return the matched route template, never the raw path, to bound cardinality."""
+
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def observe_request(method: str, route: str, status: int, elapsed: float, timings: RequestTimings) -> None:
+    """Record one finished request and the SQL it ran."""
+
+    labels = (method, route, status)
+    REQUESTS.inc(labels)
+    REQUEST_LATENCY.observe(labels, elapsed)
+    route_labels = (method, route)
+    ROUTE_SQL_STATEMENTS.inc(route_labels, timings.db_queries)
+    ROUTE_SQL_LATENCY.observe(route_labels, timings.db)
+
+
+def render() -> str:
+    """Return every metric in the Prometheus text exposition format."""
+
+    return "".join(metric.render() for metric in _registry)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Serve :func:`render` for Prometheus scrapes."""
+
+    return Response(render(), media_type=CONTENT_TYPE)
@@ -1,48 +1,99 @@
-"""Middleware for logging requests and responses."""
+"""Middleware for timing and logging requests."""
+import json
 import logging
 import time
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import observe_request, route_label
+from app.core.query_budget import budget_policy, route_budget
+from app.core.timing import end_request, start_request
 
 logger = logging.getLogger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Log all incoming requests and outgoing responses."""
-    
-    async def dispatch(self, request: Request, call_next):
-        """Process the request and log information."""
-        
-        # Log request
-        start_time = time.time()
-        logger.info(
-            f"Request: {request.method} {request.url.path} "
-            f"Query params: {dict(request.query_params)}"
-        )
-        
-        # Process request
+class RequestTimingMiddleware:
+    """Time every HTTP request and report where the latency went.
+
+    A pure ASGI middleware: messages are passed straight through, so
+    streaming responses keep streaming. The ``Server-Timing`` header is added
+    to the response start message and one log line is written once the body
+    has been sent, formatted only if INFO logging is enabled. The request is
+    then recorded in the Prometheus collectors under its route template.
+
+    The SQL run up to the response start is checked against the route's
+    query budget; when the policy says so and nothing was committed, the
+    response is replaced by a 500. Commits are checked by the session hook
+    of :mod:`app.core.query_budget` before they happen.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request()
+        timings.scope = scope
+        status_code = 500
+        over_budget = False
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code, over_budget
+            if message["type"] == "http.response.start":
+                problem = None
+                if not timings.budget_exceeded:
+                    problem = budget_policy.check(
+                        timings, route_budget(scope), scope["method"], route_label(scope)
+                    )
+                if problem is not None and not timings.committed:
+                    over_budget = True
+                    body = json.dumps({"detail": f"SQL budget exceeded: {problem}"}).encode()
+                    message = {
+                        "type": "http.response.start",
+                        "status": 500,
+                        "headers": [(b"content-type", b"application/json")],
+                    }
+                status_code = message["status"]
+                now = time.perf_counter()
+                headers = list(message.get("headers", ()))
+                headers.append((b"server-timing", timings.server_timing(now).encode("latin-1")))
+                headers.append((b"x-process-time", f"{now - timings.started:.6f}".encode("latin-1")))
+                message = {**message, "headers": headers}
+                await send(message)
+                if over_budget:
+                    await send({"type": "http.response.body", "body": body})
+                return
+            if not over_budget:
+                await send(message)
+
         try:
-            response = await call_next(request)
-            
-            # Log response
-            process_time = time.time() - start_time
-            logger.info(
-                f"Response: {request.method} {request.url.path} "
-                f"Status: {response.status_code} "
-                f"Duration: {process_time:.3f}s"
-            )
-            
-            # Add custom headers
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            return response
-            
-        except Exception as e:
-            process_time = time.time() - start_time
+            await self.app(scope, receive, send_with_timing)
+        except Exception as exc:
             logger.error(
-                f"Error: {request.method} {request.url.path} "
-                f"Exception: {type(e).__name__}: {str(e)} "
-                f"Duration: {process_time:.3f}s"
+                "Error: %s %s Exception: %s: %s Duration: %.3fs",
+                scope["method"],
+                scope["path"],
+                type(exc).__name__,
+                exc,
+                time.perf_counter() - timings.started,
             )
             raise
-
+        finally:
+            end_request(token)
+            elapsed = time.perf_counter() - timings.started
+            observe_request(scope["method"], route_label(scope), status_code, elapsed, timings)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "%s %s %d %.1fms auth=%.1fms db=%.1fms/%d handler=%.1fms",
+                scope["method"],
+                scope["path"],
+                status_code,
+                elapsed * 1000,
+                timings.auth * 1000,
+                timings.db * 1000,
+                timings.db_queries,
+                timings.handler * 1000,
+            )
@@ -0,0 +1,125 @@
+"""In-process cache of authenticated principals.
+
+Resolving the bearer token to a user used to cost a ``users`` lookup on every
+authenticated request. The cache keeps a small immutable snapshot of each user
+keyed by the token subject so most requests authenticate without touching the
+database. Entries expire after ``AUTH_CACHE_TTL_SECONDS``, which also bounds
+how long other worker processes can serve a stale role; the process that
+changes a user invalidates its own entry immediately.
+"""
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.core.config import get_settings
+from app.models import User, UserRoleEnum
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Snapshot of the user attributes needed to authorise a request."""
+
+    id: int
+    email: str
+    role: UserRoleEnum
+    is_active: bool
+    is_verified: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            created_at=user.created_at,
+        )
+
+
+class PrincipalCache:
+    """Bounded LRU cache with per-entry TTL.
+
+    The cache is shared by the asyncio routers and the threadpool routers, so
+    every operation holds a lock; each one is O(1).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, subject: str) -> Principal | None:
+        """Return the cached principal for ``subject`` if it has not expired."""
+
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[subject]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, subject: str, principal: Principal) -> None:
+        """Store ``principal``, evicting the least recently used entry when full."""
+
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[subject] = (self._clock() + self.ttl_seconds, principal)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, subject: str) -> None:
+        """Drop the entry for ``subject`` after the underlying user changed."""
+
+        with self._lock:
+            if self._entries.pop(subject, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and the current size."""
+
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_settings = get_settings()
+principal_cache = PrincipalCache(
+    max_entries=_settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=_settings.AUTH_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,246 @@
+"""Per-request SQL query budgets and N+1 detection.
+
+Every statement executed while serving a request is recorded in the
+request's :class:`~app.core.timing.RequestTimings` by the engine hooks of
+:func:`app.core.metrics.instrument_engine`, keyed by its SQL text. The
+recording is checked against the route's budget before every commit and
+when the response starts:
+
+* at most ``max_statements`` statements in total,
+* no statement shape repeated more than ``max_repeats`` times. Shapes are
+  compared after literals, bind parameters and expanded ``IN`` lists have
+  been normalised, so a per-row loop shows up as one shape with a high count.
+
+Routes declare their budget with :func:`query_budget`; others get the
+``SQL_QUERY_BUDGET`` / ``SQL_REPEAT_LIMIT`` defaults. A route whose SQL grows
+with its input in bounded steps, such as one bulk statement per chunk of a
+feed, declares its fixed part and grants the rest with
+:func:`allow_statements` once it knows the input. In ``raise`` mode (the
+default outside production) a violating request is answered with 500 so the
+regression fails its test; in ``log`` mode a sampled warning is logged.
+
+A request is only failed while nothing it wrote has been committed: the
+commit itself raises :class:`QueryBudgetExceeded`, which rolls the
+transaction back, and once a commit went through a violation found at the
+response start is logged without replacing the response. A client never sees
+a 500 for a write that was persisted, so retrying cannot duplicate it.
+"""
+import logging
+import random
+import re
+from collections import Counter
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.metrics import route_label
+from app.core.timing import RequestTimings, current_timings, end_request, start_request
+
+logger = logging.getLogger(__name__)
+
+EndpointT = TypeVar("EndpointT", bound=Callable[..., Any])
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND = re.compile(r"\$\d+|%\(\w+\)s|(?<!:):\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST = re.compile(r"\(\?(?:, \?)*\)(?:, \(\?(?:, \?)*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised when a request or block runs more SQL than its budget allows."""
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """Statement limits for one route. ``None`` falls back to the defaults."""
+
+    max_statements: int | None = None
+    max_repeats: int | None = None
+
+
+def query_budget(
+    max_statements: int | None = None, max_repeats: int | None = None
+) -> Callable[[EndpointT], EndpointT]:
+    """Declare the SQL budget of an endpoint.
+
+    Apply it below the router decorator::
+
+        @router.get("/{order_id}")
+        @query_budget(max_statements=3)
+        async def get_order(...):
+    """
+
+    def decorate(endpoint: EndpointT) -> EndpointT:
+        endpoint.query_budget = QueryBudget(max_statements, max_repeats)
+        return endpoint
+
+    return decorate
+
+
+def allow_statements(statements: int, repeats: int | None = None) -> None:
+    """Raise the current request's budget by ``statements``.
+
+    ``repeats`` raises the per-shape limit too and defaults to ``statements``,
+    for statements that share one shape. Does nothing outside a request.
+    """
+
+    timings = current_timings()
+    if timings is not None:
+        timings.extra_statements += statements
+        timings.extra_repeats += statements if repeats is None else repeats
+
+
+def normalize_sql(statement: str) -> str:
+    """Return the shape of ``statement`` with all values replaced by ``?``."""
+
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _BIND.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _WHITESPACE.sub(" ", shape).strip()
+    shape = _VALUES_LIST.sub("(?...), ...", shape)
+    return _IN_LIST.sub("(?...)", shape)
+
+
+def statement_shapes(statements: Mapping[str, int]) -> Counter:
+    """Group recorded statement counts by normalised shape."""
+
+    shapes: Counter = Counter()
+    for statement, count in statements.items():
+        shapes[normalize_sql(statement)] += count
+    return shapes
+
+
+@dataclass(frozen=True)
+class QueryBudgetPolicy:
+    """How budgets are enforced: ``raise``, ``log`` or ``off``."""
+
+    mode: str
+    max_statements: int
+    max_repeats: int
+    sample_rate: float
+
+    @classmethod
+    def from_settings(cls) -> "QueryBudgetPolicy":
+        settings = get_settings()
+        mode = settings.SQL_BUDGET_MODE
+        if mode is None:
+            mode = "log" if settings.APP_ENVIRONMENT == "production" else "raise"
+        return cls(
+            mode=mode,
+            max_statements=settings.SQL_QUERY_BUDGET,
+            max_repeats=settings.SQL_REPEAT_LIMIT,
+            sample_rate=settings.SQL_BUDGET_SAMPLE_RATE,
+        )
+
+    def resolve(self, budget: QueryBudget | None) -> tuple[int, int]:
+        """Return the effective ``(max_statements, max_repeats)`` for ``budget``."""
+
+        budget = budget or QueryBudget()
+        return (
+            self.max_statements if budget.max_statements is None else budget.max_statements,
+            self.max_repeats if budget.max_repeats is None else budget.max_repeats,
+        )
+
+    def violation(self, timings: RequestTimings, budget: QueryBudget | None) -> str | None:
+        """Describe how ``timings`` breaks ``budget``, or return ``None``."""
+
+        max_statements, max_repeats = self.resolve(budget)
+        max_statements += timings.extra_statements
+        max_repeats += timings.extra_repeats
+        # No shape can repeat more often than statements were run in total.
+        if timings.db_queries <= min(max_statements, max_repeats):
+            return None
+        problems = []
+        if timings.db_queries > max_statements:
+            problems.append(f"{timings.db_queries} statements exceed the budget of {max_statements}")
+        for shape, count in statement_shapes(timings.statements).most_common():
+            if count <= max_repeats:
+                break
+            problems.append(f"{count}x (limit {max_repeats}): {shape[:200]}")
+        return "; ".join(problems) or None
+
+    def check(self, timings: RequestTimings, budget: QueryBudget | None, *where: str) -> str | None:
+        """Apply the policy and return the violation if it must fail the request.
+
+        ``where`` names the request or block in the log line.
+        """
+
+        if self.mode == "off":
+            return None
+        if self.mode == "log" and random.random() >= self.sample_rate:
+            return None
+        problem = self.violation(timings, budget)
+        if problem is None:
+            return None
+        if self.mode == "raise":
+            logger.error("SQL budget exceeded by %s: %s", " ".join(where), problem)
+            return problem
+        logger.warning("SQL budget exceeded by %s: %s", " ".join(where), problem)
+        return None
+
+
+budget_policy = QueryBudgetPolicy.from_settings()
+
+
+def route_budget(scope: Mapping[str, Any]) -> QueryBudget | None:
+    """Return the budget declared on the endpoint matched for ``scope``."""
+
+    endpoint = getattr(scope.get("route"), "endpoint", None)
+    return getattr(endpoint, "query_budget", None)
+
+
+@event.listens_for(Session, "before_commit")
+def _check_before_commit(session: Session) -> None:
+    timings = current_timings()
+    if budget_policy.mode != "raise" or timings is None or timings.scope is None:
+        return
+    if timings.budget_exceeded:
+        return
+    scope = timings.scope
+    problem = budget_policy.check(timings, route_budget(scope), scope["method"], route_label(scope))
+    if problem is not None:
+        timings.budget_exceeded = True
+        raise QueryBudgetExceeded(problem)
+
+
+@event.listens_for(Session, "after_commit")
+def _record_commit(session: Session) -> None:
+    timings = current_timings()
+    if timings is not None:
+        timings.committed = True
+
+
+@contextmanager
+def statement_budget(
+    max_statements: int | None = None,
+    max_repeats: int | None = None,
+    policy: QueryBudgetPolicy | None = None,
+) -> Iterator[RequestTimings]:
+    """Record the SQL run inside the block and check it on exit.
+
+    Meant for tests and scripts exercising services outside a request. In
+    ``raise`` mode a violation raises :class:`QueryBudgetExceeded`.
+    """
+
+    policy = policy or budget_policy
+    outer = current_timings()
+    timings, token = start_request()
+    try:
+        yield timings
+    finally:
+        end_request(token)
+        if outer is not None:
+            outer.db += timings.db
+            outer.db_queries += timings.db_queries
+            for statement, count in timings.statements.items():
+                outer.statements[statement] = outer.statements.get(statement, 0) + count
+    problem = policy.check(timings, QueryBudget(max_statements, max_repeats), "block")
+    if problem is not None:
+        raise QueryBudgetExceeded(problem)
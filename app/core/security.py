@@ -1,13 +1,38 @@
 """Security helpers for authentication and password hashing."""
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Dict
 
 import jwt
 from passlib.context import CryptContext
 
 from app.core.config import get_settings
+from app.core.hashing import PasswordHasher, argon2_context_kwargs
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+
+def _context_kwargs() -> Dict[str, Any]:
+    settings = get_settings()
+    return argon2_context_kwargs(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+
+pwd_context = CryptContext(**_context_kwargs())
+
+
+@lru_cache
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide off-loop password hasher."""
+
+    settings = get_settings()
+    return PasswordHasher(
+        _context_kwargs(),
+        workers=settings.HASH_POOL_WORKERS,
+        max_queue=settings.HASH_POOL_MAX_QUEUE,
+        max_wait=settings.HASH_POOL_MAX_WAIT_SECONDS,
+    )
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: timedelta | None = None) -> str:
@@ -35,12 +60,34 @@ def verify_token(token: str) -> Dict[str, Any]:
 
 
 def get_password_hash(password: str) -> str:
-    """Return a password hash using Argon2."""
+    """Return a password hash using Argon2.
+
+    Blocks the calling thread; request handlers should use
+    :func:`hash_password` instead.
+    """
 
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hash."""
+    """Verify a plain password against a hash.
+
+    Blocks the calling thread; request handlers should use
+    :func:`verify_and_update_password` instead.
+    """
 
     return pwd_context.verify(plain_password, hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password in the dedicated hashing pool."""
+
+    return await get_password_hasher().hash(password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify a password in the hashing pool; see :meth:`PasswordHasher.verify_and_update`."""
+
+    return await get_password_hasher().verify_and_update(plain_password, hashed_password)
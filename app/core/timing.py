@@ -0,0 +1,138 @@
+"""Per-request latency breakdown.
+
+:class:`RequestTimings` collects the phases reported in the ``Server-Timing``
+header. It lives in a context variable set by
+:class:`app.core.middleware.RequestTimingMiddleware`, so it is visible from
+dependencies, endpoints running in the threadpool and SQLAlchemy event hooks
+alike:
+
+* ``auth`` is recorded by the authentication dependencies,
+* ``db`` and the query count by the cursor hooks
+  :func:`app.core.metrics.instrument_engine` installs on every engine,
+* ``handler`` by :class:`TimedRoute`, which wraps the endpoint call,
+* ``serialize`` is the time from the endpoint returning to the response
+  headers being sent, i.e. response validation and encoding.
+
+``db`` overlaps the other phases: a user lookup during authentication counts
+towards both ``auth`` and ``db``.
+"""
+import functools
+import inspect
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi.routing import APIRoute
+
+
+@dataclass
+class RequestTimings:
+    """Durations, in seconds, accumulated while serving one request."""
+
+    started: float = field(default_factory=time.perf_counter)
+    auth: float = 0.0
+    db: float = 0.0
+    db_queries: int = 0
+    # Executions per SQL text, checked by app.core.query_budget.
+    statements: dict[str, int] = field(default_factory=dict)
+    handler: float = 0.0
+    handler_finished: float | None = None
+    # ASGI scope of the request, for the route's query budget.
+    scope: Any = None
+    # Whether a session committed while serving the request.
+    committed: bool = False
+    # Whether the query budget already failed the request.
+    budget_exceeded: bool = False
+    # Statements and repeats granted on top of the route's budget at run time.
+    extra_statements: int = 0
+    extra_repeats: int = 0
+
+    def server_timing(self, now: float) -> str:
+        """Render the ``Server-Timing`` header value at time ``now``."""
+
+        serialize = now - self.handler_finished if self.handler_finished is not None else 0.0
+        return ", ".join(
+            (
+                f"auth;dur={self.auth * 1000:.2f}",
+                f'db;dur={self.db * 1000:.2f};desc="{self.db_queries} queries"',
+                f"handler;dur={self.handler * 1000:.2f}",
+                f"serialize;dur={serialize * 1000:.2f}",
+                f"total;dur={(now - self.started) * 1000:.2f}",
+            )
+        )
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> RequestTimings | None:
+    """Return the timings of the request being served, if any."""
+
+    return _current.get()
+
+
+def start_request() -> tuple[RequestTimings, Any]:
+    """Start timing a request; pass the returned token to :func:`end_request`."""
+
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token: Any) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def timed_auth() -> Iterator[None]:
+    """Add the time spent in the block to the ``auth`` phase."""
+
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.auth += time.perf_counter() - started
+
+
+def _timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    def _record(started: float) -> None:
+        timings = _current.get()
+        if timings is not None:
+            timings.handler_finished = time.perf_counter()
+            timings.handler += timings.handler_finished - started
+
+    if inspect.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _record(started)
+
+    else:
+
+        @functools.wraps(call)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                _record(started)
+
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """Route class that records the endpoint's own run time as ``handler``."""
+
+    def get_route_handler(self) -> Callable:
+        self.dependant.call = _timed_endpoint(self.endpoint)
+        return super().get_route_handler()
@@ -0,0 +1,313 @@
+"""Routing of read-only requests to database replicas.
+
+``GET``/``HEAD`` requests are served from a replica picked round-robin or by
+fewest checked-out connections among the healthy ones; everything else goes
+to the primary.
+
+Reads see the client's own writes. A response to a request that committed
+carries its write position in the ``db_written`` cookie and the
+``X-DB-Written`` header. The position is the primary's WAL LSN on PostgreSQL
+plus the wall-clock time. A later read that sends the position back, in the
+cookie or the header, is only served by a replica that has replayed past it,
+which the health probe records. Where the LSN is unknown, it is served by
+any replica once ``DB_REPLICA_STICKY_SECONDS`` have passed. Until then it
+goes to the primary. The position travels with the client, so any worker
+honours it, for anonymous clients too. A ``create_order`` followed by
+``get_order`` therefore sees its own order while the replicas catch up.
+
+A request may force its route with the ``X-DB-Route: primary`` or
+``X-DB-Route: replica`` header; the latter skips the stickiness, not the
+health checks. Replicas are probed every
+``DB_REPLICA_HEALTH_INTERVAL_SECONDS``, and one that fails a request with a
+connection error is taken out of rotation until its next successful probe.
+
+Any database the primary's URL scheme supports can act as a replica, so two
+SQLite files, or two PostgreSQL databases on one host, are enough to
+exercise the routing locally (``benchmarks/load.py --replica-url`` copies a
+SQLite primary over its replicas).
+"""
+import asyncio
+import itertools
+import logging
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+
+from fastapi import Request
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import CallbackGauge
+from app.core.timing import current_timings
+
+logger = logging.getLogger(__name__)
+
+ROUTE_HEADER = "x-db-route"
+WRITTEN_COOKIE = "db_written"
+WRITTEN_HEADER = "x-db-written"
+READ_METHODS = frozenset({"GET", "HEAD"})
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+
+# Touches a table so an empty or never-migrated SQLite file fails the probe.
+_PROBE = text("SELECT 1 FROM products LIMIT 1")
+_LAG = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+)
+# NULL on a server that is not replaying, whose position is then unknown.
+_REPLAYED = text("SELECT pg_last_wal_replay_lsn()::text")
+_CURRENT = text("SELECT pg_current_wal_lsn()::text")
+
+
+def parse_lsn(lsn: str | None) -> int | None:
+    """Return the PostgreSQL LSN ``"16/B374D848"`` as an integer."""
+
+    if not lsn:
+        return None
+    high, _, low = lsn.partition("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+@dataclass(frozen=True)
+class WritePosition:
+    """Where the primary stood after a client's write."""
+
+    written_at: float
+    lsn: int | None = None
+
+    def encode(self) -> str:
+        return f"{self.written_at:.3f}" if self.lsn is None else f"{self.written_at:.3f}-{self.lsn:x}"
+
+    @classmethod
+    def decode(cls, value: str | None) -> "WritePosition | None":
+        if not value:
+            return None
+        written_at, _, lsn = value.partition("-")
+        try:
+            return cls(float(written_at), int(lsn, 16) if lsn else None)
+        except ValueError:
+            return None
+
+
+@dataclass
+class Replica:
+    """One read replica with its sync and asyncio engines."""
+
+    name: str
+    engine: Engine
+    async_engine: AsyncEngine
+    healthy: bool = True
+    lag_seconds: float | None = None
+    # WAL position replayed as of the last probe; None where it is unknown.
+    replayed_lsn: int | None = None
+    last_error: str | None = None
+    session: sessionmaker = field(init=False)
+    async_session: async_sessionmaker = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.session = sessionmaker(
+            autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine
+        )
+        self.async_session = async_sessionmaker(
+            bind=self.async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+        )
+
+    def connections(self) -> int:
+        return self.engine.pool.checkedout() + self.async_engine.sync_engine.pool.checkedout()
+
+
+class ReplicaSet:
+    """The replicas of the primary and the routing state shared by requests."""
+
+    def __init__(
+        self,
+        replicas: list[Replica],
+        policy: str = ROUND_ROBIN,
+        sticky_seconds: float = 5.0,
+        max_lag_seconds: float = 0.0,
+        primary: AsyncEngine | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if policy not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica policy {policy!r}")
+        self.replicas = replicas
+        self.policy = policy
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.primary = primary
+        # Wall clock: write positions are compared across workers and hosts.
+        self._clock = clock
+        self._turn = itertools.count()
+        self._checker: asyncio.Task | None = None
+
+    def _caught_up(self, replica: Replica, position: WritePosition | None) -> bool:
+        if position is None:
+            return True
+        if position.lsn is not None and replica.replayed_lsn is not None:
+            return replica.replayed_lsn >= position.lsn
+        return self._clock() >= position.written_at + self.sticky_seconds
+
+    def choose(self, position: WritePosition | None = None) -> Replica | None:
+        """Return a healthy replica that has replayed ``position``, or ``None`` for the primary."""
+
+        healthy = [
+            replica for replica in self.replicas if replica.healthy and self._caught_up(replica, position)
+        ]
+        if not healthy:
+            return None
+        if self.policy == LEAST_CONNECTIONS:
+            return min(healthy, key=Replica.connections)
+        return healthy[next(self._turn) % len(healthy)]
+
+    def _written(self, request: Request) -> WritePosition | None:
+        position = WritePosition.decode(
+            request.headers.get(WRITTEN_HEADER) or request.cookies.get(WRITTEN_COOKIE)
+        )
+        if position is None:
+            return None
+        # Positions are honoured for at most the sticky window, so a stale or
+        # forged one cannot pin a client to the primary.
+        now = self._clock()
+        if abs(now - position.written_at) >= self.sticky_seconds:
+            return None
+        return position
+
+    def route(self, request: Request) -> Replica | None:
+        """Return the replica that serves ``request``, or ``None`` for the primary."""
+
+        if not self.replicas or request.method not in READ_METHODS:
+            return None
+        override = request.headers.get(ROUTE_HEADER, "").lower()
+        if override == "primary":
+            return None
+        if override == "replica":
+            return self.choose()
+        return self.choose(self._written(request))
+
+    async def write_position(self) -> WritePosition:
+        """Return the primary's current position, to be handed to the client that wrote."""
+
+        lsn = None
+        if self.primary is not None and self.primary.dialect.name == "postgresql":
+            try:
+                async with self.primary.connect() as conn:
+                    lsn = parse_lsn(await conn.scalar(_CURRENT))
+            except Exception as exc:  # noqa: BLE001 - fall back to the sticky window
+                logger.warning("Could not read the primary's WAL position: %s", exc)
+        return WritePosition(self._clock(), lsn)
+
+    def fail(self, replica: Replica, exc: BaseException) -> None:
+        """Take ``replica`` out of rotation until its next successful probe."""
+
+        if replica.healthy:
+            logger.warning("Replica %s failed a request, routing reads elsewhere: %s", replica.name, exc)
+        replica.healthy = False
+        replica.last_error = str(exc)
+
+    def check(self) -> None:
+        """Probe every replica and update its health."""
+
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    conn.execute(_PROBE)
+                    lag = replayed = None
+                    if conn.dialect.name == "postgresql":
+                        lag = conn.scalar(_LAG)
+                        replayed = parse_lsn(conn.scalar(_REPLAYED))
+            except Exception as exc:  # noqa: BLE001 - any failure takes the replica out
+                healthy, lag, replayed, error = False, None, None, str(exc)
+            else:
+                lag = None if lag is None else float(lag)
+                healthy = self.max_lag_seconds <= 0 or lag is None or lag <= self.max_lag_seconds
+                error = None if healthy else f"lagging {lag:.1f}s behind the primary"
+            if healthy and not replica.healthy:
+                logger.info("Replica %s is healthy again", replica.name)
+            elif not healthy and replica.healthy:
+                logger.warning("Replica %s is unhealthy: %s", replica.name, error)
+            replica.healthy, replica.lag_seconds, replica.last_error = healthy, lag, error
+            replica.replayed_lsn = replayed
+
+    async def start(self, interval_seconds: float) -> None:
+        """Probe the replicas now and keep probing them in the background."""
+
+        if not self.replicas:
+            return
+        await asyncio.to_thread(self.check)
+        if interval_seconds > 0:
+            self._checker = asyncio.create_task(self._watch(interval_seconds))
+
+    async def _watch(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await asyncio.to_thread(self.check)
+
+    async def stop(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+            self._checker = None
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            replica.name: {"healthy": float(replica.healthy), "connections": replica.connections()}
+            for replica in self.replicas
+        }
+
+
+class ReadYourWritesMiddleware:
+    """Hand every client that committed a write its :class:`WritePosition`.
+
+    A pure ASGI middleware, added outside ``RequestTimingMiddleware`` so it
+    can see whether the request committed. The position goes out in the
+    ``db_written`` cookie, which browsers send back on their own, and in the
+    ``X-DB-Written`` header for API clients to echo.
+    """
+
+    def __init__(self, app: ASGIApp, replicas: ReplicaSet) -> None:
+        self.app = app
+        self.replicas = replicas
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.replicas.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_position(message: Message) -> None:
+            timings = current_timings()
+            if message["type"] == "http.response.start" and timings is not None and timings.committed:
+                position = (await self.replicas.write_position()).encode()
+                cookie = SimpleCookie()
+                cookie[WRITTEN_COOKIE] = position
+                cookie[WRITTEN_COOKIE].update(
+                    {
+                        "max-age": str(math.ceil(self.replicas.sticky_seconds)),
+                        "path": "/",
+                        "httponly": True,
+                        "samesite": "lax",
+                    }
+                )
+                headers = list(message.get("headers", ()))
+                headers.append((b"set-cookie", cookie.output(header="").strip().encode("latin-1")))
+                headers.append((WRITTEN_HEADER.encode(), position.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_position)
+
+
+def register_metrics(replicas: ReplicaSet) -> None:
+    def gauge(metric: str) -> Callable[[], list[tuple[tuple, float]]]:
+        return lambda: [((name,), values[metric]) for name, values in replicas.stats().items()]
+
+    CallbackGauge("db_replica_healthy", "Whether a replica is in rotation.", ("replica",), gauge("healthy"))
+    CallbackGauge(
+        "db_replica_connections",
+        "Connections checked out from a replica.",
+        ("replica",),
+        gauge("connections"),
+    )
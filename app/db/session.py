@@ -1,22 +1,153 @@
 """Database session and engine helpers."""
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from collections.abc import AsyncIterator, Iterator
+
+from fastapi import Request
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import get_settings
+from app.core.metrics import instrument_engine, timed_pool
+from app.db.replicas import Replica, ReplicaSet, register_metrics
 
 settings = get_settings()
 
+
+def _with_driver(url: str, driver: str) -> str:
+    """Return ``url`` rewritten to use ``driver`` if it targets the same database.
+
+    ``_with_driver("sqlite:///x.db", "postgresql+asyncpg")`` is returned as is.
+    """
+
+    scheme, sep, rest = url.partition("://")
+    if scheme.split("+")[0] != driver.split("+")[0]:
+        return url
+    return f"{driver}{sep}{rest}"
+
+
+def _sync_url(url: str) -> str:
+    return _with_driver(_with_driver(url, "postgresql"), "sqlite")
+
+
+def _async_url(url: str) -> str:
+    return _with_driver(_with_driver(url, "postgresql+asyncpg"), "sqlite+aiosqlite")
+
+
+def _sync_engine(url: str, name: str) -> Engine:
+    engine = create_engine(
+        url,
+        echo=False,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        poolclass=timed_pool(QueuePool),
+        pool_logging_name=name,
+    )
+    instrument_engine(engine, name)
+    return engine
+
+
+def _async_engine(url: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=False,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        poolclass=timed_pool(AsyncAdaptedQueuePool),
+        pool_logging_name=name,
+    )
+    instrument_engine(engine.sync_engine, name)
+    return engine
+
+
 # Create sync engine for PostgreSQL
-database_url = str(settings.DATABASE_URL).replace("postgresql+asyncpg", "postgresql")
-engine = create_engine(database_url, echo=False)
+database_url = _sync_url(str(settings.DATABASE_URL))
+engine = _sync_engine(database_url, "app")
+
+# Objects stay loaded after commit, as with AsyncSessionLocal, so a route can
+# serialise what it just wrote without reloading it.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Create asyncio engine for PostgreSQL
+async_database_url = _async_url(str(settings.DATABASE_URL))
+async_engine = _async_engine(async_database_url, "app_async")
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+)
 
+# Read replicas, see app/db/replicas.py.
+replicas = ReplicaSet(
+    [
+        Replica(
+            f"replica{index}",
+            _sync_engine(_sync_url(url), f"replica{index}"),
+            _async_engine(_async_url(url), f"replica{index}_async"),
+        )
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS, start=1)
+    ],
+    policy=settings.DB_REPLICA_POLICY,
+    sticky_seconds=settings.DB_REPLICA_STICKY_SECONDS,
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    primary=async_engine,
+)
+register_metrics(replicas)
 
-def get_db():
-    """FastAPI dependency that yields a database session."""
-    db = SessionLocal()
+
+async def start_replica_checks() -> None:
+    await replicas.start(settings.DB_REPLICA_HEALTH_INTERVAL_SECONDS)
+
+
+def _read_replica(request: Request | None) -> Replica | None:
+    return replicas.choose() if request is None else replicas.route(request)
+
+
+def read_session(request: Request | None = None) -> Session:
+    """Open a sync session for reads.
+
+    With ``request`` the session follows its route; without one, background
+    and bulk reads go to any healthy replica.
+    """
+
+    replica = _read_replica(request)
+    return (replica.session if replica else SessionLocal)()
+
+
+def read_async_session(request: Request | None = None) -> AsyncSession:
+    """Asyncio counterpart of :func:`read_session`."""
+
+    replica = _read_replica(request)
+    return (replica.async_session if replica else AsyncSessionLocal)()
+
+
+def get_db(request: Request) -> Iterator[Session]:
+    """FastAPI dependency that yields a database session.
+
+    Reads are served from a replica when :meth:`ReplicaSet.route` picks one.
+    """
+    replica = replicas.route(request)
+    db = (replica.session if replica else SessionLocal)()
     try:
         yield db
+    except OperationalError as exc:
+        if replica is not None:
+            replicas.fail(replica, exc)
+        raise
     finally:
         db.close()
+
+
+async def get_async_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency that yields an asyncio database session.
+
+    Reads are served from a replica when :meth:`ReplicaSet.route` picks one.
+    """
+    replica = replicas.route(request)
+    async with (replica.async_session if replica else AsyncSessionLocal)() as db:
+        try:
+            yield db
+        except OperationalError as exc:
+            if replica is not None:
+                replicas.fail(replica, exc)
+            raise
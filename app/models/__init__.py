@@ -1,20 +1,27 @@
 """Aggregate exports for SQLAlchemy models."""
+from app.models.availability import ProductAvailability
 from app.models.base import Base
 from app.models.category import Category
 from app.models.order import Order, OrderItem, OrderStatus
 from app.models.product import Product
+from app.models.sales import CategorySalesDaily, ProductSalesDaily, TotalSalesDaily
 from app.models.stock import ProductStock, Stock
 from app.models.user import User, UserRoleEnum
+from app.models import search  # noqa: F401  registers the search index DDL
 
 __all__ = [
     "Base",
     "Category",
+    "CategorySalesDaily",
     "Order",
     "OrderItem",
     "OrderStatus",
     "Product",
+    "ProductAvailability",
+    "ProductSalesDaily",
     "ProductStock",
     "Stock",
+    "TotalSalesDaily",
     "User",
     "UserRoleEnum",
 ]
@@ -0,0 +1,32 @@
+"""Database model for the per-product availability summary."""
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ProductAvailability(Base):
+    """Stock and price of a product aggregated over all its stock locations.
+
+    One row per product, rewritten by :func:`app.services.availability.refresh_availability`
+    in the transaction that changes the product's stock rows, so product
+    reads (``Product.availability``), catalogue filters and facet counts never
+    aggregate ``products_stock`` themselves. ``category_id`` is copied from
+    the product for the same reason.
+    """
+
+    __tablename__ = "product_availability"
+    __table_args__ = (
+        Index("ix_product_availability_category_id_min_price", "category_id", "min_price"),
+        Index("ix_product_availability_min_price", "min_price"),
+    )
+
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), nullable=False)
+    total_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    min_price: Mapped[float | None] = mapped_column(Float)
+    max_price: Mapped[float | None] = mapped_column(Float)
+    location_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
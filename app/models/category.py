@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import List
 
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import DateTime, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -12,6 +12,11 @@ class Category(Base):
     """Represents a manually curated product category."""
 
     __tablename__ = "categories"
+    __table_args__ = (
+        # Keyset pagination indexes, see app/api/pagination.py.
+        Index("ix_categories_name_id", "name", "id"),
+        Index("ix_categories_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
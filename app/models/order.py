@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import List
 
-from sqlalchemy import DateTime, Enum as SqlEnum, Float, ForeignKey, Integer
+from sqlalchemy import DateTime, Enum as SqlEnum, Float, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -22,6 +22,13 @@ class Order(Base):
     """Customer order model."""
 
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination indexes, see app/api/pagination.py. Customers only
+        # page through their own orders, hence the ``user_id`` prefixed pair.
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_user_id_id", "user_id", "id"),
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -43,8 +50,11 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), nullable=False)
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), nullable=False, index=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
+    # Category of the product when it was ordered; the sales rollups count the
+    # line under it, so moving the product later does not re-file its sales.
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), nullable=False)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
     price_at_order: Mapped[float] = mapped_column(Float, nullable=False)
 
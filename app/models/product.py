@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import List
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -12,6 +12,11 @@ class Product(Base):
     """Represents a product that can be sold and stocked."""
 
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pagination indexes, see app/api/pagination.py.
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -26,3 +31,7 @@ class Product(Base):
     category: Mapped["Category"] = relationship("Category", back_populates="products")
     stocks: Mapped[List["ProductStock"]] = relationship("ProductStock", back_populates="product")
     order_items: Mapped[List["OrderItem"]] = relationship("OrderItem", back_populates="product")
+    # Maintained by app.services.availability; joined onto every product load.
+    availability: Mapped["ProductAvailability | None"] = relationship(
+        "ProductAvailability", lazy="joined", viewonly=True
+    )
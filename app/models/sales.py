@@ -0,0 +1,60 @@
+"""Database models for the daily sales rollups."""
+from datetime import date
+
+from sqlalchemy import Date, Float, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ProductSalesDaily(Base):
+    """Units, revenue and orders of one product on one day.
+
+    Maintained by :mod:`app.services.sales` in the transaction that places or
+    (un)cancels an order; cancelled orders are not counted. ``day`` is the
+    UTC date the order was placed and ``category_id`` is the category
+    recorded on the order lines that first wrote the row.
+    """
+
+    __tablename__ = "sales_daily_products"
+    __table_args__ = (Index("ix_sales_daily_products_product_id_day", "product_id", "day"),)
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), nullable=False)
+    units: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    revenue: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class CategorySalesDaily(Base):
+    """Units, revenue and orders of one category on one day.
+
+    The coarse twin of :class:`ProductSalesDaily` the revenue endpoints read:
+    two years hold a few hundred rows per category. ``order_count`` counts
+    orders with at least one product of the category.
+    """
+
+    __tablename__ = "sales_daily_categories"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), primary_key=True)
+    units: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    revenue: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class TotalSalesDaily(Base):
+    """Units, revenue and orders of one day over all categories.
+
+    ``order_count`` counts each order once, which summing the per-category
+    counts of :class:`CategorySalesDaily` would not for orders spanning
+    several categories.
+    """
+
+    __tablename__ = "sales_daily_totals"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    units: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    revenue: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,138 @@
+"""Full-text search index over products.
+
+The index covers the product name, barcode, description and category name.
+It is kept current by database triggers rather than by the endpoints, so
+products written by any code path, bulk loads included, are searchable as
+soon as their transaction commits:
+
+* PostgreSQL stores a weighted ``tsvector`` in ``products.search_vector``
+  with a GIN index, plus a ``pg_trgm`` GIN index on ``products.name`` for
+  typo-tolerant matching,
+* SQLite keeps an FTS5 table, ``products_fts``, whose rowid is the product id.
+
+The statements run after ``metadata.create_all`` and from the Alembic
+migration that introduced them.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+from app.models.base import Base
+
+TS_CONFIG = "english"
+
+POSTGRESQL_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    f"""
+    CREATE OR REPLACE FUNCTION products_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('{TS_CONFIG}', coalesce(NEW.name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(NEW.barcode, '')), 'A')
+            || setweight(to_tsvector('{TS_CONFIG}', coalesce(
+                (SELECT name FROM categories WHERE id = NEW.category_id), '')), 'B')
+            || setweight(to_tsvector('{TS_CONFIG}', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS products_search_vector ON products",
+    """
+    CREATE TRIGGER products_search_vector
+    BEFORE INSERT OR UPDATE OF name, barcode, description, category_id ON products
+    FOR EACH ROW EXECUTE FUNCTION products_search_vector()
+    """,
+    # Renaming a category re-runs the product trigger of its products.
+    """
+    CREATE OR REPLACE FUNCTION categories_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE products SET category_id = category_id WHERE category_id = NEW.id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS categories_search_vector ON categories",
+    """
+    CREATE TRIGGER categories_search_vector
+    AFTER UPDATE OF name ON categories
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION categories_search_vector()
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)",
+    # Fills rows written before the trigger existed; a no-op on new tables.
+    "UPDATE products SET category_id = category_id WHERE search_vector IS NULL",
+)
+
+SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, barcode, category, description, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, name, barcode, category, description)
+        SELECT NEW.id, NEW.name, NEW.barcode,
+               (SELECT name FROM categories WHERE id = NEW.category_id), NEW.description;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_update
+    AFTER UPDATE OF name, barcode, description, category_id ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = OLD.id;
+        INSERT INTO products_fts (rowid, name, barcode, category, description)
+        SELECT NEW.id, NEW.name, NEW.barcode,
+               (SELECT name FROM categories WHERE id = NEW.category_id), NEW.description;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS categories_fts_update AFTER UPDATE OF name ON categories BEGIN
+        UPDATE products_fts SET category = NEW.name
+        WHERE rowid IN (SELECT id FROM products WHERE category_id = NEW.id);
+    END
+    """,
+    # Fills rows written before the table existed; a no-op on new tables.
+    """
+    INSERT INTO products_fts (rowid, name, barcode, category, description)
+    SELECT p.id, p.name, p.barcode, c.name, p.description
+    FROM products AS p JOIN categories AS c ON c.id = p.category_id
+    WHERE p.id NOT IN (SELECT rowid FROM products_fts)
+    """,
+)
+
+SEARCH_DDL = {"postgresql": POSTGRESQL_DDL, "sqlite": SQLITE_DDL}
+
+# Created above rather than by the models; hidden from Alembic autogenerate.
+SEARCH_COLUMNS = {("products", "search_vector")}
+SEARCH_INDEXES = {"ix_products_search_vector", "ix_products_name_trgm"}
+SEARCH_TABLE_PREFIX = "products_fts"
+
+
+def install_search_index(connection: Connection) -> None:
+    """Create or refresh the search index of the connection's dialect."""
+
+    for statement in SEARCH_DDL.get(connection.dialect.name, ()):
+        connection.exec_driver_sql(statement)
+
+
+def is_search_object(name: str | None, type_: str, table_name: str | None = None) -> bool:
+    """Whether Alembic should leave the schema object ``name`` alone."""
+
+    if type_ == "table":
+        return bool(name) and name.startswith(SEARCH_TABLE_PREFIX)
+    if type_ == "column":
+        return (table_name, name) in SEARCH_COLUMNS
+    if type_ == "index":
+        return name in SEARCH_INDEXES
+    return False
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _after_create(target, connection: Connection, **kw) -> None:
+    install_search_index(connection)
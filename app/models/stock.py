@@ -1,5 +1,5 @@
 """Database models for stock locations and product stock levels."""
-from sqlalchemy import Float, ForeignKey, Integer, String
+from sqlalchemy import Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -9,6 +9,10 @@ class Stock(Base):
     """Represents a warehouse or stock location."""
 
     __tablename__ = "stocks"
+    __table_args__ = (
+        # Keyset pagination index, see app/api/pagination.py.
+        Index("ix_stocks_location_id", "location", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     location: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
@@ -22,6 +26,12 @@ class ProductStock(Base):
     """Associative table storing per-stock product details."""
 
     __tablename__ = "products_stock"
+    __table_args__ = (
+        # Keyset pagination index, see app/api/pagination.py.
+        Index("ix_products_stock_sale_price_id", "sale_price", "id"),
+        # Per-product aggregation for product_availability and location filters.
+        Index("ix_products_stock_product_id_stock_id", "product_id", "stock_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
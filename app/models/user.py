@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import List
 
-from sqlalchemy import Boolean, DateTime, Enum as SqlEnum, Integer, String
+from sqlalchemy import Boolean, DateTime, Enum as SqlEnum, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -24,6 +24,11 @@ class User(Base):
     """
 
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination indexes, see app/api/pagination.py.
+        Index("ix_users_email_id", "email", "id"),
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String(320), unique=True, index=True, nullable=False)
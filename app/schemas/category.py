@@ -1,9 +1,18 @@
 """Pydantic schemas for categories."""
 from datetime import datetime
+from enum import Enum
 
 from pydantic import BaseModel, Field
 
 
+class CategorySortKey(str, Enum):
+    """Columns categories can be listed by."""
+
+    ID = "id"
+    NAME = "name"
+    CREATED_AT = "created_at"
+
+
 class CategoryBase(BaseModel):
     """Shared category attributes."""
 
@@ -0,0 +1,24 @@
+"""Schemas for bulk export endpoints."""
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class ExportFormat(str, Enum):
+    """Encodings bulk exports can be streamed in."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ExportProgressRead(BaseModel):
+    """Progress of a running export."""
+
+    id: int
+    kind: str
+    format: ExportFormat
+    started_at: datetime
+    rows: int
+    bytes: int
+    elapsed_seconds: float
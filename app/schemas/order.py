@@ -1,12 +1,20 @@
 """Pydantic schemas for order operations."""
 from datetime import datetime
-from typing import List
+from enum import Enum
+from typing import List, Literal
 
 from pydantic import BaseModel, Field
 
 from app.models.order import OrderStatus
 
 
+class OrderSortKey(str, Enum):
+    """Columns orders can be listed by."""
+
+    ID = "id"
+    CREATED_AT = "created_at"
+
+
 class OrderItemCreate(BaseModel):
     """Payload describing an order line item."""
 
@@ -25,6 +33,15 @@ class OrderItemRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class OrderLineError(BaseModel):
+    """Reason a single order line could not be fulfilled."""
+
+    product_stock_id: int
+    requested: int
+    available: int | None = None
+    reason: Literal["not_found", "insufficient_stock"]
+
+
 class OrderCreate(BaseModel):
     """Schema used when creating an order."""
 
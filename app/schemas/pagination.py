@@ -0,0 +1,25 @@
+"""Pydantic schemas shared by paginated list endpoints."""
+from enum import Enum
+from typing import Generic, List, TypeVar
+
+from pydantic import BaseModel
+
+ItemT = TypeVar("ItemT")
+
+
+class SortOrder(str, Enum):
+    """Direction applied to the ``order_by`` key of a listing."""
+
+    ASC = "asc"
+    DESC = "desc"
+
+
+class Page(BaseModel, Generic[ItemT]):
+    """A single page of a keyset-paginated listing.
+
+    ``next_cursor`` is an opaque token; pass it back as ``cursor`` to fetch the
+    following page. It is ``None`` once the last page has been reached.
+    """
+
+    items: List[ItemT]
+    next_cursor: str | None = None
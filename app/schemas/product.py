@@ -1,8 +1,19 @@
 """Pydantic schemas for product resources."""
 from datetime import datetime
+from enum import Enum
 
 from pydantic import BaseModel, Field
 
+from app.schemas.pagination import Page
+
+
+class ProductSortKey(str, Enum):
+    """Columns products can be listed by."""
+
+    ID = "id"
+    NAME = "name"
+    CREATED_AT = "created_at"
+
 
 class ProductBase(BaseModel):
     """Base product payload."""
@@ -28,9 +39,64 @@ class ProductUpdate(BaseModel):
     category_id: int | None = None
 
 
+class ProductAvailabilityRead(BaseModel):
+    """Stock and price of a product across all its stock locations."""
+
+    total_qty: int
+    min_price: float | None
+    max_price: float | None
+    location_count: int
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
 class ProductRead(ProductBase):
     """Read representation of a product."""
 
     id: int
     created_at: datetime
     updated_at: datetime
+    availability: ProductAvailabilityRead | None = None
+
+
+class CategoryFacet(BaseModel):
+    """Number of matching products in one category."""
+
+    category_id: int
+    count: int
+
+
+class PriceBucket(BaseModel):
+    """Number of matching products whose cheapest offer falls in ``[min, max)``."""
+
+    min: float
+    max: float | None
+    count: int
+
+
+class ProductFacets(BaseModel):
+    """Facet counts of a filtered product listing."""
+
+    categories: list[CategoryFacet]
+    prices: list[PriceBucket]
+
+
+class ProductPage(Page[ProductRead]):
+    """A page of products, with facet counts when they were requested."""
+
+    facets: ProductFacets | None = None
+
+
+class Suggestion(BaseModel):
+    """A product or category offered while the user types."""
+
+    id: int
+    name: str
+
+
+class ProductSuggestions(BaseModel):
+    """Autocomplete answer for a prefix, most popular first."""
+
+    products: list[Suggestion]
+    categories: list[Suggestion]
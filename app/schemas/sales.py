@@ -0,0 +1,37 @@
+"""Schemas for the sales analytics endpoints."""
+from datetime import date
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class Granularity(str, Enum):
+    """Period revenue is summed over."""
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class RevenueTotals(BaseModel):
+    """Sales of non-cancelled orders."""
+
+    units: int
+    revenue: float
+    order_count: int = Field(
+        description="Distinct orders; per category, the orders with at least one line in it"
+    )
+
+    model_config = {"from_attributes": True}
+
+
+class PeriodRevenueRead(RevenueTotals):
+    """Sales of one day, week (starting on Monday) or month, keyed by its first day."""
+
+    period: date
+
+
+class CategoryRevenueRead(RevenueTotals):
+    """Sales of one category."""
+
+    category_id: int
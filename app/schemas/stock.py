@@ -1,7 +1,23 @@
 """Schemas for stock resources."""
+from enum import Enum
+
 from pydantic import BaseModel, Field
 
 
+class StockSortKey(str, Enum):
+    """Columns stock locations can be listed by."""
+
+    ID = "id"
+    LOCATION = "location"
+
+
+class ProductStockSortKey(str, Enum):
+    """Columns product stock entries can be listed by."""
+
+    ID = "id"
+    SALE_PRICE = "sale_price"
+
+
 class StockBase(BaseModel):
     """Base attributes for stock locations."""
 
@@ -52,3 +68,15 @@ class ProductStockSyncRequest(BaseModel):
     """Request schema for syncing product stock."""
 
     product_stock_ids: list[int]
+
+
+class ProductStockSyncReport(BaseModel):
+    """Outcome of a product stock sync run."""
+
+    scanned: int
+    changed: int
+    unchanged: int
+    missing_in_feed: int
+    missing_in_db: int
+    timings_ms: dict[str, float]
+    updated: list[ProductStockRead]
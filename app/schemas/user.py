@@ -1,11 +1,20 @@
 """Pydantic schemas related to users and authentication."""
 from datetime import datetime
+from enum import Enum
 
 from pydantic import BaseModel, EmailStr, Field
 
 from app.models.user import UserRoleEnum
 
 
+class UserSortKey(str, Enum):
+    """Columns users can be listed by."""
+
+    ID = "id"
+    EMAIL = "email"
+    CREATED_AT = "created_at"
+
+
 class UserBase(BaseModel):
     """Base schema shared across user representations."""
 
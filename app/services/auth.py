@@ -2,56 +2,74 @@
 import secrets
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.principals import principal_cache
+from app.core.security import create_access_token, hash_password, verify_and_update_password
 from app.models import User, UserRoleEnum
 from app.schemas.user import UserCreate, UserLogin
 from app.services.email import send_verification_email
 
 
-def register_user(db: Session, payload: UserCreate) -> User:
+async def _get_by_email(db: AsyncSession, email: str) -> User | None:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+
+async def register_user(db: AsyncSession, payload: UserCreate) -> User:
     """Create a new user and send a verification token via email."""
 
-    existing = db.query(User).filter(User.email == payload.email).first()
+    existing = await _get_by_email(db, payload.email)
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     verification_token = secrets.token_urlsafe(32)
     user = User(
         email=payload.email,
-        hashed_password=get_password_hash(payload.password),
+        hashed_password=await hash_password(payload.password),
         role=UserRoleEnum.CUSTOMER,
         verification_token=verification_token,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     send_verification_email(user.email, verification_token)
     return user
 
 
-def verify_user_email(db: Session, email: str, token: str) -> User:
+async def verify_user_email(db: AsyncSession, email: str, token: str) -> User:
     """Mark a user's email as verified when the token matches."""
 
-    user = db.query(User).filter(User.email == email).first()
+    user = await _get_by_email(db, email)
     if user is None or user.verification_token != token:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid verification token")
     user.is_verified = True
     user.verification_token = None
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    principal_cache.invalidate(user.email)
     return user
 
 
-def authenticate_user(db: Session, payload: UserLogin) -> str:
-    """Validate user credentials and return an access token."""
+async def authenticate_user(db: AsyncSession, payload: UserLogin) -> str:
+    """Validate user credentials and return an access token.
 
-    user = db.query(User).filter(User.email == payload.email).first()
-    if user is None or not verify_password(payload.password, user.hashed_password):
+    Hashes made with outdated Argon2 parameters are replaced on success.
+    """
+
+    user = await _get_by_email(db, payload.email)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
+    valid, new_hash = await verify_and_update_password(payload.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
     if not user.is_verified:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Email not verified")
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        db.add(user)
+        await db.commit()
     token = create_access_token({"sub": user.email})
     return token
@@ -0,0 +1,58 @@
+"""Maintenance of the ``product_availability`` summary.
+
+Every code path that changes a product's stock rows, price or category calls
+:func:`refresh_availability` before it commits. The summary is recomputed for
+just those products with one ``INSERT ... SELECT ... ON CONFLICT DO UPDATE``
+over their ``products_stock`` rows, so it commits or rolls back together with
+the change that caused it.
+"""
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import DateTime, Insert, delete, func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Product, ProductAvailability, ProductStock
+
+_UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_AGGREGATED = ("category_id", "total_qty", "min_price", "max_price", "location_count", "updated_at")
+
+
+def availability_upsert(dialect: str, product_ids: Iterable[int] | None = None) -> Insert:
+    """Return the statement recomputing the summary of ``product_ids``, or of all products."""
+
+    stmt = (
+        select(
+            Product.id,
+            Product.category_id,
+            func.coalesce(func.sum(ProductStock.qty), 0),
+            func.min(ProductStock.sale_price),
+            func.max(ProductStock.sale_price),
+            func.count(ProductStock.id),
+            literal(datetime.utcnow(), DateTime()),
+        )
+        .outerjoin(ProductStock, ProductStock.product_id == Product.id)
+        .group_by(Product.id, Product.category_id)
+    )
+    if product_ids is not None:
+        stmt = stmt.where(Product.id.in_(sorted(set(product_ids))))
+    upsert = _UPSERTS[dialect](ProductAvailability).from_select(("product_id", *_AGGREGATED), stmt)
+    return upsert.on_conflict_do_update(
+        index_elements=[ProductAvailability.product_id],
+        set_={name: getattr(upsert.excluded, name) for name in _AGGREGATED},
+    )
+
+
+def refresh_availability(db: Session, product_ids: Iterable[int]) -> None:
+    """Recompute the summary rows of ``product_ids`` inside the current transaction."""
+
+    product_ids = set(product_ids)
+    if product_ids:
+        db.execute(availability_upsert(db.get_bind().dialect.name, product_ids))
+
+
+def drop_availability(db: Session, product_id: int) -> None:
+    """Delete the summary row of a product that is about to be deleted."""
+
+    db.execute(delete(ProductAvailability).where(ProductAvailability.product_id == product_id))
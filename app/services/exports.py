@@ -0,0 +1,224 @@
+"""Streaming bulk exports of the catalogue, stock levels and order lines.
+
+Exports are read with server-side cursors (``yield_per``, which implies
+``stream_results``) and encoded one partition at a time, so memory stays
+constant no matter how many rows a table holds. Rows are plain column tuples;
+nothing is loaded as ORM instances or validated through Pydantic. Exports
+read from a replica whenever one is healthy.
+
+Every running export is registered in :data:`export_tracker`, which reports
+the rows and bytes produced so far.
+"""
+import csv
+import io
+import itertools
+import json
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import Select, select
+
+from app.core.config import get_settings
+from app.db.session import read_async_session, read_session
+from app.models import Order, OrderItem, OrderStatus, Product, ProductStock, Stock
+from app.schemas.export import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def product_export_query(category_id: int | None = None) -> Select:
+    """Return the products export statement."""
+
+    stmt = select(
+        Product.id,
+        Product.name,
+        Product.barcode,
+        Product.description,
+        Product.category_id,
+        Product.created_at,
+        Product.updated_at,
+    )
+    if category_id is not None:
+        stmt = stmt.where(Product.category_id == category_id)
+    return stmt.order_by(Product.id)
+
+
+def product_stock_export_query(category_id: int | None = None, location: str | None = None) -> Select:
+    """Return the product stock export statement, one row per product and location."""
+
+    stmt = select(
+        ProductStock.id,
+        ProductStock.product_id,
+        Product.category_id,
+        ProductStock.stock_id,
+        Stock.location,
+        ProductStock.qty,
+        ProductStock.sale_price,
+    ).join(Stock, Stock.id == ProductStock.stock_id).join(Product, Product.id == ProductStock.product_id)
+    if category_id is not None:
+        stmt = stmt.where(Product.category_id == category_id)
+    if location is not None:
+        stmt = stmt.where(Stock.location == location)
+    return stmt.order_by(ProductStock.id)
+
+
+def order_export_query(
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    status: OrderStatus | None = None,
+) -> Select:
+    """Return the order book export statement, one row per order line.
+
+    ``created_from`` is inclusive and ``created_to`` exclusive.
+    """
+
+    stmt = select(
+        Order.id.label("order_id"),
+        Order.user_id,
+        Order.status,
+        Order.created_at,
+        OrderItem.id.label("order_item_id"),
+        OrderItem.product_id,
+        OrderItem.quantity,
+        OrderItem.price_at_order,
+    ).join(OrderItem, OrderItem.order_id == Order.id)
+    if created_from is not None:
+        stmt = stmt.where(Order.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Order.created_at < created_to)
+    if status is not None:
+        stmt = stmt.where(Order.status == status)
+    return stmt.order_by(Order.id, OrderItem.id)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+class RowEncoder:
+    """Encode partitions of result rows as NDJSON or CSV bytes."""
+
+    def __init__(self, fmt: ExportFormat, columns: Sequence[str]) -> None:
+        self.format = fmt
+        self.columns = list(columns)
+
+    def header(self) -> bytes:
+        """Return the bytes that precede the first partition."""
+
+        if self.format is ExportFormat.CSV:
+            return self._csv([self.columns])
+        return b""
+
+    def encode(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        """Encode one partition of rows."""
+
+        if self.format is ExportFormat.CSV:
+            return self._csv([_plain(value) for value in row] for row in rows)
+        dumps = json.JSONEncoder(default=_plain, ensure_ascii=False).encode
+        return "".join(
+            dumps(dict(zip(self.columns, row))) + "\n" for row in rows
+        ).encode("utf-8")
+
+    @staticmethod
+    def _csv(rows: Iterable[Sequence[Any]]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+
+@dataclass
+class ExportProgress:
+    """Progress of one running export."""
+
+    id: int
+    kind: str
+    format: str
+    started_at: datetime
+    rows: int = 0
+    bytes: int = 0
+    _started: float = field(default_factory=time.monotonic, repr=False)
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["elapsed_seconds"] = round(time.monotonic() - data.pop("_started"), 3)
+        return data
+
+
+class ExportTracker:
+    """Registry of in-progress exports."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._active: dict[int, ExportProgress] = {}
+
+    def start(self, kind: str, fmt: ExportFormat) -> ExportProgress:
+        progress = ExportProgress(
+            id=next(self._ids), kind=kind, format=fmt.value, started_at=datetime.utcnow()
+        )
+        with self._lock:
+            self._active[progress.id] = progress
+        return progress
+
+    def finish(self, progress: ExportProgress) -> None:
+        with self._lock:
+            self._active.pop(progress.id, None)
+
+    def active(self) -> list[dict[str, Any]]:
+        """Return a snapshot of the running exports."""
+
+        with self._lock:
+            return [progress.as_dict() for progress in self._active.values()]
+
+
+export_tracker = ExportTracker()
+
+
+def _chunk(progress: ExportProgress, data: bytes, rows: int = 0) -> bytes:
+    progress.rows += rows
+    progress.bytes += len(data)
+    return data
+
+
+def iter_export(stmt: Select, fmt: ExportFormat, kind: str) -> Iterator[bytes]:
+    """Yield the encoded export of ``stmt`` from a sync server-side cursor."""
+
+    encoder = RowEncoder(fmt, stmt.selected_columns.keys())
+    partition_size = get_settings().EXPORT_PARTITION_SIZE
+    progress = export_tracker.start(kind, fmt)
+    try:
+        with read_session() as db:
+            yield _chunk(progress, encoder.header())
+            result = db.execute(stmt.execution_options(yield_per=partition_size))
+            for partition in result.partitions():
+                yield _chunk(progress, encoder.encode(partition), len(partition))
+    finally:
+        export_tracker.finish(progress)
+
+
+async def aiter_export(stmt: Select, fmt: ExportFormat, kind: str) -> AsyncIterator[bytes]:
+    """Async counterpart of :func:`iter_export`."""
+
+    encoder = RowEncoder(fmt, stmt.selected_columns.keys())
+    partition_size = get_settings().EXPORT_PARTITION_SIZE
+    progress = export_tracker.start(kind, fmt)
+    try:
+        async with read_async_session() as db:
+            yield _chunk(progress, encoder.header())
+            result = await db.stream(stmt.execution_options(yield_per=partition_size))
+            async for partition in result.partitions():
+                yield _chunk(progress, encoder.encode(partition), len(partition))
+    finally:
+        export_tracker.finish(progress)
@@ -0,0 +1,139 @@
+"""Catalogue filters and facet counts served from ``product_availability``.
+
+Filters on category, price and stock are predicates on the per-product
+summary, so neither the listing nor the facet counts aggregate
+``products_stock``. Only the location filter looks at ``products_stock``,
+through an indexed ``EXISTS`` on ``(product_id, stock_id)``.
+
+Facet counts follow the usual storefront convention: each facet is counted
+with every filter applied except its own, so selecting a category still
+shows how many products the other categories would offer.
+"""
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import Query
+from sqlalchemy import ColumnElement, Select, case, exists, func, select
+
+from app.core.config import get_settings
+from app.models import Product, ProductAvailability, ProductStock
+
+_summary = ProductAvailability
+
+
+@dataclass(frozen=True)
+class ProductFilters:
+    """Storefront filters of a product listing."""
+
+    category_ids: tuple[int, ...] = ()
+    min_price: float | None = None
+    max_price: float | None = None
+    in_stock: bool = False
+    location_id: int | None = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.category_ids) or self.in_stock or any(
+            value is not None for value in (self.min_price, self.max_price, self.location_id)
+        )
+
+    @property
+    def cache_key(self) -> str:
+        categories = ",".join(map(str, self.category_ids))
+        return f"{categories}:{self.min_price}:{self.max_price}:{int(self.in_stock)}:{self.location_id}"
+
+    def conditions(self, *, category: bool = True, price: bool = True) -> list[ColumnElement[bool]]:
+        """Return the predicates on ``product_availability``, optionally without one facet's own."""
+
+        conditions = []
+        if category and self.category_ids:
+            conditions.append(_summary.category_id.in_(self.category_ids))
+        if price and self.min_price is not None:
+            conditions.append(_summary.min_price >= self.min_price)
+        if price and self.max_price is not None:
+            conditions.append(_summary.min_price <= self.max_price)
+        if self.in_stock:
+            conditions.append(_summary.total_qty > 0)
+        if self.location_id is not None:
+            located = [
+                ProductStock.product_id == _summary.product_id,
+                ProductStock.stock_id == self.location_id,
+            ]
+            if self.in_stock:
+                located.append(ProductStock.qty > 0)
+            conditions.append(exists().where(*located))
+        return conditions
+
+
+def product_filters(
+    category_id: list[int] | None = Query(default=None, description="Repeat to select several categories"),
+    min_price: float | None = Query(default=None, ge=0, description="Lowest price of the cheapest offer"),
+    max_price: float | None = Query(default=None, ge=0, description="Highest price of the cheapest offer"),
+    in_stock: bool = Query(default=False, description="Only products with units in stock"),
+    location_id: int | None = Query(default=None, description="Only products stocked at this location"),
+) -> ProductFilters:
+    """FastAPI dependency collecting the storefront filter query parameters."""
+
+    return ProductFilters(
+        category_ids=tuple(sorted(set(category_id or ()))),
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock,
+        location_id=location_id,
+    )
+
+
+def filter_products(stmt: Select, filters: ProductFilters) -> Select:
+    """Restrict a ``select(Product)`` statement to the products matching ``filters``."""
+
+    if not filters.active:
+        return stmt
+    return stmt.join(_summary, _summary.product_id == Product.id).where(*filters.conditions())
+
+
+def _price_bucket(boundaries: list[float]) -> ColumnElement[int]:
+    return case(
+        *((_summary.min_price < bound, index) for index, bound in enumerate(boundaries)),
+        else_=len(boundaries),
+    )
+
+
+def category_facet_statement(filters: ProductFilters) -> Select:
+    return (
+        select(_summary.category_id, func.count())
+        .where(*filters.conditions(category=False))
+        .group_by(_summary.category_id)
+        .order_by(_summary.category_id)
+    )
+
+
+def price_facet_statement(filters: ProductFilters, boundaries: list[float]) -> Select:
+    # Grouped through a subquery: PostgreSQL does not treat the bound CASE in
+    # the select list and in GROUP BY as the same expression.
+    buckets = (
+        select(_price_bucket(boundaries).label("bucket"))
+        .where(_summary.min_price.is_not(None), *filters.conditions(price=False))
+        .subquery()
+    )
+    return select(buckets.c.bucket, func.count()).group_by(buckets.c.bucket)
+
+
+def price_boundaries() -> list[float]:
+    return sorted(get_settings().PRICE_FACET_BOUNDARIES)
+
+
+def build_facets(category_rows: Any, price_rows: Any, boundaries: list[float]) -> dict[str, Any]:
+    """Turn the rows of the facet statements into the ``ProductFacets`` payload.
+
+    Empty price buckets are reported too, so clients can render a stable list.
+    """
+
+    counts = dict(price_rows)
+    edges = [0.0, *boundaries, None]
+    return {
+        "categories": [{"category_id": category_id, "count": count} for category_id, count in category_rows],
+        "prices": [
+            {"min": edges[index], "max": edges[index + 1], "count": counts.get(index, 0)}
+            for index in range(len(boundaries) + 1)
+        ],
+    }
@@ -0,0 +1,165 @@
+"""Order placement with atomic stock reservation and batched order reads."""
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, case, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Order, OrderItem, Product, ProductStock
+from app.schemas.order import OrderItemCreate, OrderLineError
+from app.services.availability import refresh_availability
+from app.services.sales import record_order
+
+
+def _requested_quantities(items: Iterable[OrderItemCreate]) -> dict[int, int]:
+    """Sum the requested quantity per product stock entry."""
+
+    requested: dict[int, int] = defaultdict(int)
+    for item in items:
+        requested[item.product_stock_id] += item.quantity
+    return dict(requested)
+
+
+def _reject(db: Session, errors: list[OrderLineError]) -> HTTPException:
+    db.rollback()
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "message": "Order cannot be fulfilled",
+            "lines": [error.model_dump() for error in errors],
+        },
+    )
+
+
+def place_order(db: Session, user_id: int, items: list[OrderItemCreate]) -> Order:
+    """Reserve stock for every line and persist the order in one transaction.
+
+    All requested ``products_stock`` rows are locked with a single
+    ``SELECT ... ORDER BY id FOR UPDATE``; locking in id order keeps
+    concurrent orders touching the same SKUs from deadlocking. Stock is then
+    taken with one conditional ``UPDATE ... WHERE qty >= :n RETURNING id``
+    covering all lines, so an order can never oversell even where row locks
+    are unavailable. If any line cannot be served the whole order is rolled
+    back and every failing line is reported. The ``product_availability``
+    rows of the ordered products and the daily sales rollups are updated in
+    the same transaction.
+
+    The function works on a sync ``Session`` so the asyncio routers can share
+    it through ``AsyncSession.run_sync``.
+    """
+
+    requested = _requested_quantities(items)
+    stock_ids = sorted(requested)
+    locked = db.execute(
+        select(
+            ProductStock.id,
+            ProductStock.product_id,
+            Product.category_id,
+            ProductStock.qty,
+            ProductStock.sale_price,
+        )
+        .join(Product, Product.id == ProductStock.product_id)
+        .where(ProductStock.id.in_(stock_ids))
+        .order_by(ProductStock.id)
+        .with_for_update(of=ProductStock)
+    ).all()
+    rows = {row.id: row for row in locked}
+
+    errors = []
+    for stock_id in stock_ids:
+        row = rows.get(stock_id)
+        if row is None:
+            errors.append(
+                OrderLineError(product_stock_id=stock_id, requested=requested[stock_id], reason="not_found")
+            )
+        elif row.qty < requested[stock_id]:
+            errors.append(
+                OrderLineError(
+                    product_stock_id=stock_id,
+                    requested=requested[stock_id],
+                    available=row.qty,
+                    reason="insufficient_stock",
+                )
+            )
+    if errors:
+        raise _reject(db, errors)
+
+    quantity = case(requested, value=ProductStock.id)
+    reserved = set(
+        db.scalars(
+            update(ProductStock)
+            .where(ProductStock.id.in_(stock_ids), ProductStock.qty >= quantity)
+            .values(qty=ProductStock.qty - quantity)
+            .returning(ProductStock.id)
+            .execution_options(synchronize_session=False)
+        )
+    )
+    if len(reserved) != len(stock_ids):
+        # Only reachable on backends without row locks, when another order
+        # took the stock between our read and the conditional update.
+        raise _reject(
+            db,
+            [
+                OrderLineError(
+                    product_stock_id=stock_id, requested=requested[stock_id], reason="insufficient_stock"
+                )
+                for stock_id in stock_ids
+                if stock_id not in reserved
+            ],
+        )
+
+    order = Order(user_id=user_id)
+    for item in items:
+        row = rows[item.product_stock_id]
+        order.items.append(
+            OrderItem(
+                product_id=row.product_id,
+                category_id=row.category_id,
+                quantity=item.quantity,
+                price_at_order=row.sale_price,
+            )
+        )
+    db.add(order)
+    db.flush()
+    record_order(db, order.id)
+    refresh_availability(db, {row.product_id for row in locked})
+    db.commit()
+    return order
+
+
+def order_read_query() -> Select:
+    """Return a select of the flat order columns consumed by :func:`fetch_order_reads`."""
+
+    return select(Order.id, Order.user_id, Order.status, Order.created_at, Order.updated_at)
+
+
+def fetch_order_reads(db: Session, stmt: Select) -> list[dict[str, Any]]:
+    """Execute an :func:`order_read_query` statement and attach the order items.
+
+    Items for every returned order are fetched with one extra ``IN`` query, so
+    a listing costs two statements no matter how many orders it contains.
+    Rows are turned into plain dicts that match ``OrderRead``; no ORM objects
+    or lazy relationship loads are involved.
+    """
+
+    orders = [dict(row._mapping, items=[]) for row in db.execute(stmt)]
+    if not orders:
+        return orders
+    by_id = {order["id"]: order for order in orders}
+    items = db.execute(
+        select(
+            OrderItem.order_id,
+            OrderItem.id,
+            OrderItem.product_id,
+            OrderItem.quantity,
+            OrderItem.price_at_order,
+        )
+        .where(OrderItem.order_id.in_(by_id))
+        .order_by(OrderItem.order_id, OrderItem.id)
+    )
+    for row in items:
+        item = dict(row._mapping)
+        by_id[item.pop("order_id")]["items"].append(item)
+    return orders
@@ -0,0 +1,242 @@
+"""Daily sales rollups of the ``app`` order model.
+
+``sales_daily_products``, ``sales_daily_categories`` and
+``sales_daily_totals`` hold units, revenue and order counts per day, so
+revenue questions never scan ``orders`` and ``order_items``. The totals keep
+the distinct orders of the day, which the per-category counts would overstate
+for orders spanning several categories. Cancelled orders are left out:
+
+* :func:`record_order` adds a new order's lines when it is placed,
+* :func:`record_status_change` subtracts them when an order moves to
+  ``CANCELLED`` and adds them back when it leaves it.
+
+Lines are counted under ``order_items.category_id``, the category of the
+product when it was ordered, so a cancellation takes a sale out of the
+category it was added to even if the product has moved since.
+
+Both accumulate into the rollups with ``INSERT ... SELECT ... ON CONFLICT DO
+UPDATE`` in the transaction that writes the order, so the rollups commit or
+roll back with it. :func:`rebuild_sales_rollups` recomputes a date range from
+the orders themselves; run it after bulk loads or to repair drift::
+
+    python -m app.services.sales --start 2024-01-01 --end 2026-01-01
+"""
+import argparse
+import json
+import sys
+import time
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    Executable,
+    Insert,
+    Select,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import CategorySalesDaily, Order, OrderItem, OrderStatus, ProductSalesDaily, TotalSalesDaily
+from app.schemas.sales import Granularity
+
+_UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_PRODUCT_KEYS = ("day", "product_id", "category_id")
+_CATEGORY_KEYS = ("day", "category_id")
+_TOTAL_KEYS = ("day",)
+_TOTALS = ("units", "revenue", "order_count")
+
+# UTC date an order was placed on.
+_order_day = func.date(Order.created_at, type_=Date)
+
+
+def _sales(
+    keys: tuple[ColumnElement, ...],
+    conditions: list[ColumnElement[bool]],
+    sign: int = 1,
+    attributes: tuple[ColumnElement, ...] = (),
+) -> Select:
+    return (
+        select(
+            _order_day,
+            *keys,
+            *attributes,
+            func.sum(OrderItem.quantity) * sign,
+            func.sum(OrderItem.quantity * OrderItem.price_at_order) * sign,
+            func.count(func.distinct(Order.id)) * sign,
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(*conditions)
+        .group_by(_order_day, *keys)
+    )
+
+
+def _product_sales(conditions: list[ColumnElement[bool]], sign: int = 1) -> Select:
+    # One row per product and day even if the product changed category that
+    # day; the product rollup only labels its rows with a category.
+    return _sales((OrderItem.product_id,), conditions, sign, (func.max(OrderItem.category_id),))
+
+
+def _category_sales(conditions: list[ColumnElement[bool]], sign: int = 1) -> Select:
+    return _sales((OrderItem.category_id,), conditions, sign)
+
+
+def _total_sales(conditions: list[ColumnElement[bool]], sign: int = 1) -> Select:
+    return _sales((), conditions, sign)
+
+
+def _accumulate(dialect: str, model: type, keys: tuple[str, ...], rows: Select) -> Insert:
+    upsert = _UPSERTS[dialect](model).from_select((*keys, *_TOTALS), rows)
+    return upsert.on_conflict_do_update(
+        index_elements=list(model.__table__.primary_key.columns),
+        set_={name: getattr(model, name) + getattr(upsert.excluded, name) for name in _TOTALS},
+    )
+
+
+def _apply(db: Session, conditions: list[ColumnElement[bool]], sign: int) -> None:
+    dialect = db.get_bind().dialect.name
+    db.execute(_accumulate(dialect, ProductSalesDaily, _PRODUCT_KEYS, _product_sales(conditions, sign)))
+    db.execute(_accumulate(dialect, CategorySalesDaily, _CATEGORY_KEYS, _category_sales(conditions, sign)))
+    db.execute(_accumulate(dialect, TotalSalesDaily, _TOTAL_KEYS, _total_sales(conditions, sign)))
+
+
+def record_order(db: Session, order_id: int) -> None:
+    """Add a placed order to the rollups. Its lines must have been flushed."""
+
+    _apply(db, [Order.id == order_id], 1)
+
+
+def record_status_change(db: Session, order_id: int, previous: OrderStatus, current: OrderStatus) -> None:
+    """Take an order out of the rollups when it is cancelled, or put it back when it is restored."""
+
+    cancelled = OrderStatus.CANCELLED
+    if (previous == cancelled) != (current == cancelled):
+        _apply(db, [Order.id == order_id], 1 if previous == cancelled else -1)
+
+
+def sales_rollup_statements(start: date | None = None, end: date | None = None) -> list[Executable]:
+    """Return the statements recomputing the rollups over ``[start, end)`` from ``orders``.
+
+    Either bound may be omitted to leave that side of the range open.
+    """
+
+    order_conditions = [Order.status != OrderStatus.CANCELLED]
+    statements: list[Executable] = []
+    for model in (ProductSalesDaily, CategorySalesDaily, TotalSalesDaily):
+        day_conditions = []
+        if start is not None:
+            day_conditions.append(model.day >= start)
+        if end is not None:
+            day_conditions.append(model.day < end)
+        statements.append(delete(model).where(*day_conditions))
+    if start is not None:
+        order_conditions.append(Order.created_at >= datetime.combine(start, datetime.min.time()))
+    if end is not None:
+        order_conditions.append(Order.created_at < datetime.combine(end, datetime.min.time()))
+    statements.append(
+        insert(ProductSalesDaily).from_select((*_PRODUCT_KEYS, *_TOTALS), _product_sales(order_conditions))
+    )
+    statements.append(
+        insert(CategorySalesDaily).from_select((*_CATEGORY_KEYS, *_TOTALS), _category_sales(order_conditions))
+    )
+    statements.append(
+        insert(TotalSalesDaily).from_select((*_TOTAL_KEYS, *_TOTALS), _total_sales(order_conditions))
+    )
+    return statements
+
+
+def rebuild_sales_rollups(db: Session, start: date, end: date) -> None:
+    """Recompute the rollup rows of ``[start, end)`` from ``orders`` and commit."""
+
+    for stmt in sales_rollup_statements(start, end):
+        db.execute(stmt)
+    db.commit()
+
+
+def _period(dialect: str, granularity: Granularity, day: ColumnElement[date]) -> ColumnElement[date]:
+    if granularity is Granularity.DAY:
+        return day
+    # Literal SQL rather than bound parameters, so the select list and GROUP BY
+    # render the same expression.
+    if dialect == "postgresql":
+        return func.date_trunc(literal_column(f"'{granularity.value}'"), day).cast(Date)
+    modifiers = {Granularity.WEEK: ("'weekday 0'", "'-6 days'"), Granularity.MONTH: ("'start of month'",)}
+    return func.date(day, *map(literal_column, modifiers[granularity]), type_=Date)
+
+
+def _totals(model: type = CategorySalesDaily) -> tuple[ColumnElement, ...]:
+    return (
+        func.sum(model.units).label("units"),
+        func.sum(model.revenue).label("revenue"),
+        func.sum(model.order_count).label("order_count"),
+    )
+
+
+def revenue_by_period_statement(
+    dialect: str, granularity: Granularity, start: date, end: date, category_id: int | None = None
+) -> Select:
+    """Return revenue per day, week (from Monday) or month of ``[start, end)``.
+
+    Over all categories the day totals are read, so each order counts once.
+    """
+
+    model = TotalSalesDaily if category_id is None else CategorySalesDaily
+    period = _period(dialect, granularity, model.day)
+    stmt = select(period.label("period"), *_totals(model)).where(model.day >= start, model.day < end)
+    if category_id is not None:
+        stmt = stmt.where(CategorySalesDaily.category_id == category_id)
+    return stmt.group_by(period).order_by(period)
+
+
+def revenue_by_category_statement(start: date, end: date) -> Select:
+    """Return revenue per category over ``[start, end)``, highest first."""
+
+    return (
+        select(CategorySalesDaily.category_id, *_totals())
+        .where(CategorySalesDaily.day >= start, CategorySalesDaily.day < end)
+        .group_by(CategorySalesDaily.category_id)
+        .order_by(func.sum(CategorySalesDaily.revenue).desc(), CategorySalesDaily.category_id)
+    )
+
+
+def _chunks(start: date, end: date, days: int) -> Iterator[tuple[date, date]]:
+    while start < end:
+        stop = min(start + timedelta(days=days), end)
+        yield start, stop
+        start = stop
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the daily sales rollups of a date range.")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="first day to rebuild")
+    parser.add_argument(
+        "--end",
+        type=date.fromisoformat,
+        default=date.today() + timedelta(days=1),
+        help="day after the last one to rebuild; defaults to tomorrow",
+    )
+    parser.add_argument("--chunk-days", type=int, default=31, help="days rebuilt per transaction")
+    args = parser.parse_args(argv)
+
+    from app.db.session import SessionLocal
+
+    started = time.perf_counter()
+    report: dict[str, Any] = {"start": args.start.isoformat(), "end": args.end.isoformat(), "chunks": 0}
+    with SessionLocal() as db:
+        for chunk_start, chunk_end in _chunks(args.start, args.end, args.chunk_days):
+            rebuild_sales_rollups(db, chunk_start, chunk_end)
+            report["chunks"] += 1
+    report["elapsed_s"] = round(time.perf_counter() - started, 2)
+    print(json.dumps(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
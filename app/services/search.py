@@ -0,0 +1,99 @@
+"""Ranked product search over the index defined in :mod:`app.models.search`.
+
+On PostgreSQL a product matches when the query matches its ``tsvector`` or
+is word-similar to its name (``pg_trgm``), so a misspelt word still finds
+it; the rank is the sum of ``ts_rank_cd`` and the trigram similarity. On
+SQLite every query word is matched as a prefix in the FTS5 table and ranked
+by BM25; typo tolerance is PostgreSQL only.
+
+Results are ordered by ``(rank desc, id)`` and keyset-paginated on that pair,
+so every page is one index-backed statement.
+"""
+import re
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    column,
+    false,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+)
+
+from app.api.pagination import PageParams, decode_cursor, encode_cursor
+from app.models import Product
+from app.models.search import TS_CONFIG
+from app.schemas.pagination import SortOrder
+
+RANK = "rank"
+
+_WORD = re.compile(r"\w+")
+_search_vector = literal_column("products.search_vector")
+_products_fts = table("products_fts", column("rowid"))
+# Column weights of name, barcode, category and description.
+_BM25_WEIGHTS = (10.0, 10.0, 4.0, 1.0)
+
+
+def _postgresql_match(q: str) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    tsquery = func.websearch_to_tsquery(literal_column(f"'{TS_CONFIG}'::regconfig"), q)
+    match = or_(_search_vector.op("@@")(tsquery), literal(q).op("<%")(Product.name))
+    rank = func.ts_rank_cd(_search_vector, tsquery) + func.word_similarity(q, Product.name)
+    return match, rank
+
+
+def fts5_query(q: str) -> str | None:
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+
+    words = _WORD.findall(q.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_statement(dialect: str, q: str, page: PageParams) -> Select:
+    """Return one page of products matching ``q``, best first.
+
+    Rows are ``(Product, rank)``; one extra row is fetched, as with
+    :func:`app.api.pagination.paginate`.
+    """
+
+    if dialect == "postgresql":
+        match, rank = _postgresql_match(q)
+        stmt = select(Product, rank.label(RANK)).where(match)
+    else:
+        query = fts5_query(q)
+        rank = -func.bm25(literal_column("products_fts"), *_BM25_WEIGHTS)
+        stmt = select(Product, rank.label(RANK)).join(_products_fts, _products_fts.c.rowid == Product.id)
+        stmt = stmt.where(literal_column("products_fts").op("MATCH")(query) if query else false())
+    if page.cursor is not None:
+        last_rank, last_id = _decode(page.cursor)
+        stmt = stmt.where(or_(rank < last_rank, and_(rank == last_rank, Product.id > last_id)))
+    return stmt.order_by(rank.desc(), Product.id).limit(page.limit + 1)
+
+
+def _decode(cursor: str) -> tuple[float, int]:
+    values = decode_cursor(cursor, RANK, SortOrder.DESC)
+    try:
+        last_rank, last_id = values
+        return float(last_rank), int(last_id)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def build_search_page(rows: Sequence[Any], page: PageParams) -> dict[str, Any]:
+    """Turn the rows of :func:`search_statement` into a page payload."""
+
+    items = [row[0] for row in rows[: page.limit]]
+    next_cursor = None
+    if len(rows) > page.limit and items:
+        last = rows[page.limit - 1]
+        next_cursor = encode_cursor(RANK, SortOrder.DESC, [last[1], last[0].id])
+    return {"items": items, "next_cursor": next_cursor}
@@ -1,10 +1,37 @@
-"""Mock external API synchronisation helpers."""
-from collections.abc import Iterable
-from typing import Dict
+"""Batched, diff-based synchronisation of product stock with an external feed.
 
+A sync run goes through four timed phases:
+
+``fetch``
+    read quantities and prices for the requested ids from a :class:`StockFeed`;
+``load``
+    read the current values of every requested row with one ``SELECT``;
+``diff``
+    keep only rows whose quantity or price actually differs from the feed;
+``write``
+    update the changed rows in chunks with one bulk ``UPDATE`` per chunk
+    (``UPDATE ... FROM (VALUES ...)`` on PostgreSQL, a ``CASE`` update
+    elsewhere), collecting the new rows via ``RETURNING``, then commit once.
+
+The feed is pluggable: the in-memory mock, a local JSON/CSV file or an HTTP
+endpoint serving the same JSON, selected by ``STOCK_FEED_SOURCE``.
+"""
+import csv
+import json
+import time
+import urllib.request
+from collections.abc import Collection, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Protocol
+
+from sqlalchemy import Float, Integer, Row, case, column, select, update, values
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
 from app.models import ProductStock
+from app.services.availability import refresh_availability
 
 EXTERNAL_MOCK_DATA: Dict[int, Dict[str, float]] = {
     # product_stock_id: {"qty": int, "sale_price": float}
@@ -13,23 +40,234 @@ EXTERNAL_MOCK_DATA: Dict[int, Dict[str, float]] = {
 }
 
 
-def sync_product_stock_from_external_api(db: Session, product_stock_ids: Iterable[int]) -> list[ProductStock]:
-    """Update price and quantity from the mocked external API."""
-
-    updated_records: list[ProductStock] = []
-    for stock_id in product_stock_ids:
-        payload = EXTERNAL_MOCK_DATA.get(stock_id)
-        if payload is None:
-            continue
-        product_stock = db.query(ProductStock).filter(ProductStock.id == stock_id).first()
-        if product_stock is None:
-            continue
-        product_stock.qty = int(payload["qty"])
-        product_stock.sale_price = float(payload["sale_price"])
-        db.add(product_stock)
-        updated_records.append(product_stock)
-    if updated_records:
-        db.commit()
-        for record in updated_records:
-            db.refresh(record)
-    return updated_records
+class FeedEntry(NamedTuple):
+    """Quantity and price reported by the external feed for one row."""
+
+    qty: int
+    sale_price: float
+
+
+class StockFeed(Protocol):
+    """Source of external stock values."""
+
+    def fetch(self, product_stock_ids: Collection[int]) -> dict[int, FeedEntry]:
+        """Return feed entries for the requested ids that the feed knows about."""
+
+
+def parse_feed_records(records: Any) -> dict[int, FeedEntry]:
+    """Normalise feed records into ``{product_stock_id: FeedEntry}``.
+
+    Accepts either a mapping of id to ``{"qty", "sale_price"}`` or an
+    iterable of records that also carry an ``id`` key.
+    """
+
+    if isinstance(records, dict):
+        items: Iterable[tuple[Any, Any]] = records.items()
+    else:
+        items = ((record["id"], record) for record in records)
+    return {
+        int(key): FeedEntry(int(value["qty"]), float(value["sale_price"]))
+        for key, value in items
+    }
+
+
+def _select(entries: dict[int, FeedEntry], product_stock_ids: Collection[int]) -> dict[int, FeedEntry]:
+    return {stock_id: entries[stock_id] for stock_id in product_stock_ids if stock_id in entries}
+
+
+class MockStockFeed:
+    """Feed backed by an in-memory mapping, :data:`EXTERNAL_MOCK_DATA` by default."""
+
+    def __init__(self, data: Dict[int, Dict[str, float]] | None = None) -> None:
+        self.entries = parse_feed_records(EXTERNAL_MOCK_DATA if data is None else data)
+
+    def fetch(self, product_stock_ids: Collection[int]) -> dict[int, FeedEntry]:
+        return _select(self.entries, product_stock_ids)
+
+
+class FileStockFeed:
+    """Feed read from a local JSON file or a CSV file with ``id,qty,sale_price`` columns."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def fetch(self, product_stock_ids: Collection[int]) -> dict[int, FeedEntry]:
+        with self.path.open(newline="", encoding="utf-8") as handle:
+            if self.path.suffix.lower() == ".csv":
+                entries = parse_feed_records(csv.DictReader(handle))
+            else:
+                entries = parse_feed_records(json.load(handle))
+        return _select(entries, product_stock_ids)
+
+
+class HttpStockFeed:
+    """Feed served as JSON over HTTP, e.g. a local supplier stub."""
+
+    def __init__(self, url: str, timeout: float = 10.0) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self, product_stock_ids: Collection[int]) -> dict[int, FeedEntry]:
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            entries = parse_feed_records(json.load(response))
+        return _select(entries, product_stock_ids)
+
+
+def get_stock_feed(source: str | None = None) -> StockFeed:
+    """Return the feed configured by ``source`` or ``STOCK_FEED_SOURCE``.
+
+    ``http(s)://`` URLs select :class:`HttpStockFeed`, any other value is a
+    file path and no value keeps the in-memory mock.
+    """
+
+    source = source or get_settings().STOCK_FEED_SOURCE
+    if not source:
+        return MockStockFeed()
+    if source.startswith(("http://", "https://")):
+        return HttpStockFeed(source)
+    return FileStockFeed(source)
+
+
+@dataclass
+class SyncReport:
+    """Outcome of a sync run."""
+
+    scanned: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    missing_in_feed: int = 0
+    missing_in_db: int = 0
+    timings: dict[str, float] = field(default_factory=dict)
+    updated: list[Row] = field(default_factory=list)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Accumulate the wall time spent in ``name``."""
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the report with timings in milliseconds."""
+
+        return {
+            "scanned": self.scanned,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "missing_in_feed": self.missing_in_feed,
+            "missing_in_db": self.missing_in_db,
+            "timings_ms": {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()},
+            "updated": self.updated,
+        }
+
+
+def fetch_feed(feed: StockFeed, product_stock_ids: Collection[int], report: SyncReport) -> dict[int, FeedEntry]:
+    """Run the ``fetch`` phase; kept separate so async callers can off-load it."""
+
+    with report.phase("fetch"):
+        return feed.fetch(product_stock_ids)
+
+
+# Plain rows rather than ORM instances, so nothing is reloaded after commit.
+_RETURNED_COLUMNS = (
+    ProductStock.id,
+    ProductStock.product_id,
+    ProductStock.stock_id,
+    ProductStock.qty,
+    ProductStock.sale_price,
+)
+
+
+def _update_statement(db: Session, chunk: list[tuple[int, int, float]]):
+    if db.get_bind().dialect.name == "postgresql":
+        feed = values(
+            column("id", Integer), column("qty", Integer), column("sale_price", Float), name="feed"
+        ).data(chunk)
+        return (
+            update(ProductStock)
+            .where(ProductStock.id == feed.c.id)
+            .values(qty=feed.c.qty, sale_price=feed.c.sale_price)
+        )
+    ids = [stock_id for stock_id, _, _ in chunk]
+    return (
+        update(ProductStock)
+        .where(ProductStock.id.in_(ids))
+        .values(
+            qty=case({stock_id: qty for stock_id, qty, _ in chunk}, value=ProductStock.id),
+            sale_price=case({stock_id: price for stock_id, _, price in chunk}, value=ProductStock.id),
+        )
+    )
+
+
+def write_chunks(row_count: int, chunk_size: int | None = None) -> int:
+    """Return the most bulk ``UPDATE`` statements a sync of ``row_count`` rows runs."""
+
+    chunk_size = chunk_size or get_settings().STOCK_SYNC_CHUNK_SIZE
+    return -(-row_count // chunk_size)
+
+
+def apply_stock_feed(
+    db: Session,
+    product_stock_ids: Iterable[int],
+    entries: dict[int, FeedEntry],
+    report: SyncReport | None = None,
+    chunk_size: int | None = None,
+) -> SyncReport:
+    """Write feed values that differ from the stored ones and commit once.
+
+    The ``product_availability`` rows of the changed products are refreshed
+    in the same transaction.
+    """
+
+    report = report or SyncReport()
+    chunk_size = chunk_size or get_settings().STOCK_SYNC_CHUNK_SIZE
+    requested = list(dict.fromkeys(product_stock_ids))
+
+    with report.phase("load"):
+        stmt = select(ProductStock.id, ProductStock.qty, ProductStock.sale_price).where(
+            ProductStock.id.in_(requested)
+        )
+        current = {row.id: row for row in db.execute(stmt)}
+
+    with report.phase("diff"):
+        changes: list[tuple[int, int, float]] = []
+        for stock_id in requested:
+            row = current.get(stock_id)
+            entry = entries.get(stock_id)
+            if row is None:
+                report.missing_in_db += 1
+                continue
+            report.scanned += 1
+            if entry is None:
+                report.missing_in_feed += 1
+            elif row.qty != entry.qty or row.sale_price != entry.sale_price:
+                changes.append((stock_id, entry.qty, entry.sale_price))
+            else:
+                report.unchanged += 1
+
+    with report.phase("write"):
+        for start in range(0, len(changes), chunk_size):
+            stmt = _update_statement(db, changes[start:start + chunk_size]).returning(*_RETURNED_COLUMNS)
+            report.updated.extend(db.execute(stmt, execution_options={"synchronize_session": False}).all())
+        if changes:
+            refresh_availability(db, {row.product_id for row in report.updated})
+            db.commit()
+    report.changed = len(report.updated)
+    return report
+
+
+def sync_product_stock_from_feed(
+    db: Session,
+    product_stock_ids: Iterable[int],
+    feed: StockFeed | None = None,
+    chunk_size: int | None = None,
+) -> SyncReport:
+    """Fetch ``product_stock_ids`` from ``feed`` and apply the differences."""
+
+    requested = list(dict.fromkeys(product_stock_ids))
+    report = SyncReport()
+    entries = fetch_feed(feed or get_stock_feed(), requested, report)
+    return apply_stock_feed(db, requested, entries, report, chunk_size)
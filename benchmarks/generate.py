@@ -0,0 +1,590 @@
+"""Generate production-scale synthetic data for the ``app`` and legacy schemas.
+
+``common/data/randomize_sale.py`` rewrites one sale per round trip; this tool
+writes millions of rows in minutes instead::
+
+    python -m benchmarks.generate --schema app --scale 1
+    python -m benchmarks.generate --schema legacy --legacy-url postgresql://... --scale 5
+    python -m benchmarks.generate --schema app legacy --seed 7 --years 3
+
+The data has the skew production traffic has, which uniform random data
+hides:
+
+* SKU popularity, customer activity and category sizes follow Zipf
+  distributions, so a few products dominate the order lines,
+* order dates follow a seasonal calendar: year-over-year growth, a November
+  and December peak, busier weekends and a daytime curve within each day.
+  Orders are generated in date order, so ids grow with ``created_at``.
+
+Rows are streamed in batches: through ``COPY ... FROM STDIN`` on PostgreSQL
+with psycopg2 and through multi-row ``INSERT`` statements elsewhere. Ids are
+assigned here, after the highest existing id of each table, so generating
+appends to an existing database and foreign keys need no round trip. The same
+``--seed``, ``--scale`` and ``--end`` always produce the same rows.
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+from bisect import bisect
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from itertools import accumulate
+from typing import Any
+
+from sqlalchemy import Connection, Engine, Table, create_engine, func, insert, select, text
+
+BATCH_SIZE = 10_000
+PASSWORD = "synthetic-password"
+
+MONTH_WEIGHTS = (0.8, 0.75, 0.9, 0.95, 1.0, 0.95, 0.9, 0.95, 1.0, 1.1, 1.45, 1.8)
+WEEKDAY_WEIGHTS = (0.9, 0.9, 0.95, 1.0, 1.1, 1.3, 1.2)
+HOUR_WEIGHTS = (
+    0.2, 0.1, 0.1, 0.1, 0.1, 0.2, 0.4, 0.7, 1.0, 1.2, 1.3, 1.4,
+    1.5, 1.4, 1.3, 1.3, 1.4, 1.5, 1.7, 1.9, 1.9, 1.6, 1.0, 0.5,
+)  # fmt: skip
+HOUR_CUM_WEIGHTS = list(accumulate(HOUR_WEIGHTS))
+ITEMS_PER_ORDER = (1, 2, 3, 4, 5, 6)
+ITEMS_CUM_WEIGHTS = list(accumulate((40, 25, 15, 10, 6, 4)))
+ADJECTIVES = ("Classic", "Compact", "Deluxe", "Eco", "Essential", "Pro", "Smart", "Ultra", "Vintage", "Wireless")
+NOUNS = ("Backpack", "Blender", "Candle", "Chair", "Headphones", "Jacket", "Kettle", "Lamp", "Mug", "Sneakers")
+FIRST_NAMES = ("Aisha", "Ben", "Chen", "Diego", "Elif", "Farah", "Goran", "Hana", "Ivan", "Jun", "Kofi", "Lena")
+LAST_NAMES = ("Ahmed", "Baig", "Costa", "Dubois", "Evans", "Fischer", "Garcia", "Haddad", "Ito", "Jensen")
+
+
+@dataclass(frozen=True)
+class Volume:
+    """Row counts at ``--scale 1``; order and sale lines average ~2.3 per order."""
+
+    users: int = 50_000
+    categories: int = 200
+    products: int = 20_000
+    locations: int = 12
+    orders: int = 1_000_000
+    lots_per_product: int = 4
+    sales: int = 1_000_000
+
+    def times(self, factor: float) -> "Volume":
+        return Volume(
+            users=max(2, int(self.users * factor)),
+            categories=max(1, int(self.categories * factor)),
+            products=max(1, int(self.products * factor)),
+            locations=self.locations,
+            orders=int(self.orders * factor),
+            lots_per_product=self.lots_per_product,
+            sales=int(self.sales * factor),
+        )
+
+
+Batch = tuple[Table, Sequence[str], list[tuple]]
+
+
+class Zipf:
+    """Draw from ``population`` with the k-th most popular item weighted ``1 / k**s``.
+
+    Popularity ranks are shuffled, so popular items are not simply the
+    lowest ids.
+    """
+
+    def __init__(self, population: Sequence[Any], s: float, rng: random.Random) -> None:
+        self.population = list(population)
+        rng.shuffle(self.population)
+        self.cum_weights = list(accumulate(1 / rank**s for rank in range(1, len(self.population) + 1)))
+        self.total = self.cum_weights[-1]
+
+    def draw(self, rng: random.Random) -> Any:
+        return self.population[bisect(self.cum_weights, rng.random() * self.total)]
+
+    def sample(self, rng: random.Random, k: int) -> list[Any]:
+        return rng.choices(self.population, cum_weights=self.cum_weights, k=k)
+
+
+def seasonal_days(total: int, first: date, days: int, growth: float) -> Iterator[tuple[date, int]]:
+    """Spread ``total`` events over ``days`` days starting at ``first``.
+
+    A day's share is its month, weekday and linear growth weight; fractions
+    are carried over to the next day so the counts add up to ``total``
+    exactly.
+    """
+
+    calendar = [first + timedelta(days=offset) for offset in range(days)]
+    weights = [
+        MONTH_WEIGHTS[day.month - 1] * WEEKDAY_WEIGHTS[day.weekday()] * (1 + growth * offset / max(1, days))
+        for offset, day in enumerate(calendar)
+    ]
+    scale = total / sum(weights)
+    carry = 0.0
+    emitted = 0
+    for index, (day, weight) in enumerate(zip(calendar, weights)):
+        carry += weight * scale
+        count = total - emitted if index == days - 1 else int(carry)
+        carry -= count
+        emitted += count
+        if count:
+            yield day, count
+
+
+def day_timestamps(rng: random.Random, day: date, count: int) -> list[datetime]:
+    """Return ``count`` sorted timestamps of ``day`` following the daily curve."""
+
+    midnight = datetime(day.year, day.month, day.day)
+    hours = rng.choices(range(24), cum_weights=HOUR_CUM_WEIGHTS, k=count)
+    return sorted(midnight + timedelta(seconds=hour * 3600 + rng.randrange(3600)) for hour in hours)
+
+
+def _name(rng: random.Random, ident: int) -> str:
+    return f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {ident}"
+
+
+def _price_cents(rng: random.Random) -> int:
+    """Log-normal prices: mostly tens of currency units, a long tail above."""
+
+    return max(99, min(500_000, int(rng.lognormvariate(8.0, 1.0))))
+
+
+def _cents(value: int) -> Decimal:
+    return Decimal(value).scaleb(-2)
+
+
+def _batched(table: Table, columns: Sequence[str], rows: Iterable[tuple]) -> Iterator[Batch]:
+    batch: list[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield table, columns, batch
+            batch = []
+    if batch:
+        yield table, columns, batch
+
+
+@dataclass
+class Plan:
+    """Everything a schema generator needs besides the schema itself."""
+
+    volume: Volume
+    rng: random.Random
+    start: date
+    days: int
+    growth: float
+    hashed_password: str
+    first_ids: dict[str, int]
+
+    @property
+    def now(self) -> datetime:
+        end = self.start + timedelta(days=self.days)
+        return datetime(end.year, end.month, end.day)
+
+    def ids(self, table: Table, count: int) -> range:
+        first = self.first_ids[table.name]
+        return range(first, first + count)
+
+    def moment(self) -> datetime:
+        """A uniformly random timestamp within the generated window."""
+
+        return datetime(self.start.year, self.start.month, self.start.day) + timedelta(
+            seconds=self.rng.randrange(self.days * 86400)
+        )
+
+
+def generate_app(plan: Plan) -> Iterator[Batch]:
+    """Rows of the ``app`` schema in foreign key order."""
+
+    from app.models import Category, Order, OrderItem, OrderStatus, Product, ProductStock, Stock, User, UserRoleEnum
+
+    rng, volume = plan.rng, plan.volume
+    users, categories, products, stocks, product_stocks, orders, order_items = (
+        model.__table__ for model in (User, Category, Product, Stock, ProductStock, Order, OrderItem)
+    )
+
+    user_ids = plan.ids(users, volume.users)
+    yield from _batched(
+        users,
+        ("id", "email", "hashed_password", "role", "is_active", "is_verified", "created_at"),
+        (
+            (
+                user_id,
+                f"synthetic-{user_id}@example.com",
+                plan.hashed_password,
+                UserRoleEnum.ADMIN if index == 0 else UserRoleEnum.CUSTOMER,
+                True,
+                True,
+                plan.moment(),
+            )
+            for index, user_id in enumerate(user_ids)
+        ),
+    )
+
+    category_ids = plan.ids(categories, volume.categories)
+    yield from _batched(
+        categories,
+        ("id", "name", "description", "created_at", "updated_at"),
+        ((category_id, f"Category {category_id}", None, plan.now, plan.now) for category_id in category_ids),
+    )
+
+    product_ids = plan.ids(products, volume.products)
+    category_sizes = Zipf(category_ids, 0.8, rng)
+    # Filled as the products are drawn, for the category recorded on order lines.
+    product_categories: dict[int, int] = {}
+    yield from _batched(
+        products,
+        ("id", "name", "barcode", "description", "category_id", "created_at", "updated_at"),
+        (
+            (
+                product_id,
+                _name(rng, product_id),
+                f"SYN{product_id:013d}",
+                None,
+                product_categories.setdefault(product_id, category_sizes.draw(rng)),
+                created,
+                created,
+            )
+            for product_id in product_ids
+            for created in (plan.moment(),)
+        ),
+    )
+
+    stock_ids = plan.ids(stocks, volume.locations)
+    yield from _batched(
+        stocks, ("id", "location"), ((stock_id, f"Warehouse {stock_id}") for stock_id in stock_ids)
+    )
+
+    prices = {product_id: _price_cents(rng) / 100 for product_id in product_ids}
+    placements = (
+        (product_id, stock_id)
+        for product_id in product_ids
+        for stock_id in sorted(rng.sample(stock_ids, rng.randint(1, min(3, len(stock_ids)))))
+    )
+    yield from _batched(
+        product_stocks,
+        ("id", "product_id", "stock_id", "qty", "sale_price"),
+        (
+            (product_stock_id, product_id, stock_id, rng.randint(0, 5_000), prices[product_id])
+            for product_stock_id, (product_id, stock_id) in zip(
+                range(plan.first_ids[product_stocks.name], sys.maxsize), placements
+            )
+        ),
+    )
+
+    item_columns = ("id", "order_id", "product_id", "category_id", "quantity", "price_at_order")
+    customers = Zipf(user_ids, 0.7, rng)
+    popularity = Zipf(product_ids, 1.1, rng)
+    order_id = plan.first_ids[orders.name]
+    item_id = plan.first_ids[order_items.name]
+    order_rows: list[tuple] = []
+    item_rows: list[tuple] = []
+    recent = plan.now - timedelta(days=3)
+    for day, count in seasonal_days(volume.orders, plan.start, plan.days, plan.growth):
+        for created in day_timestamps(rng, day, count):
+            if created >= recent:
+                status = rng.choice((OrderStatus.CREATED, OrderStatus.PAID, OrderStatus.DONE))
+            else:
+                status = OrderStatus.CANCELLED if rng.random() < 0.04 else OrderStatus.DONE
+            order_rows.append((order_id, customers.draw(rng), status, created, created))
+            lines = rng.choices(ITEMS_PER_ORDER, cum_weights=ITEMS_CUM_WEIGHTS)[0]
+            for product_id in set(popularity.sample(rng, lines)):
+                item_rows.append(
+                    (
+                        item_id,
+                        order_id,
+                        product_id,
+                        product_categories[product_id],
+                        rng.randint(1, 3),
+                        prices[product_id],
+                    )
+                )
+                item_id += 1
+            order_id += 1
+        if len(order_rows) >= BATCH_SIZE:
+            yield orders, ("id", "user_id", "status", "created_at", "updated_at"), order_rows
+            yield order_items, item_columns, item_rows
+            order_rows, item_rows = [], []
+    if order_rows:
+        yield orders, ("id", "user_id", "status", "created_at", "updated_at"), order_rows
+        yield order_items, item_columns, item_rows
+
+
+def generate_legacy(plan: Plan) -> Iterator[Batch]:
+    """Rows of the legacy ``models`` schema in foreign key order."""
+
+    from models.category import Category
+    from models.inventory import Inventory
+    from models.product import Product
+    from models.sale import Sale
+    from models.sale_item import SaleItem
+    from models.user import User
+
+    rng, volume = plan.rng, plan.volume
+    users, categories, products, inventory, sales, sale_items = (
+        model.__table__ for model in (User, Category, Product, Inventory, Sale, SaleItem)
+    )
+
+    user_ids = plan.ids(users, volume.users)
+    yield from _batched(
+        users,
+        ("id", "first_name", "last_name", "email", "hashed_password", "is_active", "created_at", "updated_at"),
+        (
+            (
+                user_id,
+                rng.choice(FIRST_NAMES),
+                rng.choice(LAST_NAMES),
+                f"synthetic-{user_id}@example.com",
+                plan.hashed_password,
+                1,
+                created,
+                created,
+            )
+            for user_id in user_ids
+            for created in (plan.moment(),)
+        ),
+    )
+
+    category_ids = plan.ids(categories, volume.categories)
+    yield from _batched(
+        categories,
+        ("id", "category_name", "category_slug", "created_at"),
+        ((category_id, f"Category {category_id}", f"category-{category_id}", plan.now) for category_id in category_ids),
+    )
+
+    # Lots are drawn first so each product's quantity is the sum of its lots.
+    product_ids = plan.ids(products, volume.products)
+    lots = {
+        product_id: [
+            (plan.moment(), rng.randint(10, 500)) for _ in range(rng.randint(1, 2 * volume.lots_per_product - 1))
+        ]
+        for product_id in product_ids
+    }
+    prices = {product_id: _price_cents(rng) for product_id in product_ids}
+    category_sizes = Zipf(category_ids, 0.8, rng)
+    yield from _batched(
+        products,
+        (
+            "id", "product_name", "description", "category_id", "price", "quantity",
+            "is_active", "created_at", "updated_at",
+        ),  # fmt: skip
+        (
+            (
+                product_id,
+                _name(rng, product_id),
+                None,
+                category_sizes.draw(rng),
+                _cents(prices[product_id]),
+                sum(quantity for _, quantity in lots[product_id]),
+                1,
+                min(created for created, _ in lots[product_id]),
+                plan.now,
+            )
+            for product_id in product_ids
+        ),
+    )
+    yield from _batched(
+        inventory,
+        ("id", "product_id", "quantity", "created_at", "updated_at"),
+        (
+            (lot_id, product_id, quantity, created, created)
+            for lot_id, (product_id, quantity, created) in zip(
+                range(plan.first_ids[inventory.name], sys.maxsize),
+                (
+                    (product_id, quantity, created)
+                    for product_id in product_ids
+                    for created, quantity in sorted(lots[product_id])
+                ),
+            )
+        ),
+    )
+
+    customers = Zipf(user_ids, 0.7, rng)
+    popularity = Zipf(product_ids, 1.1, rng)
+    sale_id = plan.first_ids[sales.name]
+    item_id = plan.first_ids[sale_items.name]
+    sale_rows: list[tuple] = []
+    item_rows: list[tuple] = []
+    for day, count in seasonal_days(volume.sales, plan.start, plan.days, plan.growth):
+        for created in day_timestamps(rng, day, count):
+            lines = rng.choices(ITEMS_PER_ORDER, cum_weights=ITEMS_CUM_WEIGHTS)[0]
+            total = 0
+            for product_id in set(popularity.sample(rng, lines)):
+                quantity = rng.randint(1, 3)
+                total += quantity * prices[product_id]
+                item_rows.append((item_id, sale_id, product_id, quantity, _cents(prices[product_id])))
+                item_id += 1
+            sale_rows.append((sale_id, customers.draw(rng), _cents(total), created))
+            sale_id += 1
+        if len(sale_rows) >= BATCH_SIZE:
+            yield sales, ("id", "user_id", "total_amount", "created_at"), sale_rows
+            yield sale_items, ("id", "sale_id", "product_id", "quantity", "price_per_unit"), item_rows
+            sale_rows, item_rows = [], []
+    if sale_rows:
+        yield sales, ("id", "user_id", "total_amount", "created_at"), sale_rows
+        yield sale_items, ("id", "sale_id", "product_id", "quantity", "price_per_unit"), item_rows
+
+
+class InsertWriter:
+    """Write batches as multi-row ``INSERT`` statements."""
+
+    def __init__(self, conn: Connection) -> None:
+        self.conn = conn
+
+    def write(self, table: Table, columns: Sequence[str], rows: list[tuple]) -> None:
+        self.conn.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+class CopyWriter:
+    """Write batches with PostgreSQL ``COPY ... FROM STDIN`` through psycopg2."""
+
+    def __init__(self, conn: Connection) -> None:
+        self.conn = conn
+        self.preparer = conn.dialect.identifier_preparer
+        self.cursor = conn.connection.cursor()
+
+    @staticmethod
+    def _value(value: Any) -> Any:
+        # SQLAlchemy stores Python enums by member name.
+        if isinstance(value, Enum):
+            return value.name
+        return value
+
+    def write(self, table: Table, columns: Sequence[str], rows: list[tuple]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([self._value(value) for value in row])
+        buffer.seek(0)
+        names = ", ".join(self.preparer.quote(column) for column in columns)
+        self.cursor.copy_expert(
+            f"COPY {self.preparer.format_table(table)} ({names}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+
+def next_ids(conn: Connection, tables: Iterable[Table]) -> dict[str, int]:
+    return {table.name: conn.scalar(select(func.coalesce(func.max(table.c.id), 0))) + 1 for table in tables}
+
+
+def reset_sequences(conn: Connection, tables: Iterable[Table]) -> None:
+    """Move PostgreSQL id sequences past the explicitly inserted ids."""
+
+    if conn.dialect.name != "postgresql":
+        return
+    preparer = conn.dialect.identifier_preparer
+    for table in tables:
+        name = preparer.format_table(table)
+        conn.execute(
+            text(f"SELECT setval(pg_get_serial_sequence(:name, 'id'), (SELECT max(id) FROM {name}))"),
+            {"name": name},
+        )
+
+
+def load(
+    engine: Engine,
+    metadata,
+    generator,
+    plan_args: dict[str, Any],
+    finalize: Callable[[Connection], None] | None = None,
+) -> dict[str, int]:
+    """Create missing tables, stream ``generator`` into them and return row counts.
+
+    ``finalize`` runs in the same transaction once the rows are written, to
+    derive summary tables from them.
+    """
+
+    metadata.create_all(engine)
+    # Tables keyed by something other than a serial id are derived, not generated.
+    tables = [table for table in metadata.sorted_tables if "id" in table.c]
+    counts: dict[str, int] = {}
+    with engine.begin() as conn:
+        plan = Plan(first_ids=next_ids(conn, tables), **plan_args)
+        copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+        writer = CopyWriter(conn) if copy else InsertWriter(conn)
+        for table, columns, rows in generator(plan):
+            writer.write(table, columns, rows)
+            counts[table.name] = counts.get(table.name, 0) + len(rows)
+        reset_sequences(conn, tables)
+        if finalize is not None:
+            finalize(conn)
+    return counts
+
+
+def refresh_app_summaries(conn: Connection) -> None:
+    from app.services.availability import availability_upsert
+    from app.services.sales import sales_rollup_statements
+
+    conn.execute(availability_upsert(conn.dialect.name))
+    for statement in sales_rollup_statements():
+        conn.execute(statement)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--schema", nargs="+", choices=("app", "legacy"), default=["app"])
+    parser.add_argument("--database-url", help="sync URL of the app database; defaults to the app settings")
+    parser.add_argument("--legacy-url", help="sync URL of the legacy database; defaults to instance.config")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the default volume")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--years", type=float, default=2.0, help="length of the order history")
+    parser.add_argument("--growth", type=float, default=0.5, help="order volume growth over the history")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="last day of the history")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    from app.core.security import get_password_hash
+
+    volume = Volume().times(args.scale)
+    days = max(1, int(args.years * 365))
+    # One hash for every user: hashing millions of passwords would dominate the run.
+    hashed_password = get_password_hash(PASSWORD)
+    report: dict[str, Any] = {"seed": args.seed, "scale": args.scale, "volume": asdict(volume), "schemas": {}}
+
+    for schema in args.schema:
+        if schema == "app":
+            from app.models import Base
+
+            url = args.database_url
+            if url is None:
+                from app.db.session import database_url as url
+            metadata, generator, finalize = Base.metadata, generate_app, refresh_app_summaries
+        else:
+            from db.base import Base
+
+            url = args.legacy_url
+            if url is None:
+                from instance.config import config
+
+                url = config.ALEMBIC_URLS[config.APP_ENVIRONMENT]
+            metadata, generator, finalize = Base.metadata, generate_legacy, None
+
+        started = time.perf_counter()
+        counts = load(
+            create_engine(url),
+            metadata,
+            generator,
+            {
+                "volume": volume,
+                # Each schema gets its own stream so generating one never changes the other.
+                "rng": random.Random(f"{args.seed}:{schema}"),
+                "start": args.end - timedelta(days=days),
+                "days": days,
+                "growth": args.growth,
+                "hashed_password": hashed_password,
+            },
+            finalize,
+        )
+        elapsed = time.perf_counter() - started
+        report["schemas"][schema] = {
+            "elapsed_s": round(elapsed, 1),
+            "rows": counts,
+            "rows_per_s": round(sum(counts.values()) / elapsed) if elapsed else 0,
+        }
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
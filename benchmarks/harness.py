@@ -0,0 +1,305 @@
+"""Clients, latency recording and reports shared by the load-test scenarios.
+
+Two clients speak the same minimal interface, ``await client.request(method,
+path, json=..., headers=...)`` returning ``(status, headers, body)``:
+
+* :class:`ASGIClient` calls the ASGI app in-process, so a run measures the
+  application and the database without any network or server overhead,
+* :class:`HTTPClient` keeps one HTTP/1.1 keep-alive connection to a running
+  server, e.g. uvicorn started by ``benchmarks.load --serve``.
+
+Neither needs a third-party HTTP library.
+"""
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+Response = tuple[int, dict[str, str], bytes]
+
+
+def _encode(payload: Any, headers: Mapping[str, str] | None) -> tuple[bytes, dict[str, str]]:
+    merged = {key.lower(): value for key, value in (headers or {}).items()}
+    body = b""
+    if payload is not None:
+        body = json.dumps(payload).encode()
+        merged.setdefault("content-type", "application/json")
+    merged["content-length"] = str(len(body))
+    return body, merged
+
+
+class ASGIClient:
+    """Drive an ASGI application in-process."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def request(
+        self, method: str, path: str, json: Any = None, headers: Mapping[str, str] | None = None
+    ) -> Response:
+        body, merged = _encode(json, headers)
+        merged.setdefault("host", "benchmark")
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(key.encode(), value.encode()) for key, value in merged.items()],
+            "client": ("127.0.0.1", 50000),
+            "server": ("benchmark", 80),
+        }
+        done = asyncio.Event()
+        sent_request = False
+        status = 500
+        response_headers: dict[str, str] = {}
+        chunks: list[bytes] = []
+
+        async def receive() -> dict[str, Any]:
+            nonlocal sent_request
+            if not sent_request:
+                sent_request = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers.update(
+                    (key.decode("latin-1").lower(), value.decode("latin-1"))
+                    for key, value in message.get("headers", ())
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    done.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            done.set()
+        return status, response_headers, b"".join(chunks)
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPClient:
+    """One keep-alive HTTP/1.1 connection to ``base_url``."""
+
+    def __init__(self, base_url: str) -> None:
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def request(
+        self, method: str, path: str, json: Any = None, headers: Mapping[str, str] | None = None
+    ) -> Response:
+        body, merged = _encode(json, headers)
+        merged.setdefault("host", f"{self.host}:{self.port}")
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {self.prefix}{path} HTTP/1.1\r\n" + "".join(
+            f"{key}: {value}\r\n" for key, value in merged.items()
+        )
+        self._writer.write(head.encode("latin-1") + b"\r\n" + body)
+        try:
+            await self._writer.drain()
+            return await self._read_response()
+        except (OSError, asyncio.IncompleteReadError):
+            await self.close()
+            raise
+
+    async def _read_response(self) -> Response:
+        reader = self._reader
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        if "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                parts.append(chunk[:-2])
+            body = b"".join(parts)
+        else:
+            body = await reader.read()
+            headers["connection"] = "close"
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, headers, body
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Return the nearest-rank ``q`` percentile of an ascending list."""
+
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class RequestStats:
+    """Latencies and outcomes of one named request within a scenario."""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[int, int] = field(default_factory=dict)
+
+    def record(self, status: int, elapsed: float, ok: bool) -> None:
+        self.latencies.append(elapsed)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(ordered, 50) * 1000, 2),
+                "p95": round(percentile(ordered, 95) * 1000, 2),
+                "p99": round(percentile(ordered, 99) * 1000, 2),
+                "max": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+            },
+            "statuses": {str(status): seen for status, seen in sorted(self.statuses.items())},
+        }
+
+
+class Recorder:
+    """Time requests issued by a scenario, grouped by request name."""
+
+    def __init__(self) -> None:
+        self.requests: dict[str, RequestStats] = {}
+
+    async def call(
+        self,
+        name: str,
+        client: Any,
+        method: str,
+        path: str,
+        json: Any = None,
+        headers: Mapping[str, str] | None = None,
+        expect: tuple[int, ...] = (200,),
+    ) -> Response:
+        stats = self.requests.setdefault(name, RequestStats())
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=json, headers=headers)
+        except Exception:  # noqa: BLE001 - connection resets, timeouts, app crashes
+            stats.record(0, time.perf_counter() - started, ok=False)
+            raise
+        stats.record(response[0], time.perf_counter() - started, ok=response[0] in expect)
+        return response
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict[str, Any]:
+    """Describe where a run happened so reports can be compared fairly."""
+
+    return {
+        "commit": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def print_table(report: Mapping[str, Any]) -> None:
+    """Print one line per scenario request with latency percentiles."""
+
+    header = (
+        f"{'scenario':<16} {'request':<22} {'req':>7} {'rps':>8} {'err%':>6} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for scenario, result in report["scenarios"].items():
+        for name, stats in result["requests"].items():
+            latency = stats["latency_ms"]
+            print(
+                f"{scenario:<16} {name:<22} {stats['requests']:>7} {stats['throughput_rps']:>8} "
+                f"{stats['error_rate'] * 100:>6.2f} {latency['p50']:>8} {latency['p95']:>8} {latency['p99']:>8}"
+            )
+
+
+def compare(
+    report: Mapping[str, Any], baseline: Mapping[str, Any], max_regression: float, max_error_rate: float
+) -> list[str]:
+    """Return the regressions of ``report`` against ``baseline``.
+
+    A request regresses when its p95 grew, or its throughput shrank, by more
+    than ``max_regression`` (a fraction), or its error rate is above
+    ``max_error_rate``. Requests missing from the baseline are only checked
+    for errors.
+    """
+
+    failures = []
+    for scenario, result in report["scenarios"].items():
+        for name, stats in result["requests"].items():
+            label = f"{scenario}/{name}"
+            if stats["error_rate"] > max_error_rate:
+                failures.append(f"{label}: error rate {stats['error_rate']:.2%} > {max_error_rate:.2%}")
+            before = baseline.get("scenarios", {}).get(scenario, {}).get("requests", {}).get(name)
+            if before is None:
+                continue
+            old_p95, new_p95 = before["latency_ms"]["p95"], stats["latency_ms"]["p95"]
+            if old_p95 and new_p95 > old_p95 * (1 + max_regression):
+                failures.append(f"{label}: p95 {old_p95}ms -> {new_p95}ms")
+            old_rps, new_rps = before["throughput_rps"], stats["throughput_rps"]
+            if old_rps and new_rps < old_rps * (1 - max_regression):
+                failures.append(f"{label}: throughput {old_rps} -> {new_rps} req/s")
+    return failures
+
+
+def write_report(report: Mapping[str, Any], path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    return path
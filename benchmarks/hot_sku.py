@@ -0,0 +1,154 @@
+"""Hot-SKU checkout contention benchmark.
+
+Fires concurrent single-line orders at one ``products_stock`` row and checks
+that stock is never oversold: the quantity sold must equal the quantity that
+left the row and the row must never go negative. Throughput and latency are
+reported for the selected order placement strategy::
+
+    python -m benchmarks.hot_sku --orders 2000 --concurrency 64 --stock 1500
+    python -m benchmarks.hot_sku --strategy naive
+
+``naive`` replays the previous per-line read/check/write loop so both
+strategies can be compared on the same database. Tables are created when
+missing; every run seeds its own product so runs never interfere.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.models import Base, Category, Order, OrderItem, Product, ProductStock, Stock, User
+from app.schemas.order import OrderItemCreate
+from app.services.orders import place_order
+
+
+def naive_place_order(db: Session, user_id: int, items: list[OrderItemCreate]) -> Order:
+    """Previous ``create_order`` implementation: one query and check per line."""
+
+    order = Order(user_id=user_id)
+    db.add(order)
+    for item in items:
+        product_stock = db.query(ProductStock).filter(ProductStock.id == item.product_stock_id).first()
+        if product_stock is None or product_stock.qty < item.quantity:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Insufficient stock for selected product")
+        product_stock.qty -= item.quantity
+        order.items.append(
+            OrderItem(
+                product_id=product_stock.product_id,
+                category_id=product_stock.product.category_id,
+                quantity=item.quantity,
+                price_at_order=product_stock.sale_price,
+            )
+        )
+        db.add(product_stock)
+    db.commit()
+    return order
+
+
+STRATEGIES = {"atomic": place_order, "naive": naive_place_order}
+
+
+async def seed(sessionmaker, stock: int) -> tuple[int, int, int]:
+    """Create a user and a single hot SKU; return (user_id, product_id, product_stock_id)."""
+
+    tag = uuid.uuid4().hex[:12]
+    async with sessionmaker() as db:
+        user = User(email=f"bench-{tag}@example.com", hashed_password="!", is_verified=True)
+        category = Category(name=f"bench-{tag}")
+        product = Product(name=f"hot sku {tag}", barcode=f"bench-{tag}", category=category)
+        location = Stock(location=f"bench-{tag}")
+        product_stock = ProductStock(product=product, stock=location, qty=stock, sale_price=9.99)
+        db.add_all([user, category, product, location, product_stock])
+        await db.commit()
+        return user.id, product.id, product_stock.id
+
+
+async def run(args: argparse.Namespace) -> dict:
+    engine = create_async_engine(args.database_url, pool_size=args.concurrency, max_overflow=0)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    user_id, product_id, product_stock_id = await seed(sessionmaker, args.stock)
+    strategy = STRATEGIES[args.strategy]
+    items = [OrderItemCreate(product_stock_id=product_stock_id, quantity=args.quantity)]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    outcomes = {"accepted": 0, "rejected": 0, "errors": 0}
+
+    async def one_order() -> None:
+        async with semaphore, sessionmaker() as db:
+            started = time.perf_counter()
+            try:
+                await db.run_sync(strategy, user_id, items)
+                outcomes["accepted"] += 1
+            except HTTPException:
+                outcomes["rejected"] += 1
+            except Exception:  # noqa: BLE001 - deadlocks, lock timeouts, ...
+                outcomes["errors"] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_order() for _ in range(args.orders)))
+    elapsed = time.perf_counter() - started
+
+    async with sessionmaker() as db:
+        remaining = await db.scalar(select(ProductStock.qty).where(ProductStock.id == product_stock_id))
+        sold = await db.scalar(
+            select(func.coalesce(func.sum(OrderItem.quantity), 0)).where(OrderItem.product_id == product_id)
+        )
+    await engine.dispose()
+
+    latencies.sort()
+    return {
+        "strategy": args.strategy,
+        "orders": args.orders,
+        "concurrency": args.concurrency,
+        "initial_stock": args.stock,
+        **outcomes,
+        "units_sold": sold,
+        "units_left": remaining,
+        "oversold": remaining < 0 or sold != args.stock - remaining,
+        "orders_per_sec": round(outcomes["accepted"] / elapsed, 1),
+        "elapsed_s": round(elapsed, 3),
+        "latency_ms": {
+            "p50": round(statistics.median(latencies) * 1000, 2),
+            "p95": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2),
+        },
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", help="asyncio SQLAlchemy URL; defaults to the app settings")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="atomic")
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--stock", type=int, default=750, help="initial units on the hot SKU")
+    parser.add_argument("--quantity", type=int, default=1, help="units per order")
+    args = parser.parse_args(argv)
+    if args.database_url is None:
+        from app.db.session import async_database_url
+
+        args.database_url = async_database_url
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    report = asyncio.run(run(parse_args(argv)))
+    print(json.dumps(report, indent=2))
+    return 1 if report["oversold"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
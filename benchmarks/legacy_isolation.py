@@ -0,0 +1,156 @@
+"""Request isolation stress test of the legacy ``BaseResource`` pipeline.
+
+Fires interleaved requests at one registered resource instance in a single
+worker, the way ``api/v1/routing.py`` serves them, and checks that no state
+leaks between requests: every response must carry its own request data, its
+own database session and its own number of processing steps, and every
+session must be closed exactly once::
+
+    python -m benchmarks.legacy_isolation --requests 5000 --concurrency 200
+    python -m benchmarks.legacy_isolation --shared-instance
+
+The probe resource awaits between its steps so requests overlap inside
+``process_flow``. It runs against a stand-in session and needs no database.
+``--shared-instance`` runs the pipeline on the registered instance itself, as
+before requests got their own context, to show the check catches the leaks.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi_restful import Api
+from pydantic import BaseModel
+
+from api.base_resource import PostResource
+from benchmarks.harness import ASGIClient
+from db.dependency import get_db
+from middlewares import RequestPreProcessor
+
+PROBE_HEADER = "x-probe-token"
+
+
+class ProbeSession:
+    """Stand-in for the request's ``AsyncSession``, tagged with its request."""
+
+    def __init__(self, token: str) -> None:
+        self.token = token
+        self.closed = 0
+
+    async def close(self) -> None:
+        self.closed += 1
+
+
+class ProbeRequest(BaseModel):
+    token: str
+    steps: int
+    delay: float
+
+
+class ProbeResponse(BaseModel):
+    token: str
+    db_token: str
+    steps: int
+
+
+class Probe(PostResource):
+    api_name = "legacy_isolation_probe"
+    api_url = "benchmarks/legacy_isolation"
+    request_schema = ProbeRequest
+    response_schema = ProbeResponse
+
+    async def process_flow(self):
+        self.steps = []
+        for step in range(self.request_data.steps):
+            self.steps.append(step)
+            await asyncio.sleep(random.random() * self.request_data.delay)
+        self.response_data = {
+            "token": self.request_data.token,
+            "db_token": self.db.token,
+            "steps": len(self.steps),
+        }
+
+
+def build_app(sessions: dict[str, ProbeSession], shared_instance: bool) -> FastAPI:
+    app = FastAPI()
+    app.middleware("http")(RequestPreProcessor())
+
+    def probe_db(request: Request) -> ProbeSession:
+        token = request.headers[PROBE_HEADER]
+        sessions[token] = ProbeSession(token)
+        return sessions[token]
+
+    app.dependency_overrides[get_db] = probe_db
+    probe = Probe()
+    if shared_instance:
+        probe._request_context = lambda: probe
+    Api(app).add_resource(probe, "/probe")
+    return app
+
+
+async def run(args: argparse.Namespace) -> dict:
+    random.seed(args.seed)
+    sessions: dict[str, ProbeSession] = {}
+    client = ASGIClient(build_app(sessions, args.shared_instance))
+    semaphore = asyncio.Semaphore(args.concurrency)
+    outcomes = {"isolated": 0, "leaked": 0, "errors": 0}
+
+    async def one_request() -> None:
+        token = uuid.uuid4().hex
+        payload = {"token": token, "steps": random.randint(1, args.max_steps), "delay": args.delay}
+        async with semaphore:
+            status, _, body = await client.request(
+                "POST", "/probe", json=payload, headers={PROBE_HEADER: token}
+            )
+        if status != 200:
+            outcomes["errors"] += 1
+            return
+        data = json.loads(body)["data"]
+        expected = {"token": token, "db_token": token, "steps": payload["steps"]}
+        outcomes["isolated" if data == expected else "leaked"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    await client.close()
+
+    misclosed = sum(session.closed != 1 for session in sessions.values())
+    return {
+        "shared_instance": args.shared_instance,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        **outcomes,
+        "sessions_not_closed_once": misclosed,
+        "leak_free": outcomes["leaked"] == 0 and outcomes["errors"] == 0 and misclosed == 0,
+        "requests_per_sec": round(args.requests / elapsed, 1),
+        "elapsed_s": round(elapsed, 3),
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--max-steps", type=int, default=5, help="most awaits a request makes in process_flow")
+    parser.add_argument("--delay", type=float, default=0.002, help="longest pause between steps, in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--shared-instance",
+        action="store_true",
+        help="run every request on the registered instance, as before per-request contexts",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    report = asyncio.run(run(parse_args(argv)))
+    print(json.dumps(report, indent=2))
+    return 0 if report["leak_free"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
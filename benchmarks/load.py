@@ -0,0 +1,260 @@
+"""Reproducible load test of the checkout and catalogue paths.
+
+Seeds a tagged data set, then drives concurrent virtual users through each
+selected scenario for a fixed duration and reports p50/p95/p99 latency,
+throughput and error rate per request. The report is written as JSON so runs
+can be compared across commits; with ``--baseline`` the run fails when a
+request regressed by more than ``--max-regression``::
+
+    python -m benchmarks.load --database-url sqlite:///bench.db --scale 0.5
+    python -m benchmarks.load --scenarios browse create_order --concurrency 64 --duration 30
+    python -m benchmarks.load --serve --workers 4 --baseline benchmarks/results/main.json
+    python -m benchmarks.load --database-url sqlite:///bench.db --replica-url sqlite:///bench-replica.db
+
+By default the app runs in-process behind an ASGI client, measuring the
+application and database alone. ``--serve`` starts uvicorn in a subprocess
+and ``--url`` targets a server that is already running against the same
+database.
+
+``--replica-url`` routes reads to replicas (see ``app/db/replicas.py``).
+SQLite replica files are overwritten with a copy of the seeded primary, so
+two local files are enough to exercise the routing; other replicas must
+already replicate the primary.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import closing
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from benchmarks.harness import (
+    ASGIClient,
+    HTTPClient,
+    Recorder,
+    compare,
+    environment,
+    print_table,
+    write_report,
+)
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    from benchmarks.scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL; defaults to the app settings")
+    parser.add_argument(
+        "--replica-url", action="append", default=[], help="read replica URL; repeat for several replicas"
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of the default data set size")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for data and request mix")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users per scenario")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before each scenario")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running server instead of the in-process app")
+    target.add_argument("--serve", action="store_true", help="start uvicorn in a subprocess")
+    parser.add_argument("--port", type=int, default=8765, help="port used by --serve")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers used by --serve")
+    parser.add_argument("--output", help="report path; defaults to benchmarks/results/<commit>-<time>.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="allowed p95/throughput change")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Point the app settings at the benchmark database before ``app`` is imported."""
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    if args.replica_url:
+        os.environ["DATABASE_REPLICA_URLS"] = json.dumps(args.replica_url)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Measure production behaviour: budget violations are logged, not raised.
+    os.environ.setdefault("SQL_BUDGET_MODE", "log")
+
+
+def _wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"uvicorn did not start listening on port {port}")
+
+
+def start_server(args: argparse.Namespace) -> subprocess.Popen:
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "main:app",
+        "--port",
+        str(args.port),
+        "--workers",
+        str(args.workers),
+        "--log-level",
+        "warning",
+    ]
+    process = subprocess.Popen(command, env=os.environ.copy())
+    _wait_for_port(args.port)
+    return process
+
+
+async def run_scenario(name: str, make_client, data, args: argparse.Namespace) -> dict[str, Any]:
+    """Run ``name`` with ``args.concurrency`` virtual users and summarise it."""
+
+    from app.core.security import create_access_token
+    from benchmarks.scenarios import SCENARIOS, VirtualUser
+
+    scenario = SCENARIOS[name]
+    admin_headers = {"authorization": f"Bearer {create_access_token({'sub': data.admin_email})}"}
+
+    def virtual_user(index: int) -> VirtualUser:
+        email = data.customer_emails[index % len(data.customer_emails)]
+        return VirtualUser(
+            email=email,
+            headers={"authorization": f"Bearer {create_access_token({'sub': email})}"},
+            admin_headers=admin_headers,
+            rng=random.Random(f"{args.seed}:{name}:{index}"),
+        )
+
+    async def drive(recorder: Recorder, seconds: float) -> None:
+        deadline = time.perf_counter() + seconds
+
+        async def loop(index: int) -> None:
+            client = make_client()
+            user = virtual_user(index)
+            try:
+                while time.perf_counter() < deadline:
+                    try:
+                        await scenario(recorder, client, data, user)
+                    except Exception:  # noqa: BLE001 - already counted as an error
+                        pass
+            finally:
+                await client.close()
+
+        await asyncio.gather(*(loop(index) for index in range(args.concurrency)))
+
+    if args.warmup > 0:
+        await drive(Recorder(), args.warmup)
+    recorder = Recorder()
+    started = time.perf_counter()
+    await drive(recorder, args.duration)
+    elapsed = time.perf_counter() - started
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests": {request: stats.summary(elapsed) for request, stats in recorder.requests.items()},
+    }
+
+
+def clone_sqlite_replicas(engine, replicas) -> None:
+    """Copy a SQLite primary over its SQLite replica files."""
+
+    if engine.dialect.name != "sqlite":
+        return
+    with closing(sqlite3.connect(engine.url.database)) as primary:
+        for replica in replicas.replicas:
+            if replica.engine.dialect.name == "sqlite":
+                replica.engine.dispose()
+                with closing(sqlite3.connect(replica.engine.url.database)) as copy:
+                    primary.backup(copy)
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    from app.db.session import engine, replicas
+    from benchmarks.seed import Scale, seed
+
+    scale = Scale.times(args.scale)
+    seeding_started = time.perf_counter()
+    data = seed(engine, scale, seed=args.seed)
+    clone_sqlite_replicas(engine, replicas)
+    seeding = time.perf_counter() - seeding_started
+
+    server = None
+    if args.serve:
+        server = start_server(args)
+        base_url = f"http://127.0.0.1:{args.port}"
+    else:
+        base_url = args.url
+    if base_url:
+        make_client = lambda: HTTPClient(base_url)  # noqa: E731
+    else:
+        from app.core.autocomplete import start_autocomplete
+        from app.db.session import start_replica_checks
+        from main import app
+
+        # The ASGI client sends no lifespan events, so run the startup work here.
+        await start_replica_checks()
+        await start_autocomplete()
+        asgi_client = ASGIClient(app)
+        make_client = lambda: asgi_client  # noqa: E731
+
+    scenarios = {}
+    try:
+        for name in args.scenarios:
+            scenarios[name] = await run_scenario(name, make_client, data, args)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if not base_url:
+            from app.core.autocomplete import autocomplete
+            from app.core.security import get_password_hasher
+
+            await autocomplete.stop()
+            await replicas.stop()
+            get_password_hasher().shutdown()
+
+    return {
+        "environment": environment(),
+        "database": engine.dialect.name,
+        "target": "uvicorn" if base_url else "in-process",
+        "config": {
+            "scale": asdict(scale),
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "workers": args.workers if args.serve else None,
+            "replicas": len(replicas.replicas),
+        },
+        "seeding_s": round(seeding, 3),
+        "scenarios": scenarios,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    configure_environment(args)
+    report = asyncio.run(run(args))
+    print_table(report)
+    commit = report["environment"]["commit"] or "local"
+    output = args.output or RESULTS_DIR / f"{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    print(f"\nreport written to {write_report(report, output)}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        failures = compare(report, baseline, args.max_regression, args.max_error_rate)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Statement count of order reads as the order book grows.
+
+Seeds batches of orders and records how many SQL statements a full page of
+``fetch_order_reads`` and a single-order read issue. Both must stay constant
+as the number of orders grows; the script exits non-zero when they do not::
+
+    python -m benchmarks.order_reads --sizes 10 100 1000 --items 3
+"""
+import argparse
+import json
+import sys
+import uuid
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.api.pagination import PageParams, paginate
+from app.models import Base, Category, Order, OrderItem, Product, User
+from app.services.orders import fetch_order_reads, order_read_query
+
+
+def seed(db: Session, user_id: int, product_id: int, category_id: int, orders: int, items: int) -> None:
+    for _ in range(orders):
+        order = Order(user_id=user_id)
+        order.items = [
+            OrderItem(product_id=product_id, category_id=category_id, quantity=1, price_at_order=1.0)
+            for _ in range(items)
+        ]
+        db.add(order)
+    db.commit()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default="sqlite://", help="sync SQLAlchemy URL")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--items", type=int, default=3, help="items per order")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_):
+        nonlocal statements
+        statements += 1
+
+    tag = uuid.uuid4().hex[:12]
+    report = []
+    with Session(engine) as db:
+        user = User(email=f"bench-{tag}@example.com", hashed_password="!")
+        product = Product(name="bench", barcode=f"bench-{tag}", category=Category(name=f"bench-{tag}"))
+        db.add_all([user, product])
+        db.commit()
+        user_id, product_id, category_id = user.id, product.id, product.category_id
+        seeded = 0
+        for size in sorted(args.sizes):
+            seed(db, user_id, product_id, category_id, size - seeded, args.items)
+            seeded = size
+            db.expunge_all()
+
+            statements = 0
+            stmt = order_read_query().where(Order.user_id == user_id)
+            page = fetch_order_reads(db, paginate(stmt, Order, PageParams(None, size), "id"))
+            list_statements = statements
+
+            statements = 0
+            fetch_order_reads(db, order_read_query().where(Order.id == page[-1]["id"]))
+            report.append(
+                {
+                    "orders": size,
+                    "listed": len(page),
+                    "list_statements": list_statements,
+                    "get_statements": statements,
+                }
+            )
+
+    print(json.dumps(report, indent=2))
+    constant = len({(row["list_statements"], row["get_statements"]) for row in report}) == 1
+    return 0 if constant else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Benchmark of the legacy ``get_sales_data`` time bucketing.
+
+Times ``GetSalesData`` bucketing synthetic sale lines for every bucket
+granularity and data size, against the previous nested loop that compared
+each sale with each bucket, and checks both produce the same metrics::
+
+    python -m benchmarks.sales_buckets
+    python -m benchmarks.sales_buckets --rows 10000 500000 --buckets daily monthly --naive-max-rows 50000
+
+No database is needed: the rows are generated in memory with the columns of
+``crud.sale.get_sales_data``. The nested loop is skipped above
+``--naive-max-rows`` since a daily report over two years with 500k lines
+takes minutes with it.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pandas as pd
+
+from api.v1.endpoints.get_sales_data import BUCKET_FREQUENCIES, GetSalesData
+from api.v1.schemas.get_sales_data import Buckets, GetSalesDataRequest
+
+SaleRow = namedtuple(
+    "SaleRow",
+    [
+        "id",
+        "user_id",
+        "created_at",
+        "product_name",
+        "description",
+        "product_id",
+        "price_per_unit",
+        "quantity",
+        "category_id",
+        "category_name",
+        "category_slug",
+    ],
+)
+BREAKDOWNS = (
+    "revenue_by_categories",
+    "revenue_by_products",
+    "quantity_by_categories",
+    "quantity_by_products",
+)
+
+
+def generate_rows(count: int, start: datetime, days: int, products: int, categories: int) -> list[SaleRow]:
+    catalogue = [
+        (product_id, product_id % categories + 1, Decimal(random.randint(100, 99_999)).scaleb(-2))
+        for product_id in range(1, products + 1)
+    ]
+    span = days * 86_400
+    rows = []
+    for index in range(count):
+        product_id, category_id, price = random.choice(catalogue)
+        rows.append(
+            SaleRow(
+                id=index // 3 + 1,
+                user_id=random.randint(1, 1000),
+                created_at=start + timedelta(seconds=random.randrange(span)),
+                product_name=f"Product {product_id}",
+                description="",
+                product_id=product_id,
+                price_per_unit=price,
+                quantity=random.randint(1, 5),
+                category_id=category_id,
+                category_name=f"Category {category_id}",
+                category_slug=f"category-{category_id}",
+            )
+        )
+    rows.sort(key=lambda row: row.id)
+    return rows
+
+
+def naive_bucketing(request: GetSalesDataRequest, rows: list[SaleRow]) -> dict:
+    """Previous ``get_sales_data``/``populate_buckets``: every sale against every bucket."""
+
+    sales = [s._asdict() for s in rows]
+    for sale in sales:
+        sale["revenue"] = sale["quantity"] * sale["price_per_unit"]
+    periods = pd.period_range(
+        start=request.start_date, end=request.end_date, freq=BUCKET_FREQUENCIES[request.buckets]
+    )
+    buckets = {}
+    for bucket in periods:
+        buckets[(bucket.start_time, bucket.end_time)] = {
+            "sales": list(),
+            "total_revenue": 0,
+            **{name: defaultdict(lambda: 0) for name in BREAKDOWNS},
+        }
+    for sale in sales:
+        for bucket in buckets:
+            if sale["created_at"] >= bucket[0] and sale["created_at"] <= bucket[1]:
+                if request.include_sales_items:
+                    buckets[bucket]["sales"].append(sale)
+                buckets[bucket]["total_revenue"] += sale["revenue"]
+                category = (sale["category_id"], sale["category_name"])
+                product = (sale["product_id"], sale["product_name"])
+                buckets[bucket]["revenue_by_categories"][category] += sale["revenue"]
+                buckets[bucket]["revenue_by_products"][product] += sale["revenue"]
+                buckets[bucket]["quantity_by_categories"][category] += sale["quantity"]
+                buckets[bucket]["quantity_by_products"][product] += sale["quantity"]
+                break
+    return buckets
+
+
+async def vectorized_bucketing(request: GetSalesDataRequest, rows: list[SaleRow]) -> dict:
+    resource = GetSalesData()
+    resource.request_data = request
+    await resource.load_sales(rows)
+    await resource.create_buckets()
+    await resource.populate_buckets()
+    return resource.buckets
+
+
+def _comparable(buckets: dict) -> dict:
+    return {
+        bucket: (metrics["total_revenue"], *(dict(metrics[name]) for name in BREAKDOWNS))
+        for bucket, metrics in buckets.items()
+    }
+
+
+def run(args: argparse.Namespace) -> list[dict]:
+    random.seed(args.seed)
+    start = datetime(2024, 1, 1)
+    end = start + timedelta(days=args.days) - timedelta(microseconds=1)
+    results = []
+    for count in args.rows:
+        rows = generate_rows(count, start, args.days, args.products, args.categories)
+        for granularity in args.buckets:
+            request = GetSalesDataRequest(
+                start_date=start,
+                end_date=end,
+                include_sales_items=args.include_sales_items,
+                buckets=granularity,
+            )
+            started = time.perf_counter()
+            vectorized = asyncio.run(vectorized_bucketing(request, rows))
+            vectorized_s = time.perf_counter() - started
+            result = {
+                "rows": count,
+                "buckets": granularity,
+                "bucket_count": len(vectorized),
+                "vectorized_s": round(vectorized_s, 4),
+                "naive_s": None,
+                "speedup": None,
+                "matches": None,
+            }
+            if count <= args.naive_max_rows:
+                started = time.perf_counter()
+                naive = naive_bucketing(request, rows)
+                naive_s = time.perf_counter() - started
+                result["naive_s"] = round(naive_s, 4)
+                result["speedup"] = round(naive_s / vectorized_s, 1)
+                result["matches"] = _comparable(naive) == _comparable(vectorized)
+            results.append(result)
+            print(json.dumps(result), file=sys.stderr)
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument(
+        "--buckets", nargs="+", choices=[b.value for b in Buckets], default=[b.value for b in Buckets]
+    )
+    parser.add_argument("--days", type=int, default=730, help="days covered by the report")
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument(
+        "--naive-max-rows", type=int, default=100_000, help="largest size timed with the nested loop"
+    )
+    parser.add_argument(
+        "--include-sales-items", action="store_true", help="also list the sales of each bucket"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    results = run(parse_args(argv))
+    print(json.dumps(results, indent=2))
+    return 0 if all(result["matches"] is not False for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
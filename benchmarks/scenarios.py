@@ -0,0 +1,160 @@
+"""Load-test scenarios for the ``app`` API.
+
+A scenario is one iteration of what a virtual user does; the load runner
+calls it in a loop from every virtual user until the run ends. Each request
+is timed under its own name, so a scenario made of several calls reports
+every step separately.
+"""
+import json
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+from benchmarks.harness import Recorder
+from benchmarks.seed import BENCHMARK_PASSWORD, Dataset
+
+API = "/api/v1"
+
+
+@dataclass
+class VirtualUser:
+    """Per-client state kept between iterations."""
+
+    email: str
+    headers: dict[str, str]
+    admin_headers: dict[str, str]
+    rng: random.Random
+    etags: dict[str, str] = field(default_factory=dict)
+
+
+Scenario = Callable[[Recorder, Any, Dataset, VirtualUser], Awaitable[None]]
+
+
+async def _conditional_get(recorder: Recorder, client: Any, user: VirtualUser, name: str, path: str) -> bytes:
+    """GET ``path`` revalidating the ETag seen last time, like a polling mobile client."""
+
+    headers = dict(user.headers)
+    if path in user.etags:
+        headers["if-none-match"] = user.etags[path]
+    status, response_headers, body = await recorder.call(name, client, "GET", path, headers=headers, expect=(200, 304))
+    if "etag" in response_headers:
+        user.etags[path] = response_headers["etag"]
+    return body
+
+
+async def browse(recorder: Recorder, client: Any, data: Dataset, user: VirtualUser) -> None:
+    """List categories, page through products and open one product."""
+
+    await _conditional_get(recorder, client, user, "list_categories", f"{API}/categories/?limit=50")
+    limit = user.rng.choice((20, 50))
+    await _conditional_get(recorder, client, user, "list_products", f"{API}/products/?limit={limit}")
+    product_id = user.rng.choice(data.product_ids)
+    await _conditional_get(recorder, client, user, "get_product", f"{API}/products/{product_id}")
+
+
+async def filter_products(recorder: Recorder, client: Any, data: Dataset, user: VirtualUser) -> None:
+    """Narrow the listing by category, price and stock, with facet counts."""
+
+    category_id = user.rng.choice(data.category_ids)
+    max_price = user.rng.choice((25, 50, 100, 250))
+    query = f"category_id={category_id}&max_price={max_price}&in_stock=true&facets=true"
+    path = f"{API}/products/?limit=20&{query}"
+    await _conditional_get(recorder, client, user, "filter_products", path)
+
+
+async def search(recorder: Recorder, client: Any, data: Dataset, user: VirtualUser) -> None:
+    """Search the catalogue for a product word, sometimes mistyped, and open the next page."""
+
+    word = user.rng.choice(("product", "prodcut", "benchmark", data.tag[:6]))
+    path = f"{API}/products/search?q={word}&limit=20"
+    body = await _conditional_get(recorder, client, user, "search_products", path)
+    cursor = json.loads(body).get("next_cursor") if body else None
+    if cursor:
+        await _conditional_get(recorder, client, user, "search_products_next", f"{path}&cursor={cursor}")
+
+
+async def suggest(recorder: Recorder, client: Any, data: Dataset, user: VirtualUser) -> None:
+    """Type a product word one keystroke at a time, asking for suggestions after each."""
+
+    word = user.rng.choice(("product", "benchmark"))
+    for length in range(1, len(word) + 1):
+        path = f"{API}/products/suggest?prefix={word[:length]}"
+        await recorder.call("suggest_products", client, "GET", path, headers=user.headers)
+
+
+async def login(recorder: Recorder, client: Any, data: Dataset, user: VirtualUser) -> None:
+    """Authenticate with email and password, exercising the Argon2 pool."""
+
+    payload = {"email": user.rng.choice(data.customer_emails), "password": BENCHMARK_PASSWORD}
+    await recorder.call("login", client, "POST", f"{API}/auth/login", json=payload)
+
+
+async def create_order(recorder: Recorder, client: Any, data: Dataset, user: VirtualUser) -> None:
+    """Place an order of one to three lines spread over the catalogue."""
+
+    lines = user.rng.sample(data.product_stock_ids, user.rng.randint(1, 3))
+    payload = {"items": [{"product_stock_id": stock_id, "quantity": 1} for stock_id in lines]}
+    await recorder.call(
+        "create_order", client, "POST", f"{API}/orders/", json=payload, headers=user.headers, expect=(201,)
+    )
+
+
+async def hot_sku(recorder: Recorder, client: Any, data: Dataset, user: VirtualUser) -> None:
+    """Every user orders the same SKU; a sold-out 400 is an expected outcome."""
+
+    payload = {"items": [{"product_stock_id": data.hot_product_stock_id, "quantity": 1}]}
+    await recorder.call(
+        "hot_sku_order", client, "POST", f"{API}/orders/", json=payload, headers=user.headers, expect=(201, 400)
+    )
+
+
+async def sales_analytics(recorder: Recorder, client: Any, data: Dataset, user: VirtualUser) -> None:
+    """Admin reporting: page through the order book, export a week of order lines and read revenue."""
+
+    path = f"{API}/orders/?limit=200&order_by=created_at&order=desc"
+    await recorder.call("list_orders_admin", client, "GET", path, headers=user.admin_headers)
+    start, end = data.order_window
+    offset = user.rng.uniform(0, max(0.0, (end - start).total_seconds() - 7 * 86400))
+    created_from = start + timedelta(seconds=offset)
+    created_to = created_from + timedelta(days=7)
+    path = (
+        f"{API}/exports/orders?format=ndjson"
+        f"&created_from={created_from.isoformat(timespec='seconds')}"
+        f"&created_to={created_to.isoformat(timespec='seconds')}"
+    )
+    await recorder.call("export_orders_week", client, "GET", path, headers=user.admin_headers)
+    window = f"start={start.date().isoformat()}&end={(end.date() + timedelta(days=1)).isoformat()}"
+    granularity = user.rng.choice(("day", "week", "month"))
+    path = f"{API}/analytics/revenue?{window}&granularity={granularity}"
+    await recorder.call("revenue_by_period", client, "GET", path, headers=user.admin_headers)
+    path = f"{API}/analytics/revenue/categories?{window}"
+    await recorder.call("revenue_by_category", client, "GET", path, headers=user.admin_headers)
+
+
+async def stock_sync(recorder: Recorder, client: Any, data: Dataset, user: VirtualUser) -> None:
+    """Run the external stock sync over a random slice of the stock rows."""
+
+    ids = user.rng.sample(data.product_stock_ids, min(500, len(data.product_stock_ids)))
+    await recorder.call(
+        "stock_sync",
+        client,
+        "POST",
+        f"{API}/stocks/product-stock/sync",
+        json={"product_stock_ids": ids},
+        headers=user.admin_headers,
+    )
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "browse": browse,
+    "filter_products": filter_products,
+    "search": search,
+    "suggest": suggest,
+    "login": login,
+    "create_order": create_order,
+    "hot_sku": hot_sku,
+    "sales_analytics": sales_analytics,
+    "stock_sync": stock_sync,
+}
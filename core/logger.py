@@ -1,13 +1,99 @@
+"""
+Logger
+======
+Endpoint loggers of the legacy API. ``Logger.get_logger`` configures each
+named logger once and returns the same logger afterwards, so it is cheap to
+call per request.
+
+Loggers never write from the calling thread: records go through a bounded
+queue to a single ``QueueListener`` thread, which writes each one to the
+daily rotated file of its logger. When the queue is full the record is
+dropped rather than blocking the event loop. INFO and lower records can be
+sampled with ``LOG_INFO_SAMPLE_RATE``. Queued, dropped and sampled-out
+records are counted in ``legacy_log_records_total`` on ``/metrics``.
+"""
+
+import atexit
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 
+from app.core.metrics import CallbackGauge, Counter
 from instance.config import config
 
+LOG_RECORDS = Counter(
+    "legacy_log_records_total",
+    "Records of the legacy endpoint loggers by outcome (queued, dropped, sampled_out).",
+    ("logger", "outcome"),
+)
+
+
+class _InfoSampler(logging.Filter):
+    """Let through all records above INFO and ``rate`` of the others."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or random.random() < self.rate:
+            return True
+        LOG_RECORDS.inc((record.name, "sampled_out"))
+        return False
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """``QueueHandler`` that drops and counts records when the queue is full."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS.inc((record.name, "dropped"))
+        else:
+            LOG_RECORDS.inc((record.name, "queued"))
+
+
+class _FileDispatcher(logging.Handler):
+    """Listener-side handler writing each record to its logger's file."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.handlers: dict[str, logging.Handler] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        handler = self.handlers.get(record.name)
+        if handler is not None:
+            handler.handle(record)
+
+    def close(self) -> None:
+        for handler in self.handlers.values():
+            handler.close()
+        super().close()
+
 
 class Logger:
+    _lock = threading.Lock()
+    _loggers: dict[str, logging.Logger] = {}
+    _queue: queue.Queue = queue.Queue(maxsize=config.LOGGING_CONFIG.LOG_QUEUE_SIZE)
+    _dispatcher = _FileDispatcher()
+    _listener: QueueListener | None = None
+
     @staticmethod
     def get_logger(filename: str = "", name: str = ""):
+        logger = Logger._loggers.get(name)
+        if logger is not None:
+            return logger
+        with Logger._lock:
+            if name not in Logger._loggers:
+                Logger._loggers[name] = Logger._configure(filename, name)
+            return Logger._loggers[name]
+
+    @staticmethod
+    def _configure(filename: str, name: str) -> logging.Logger:
         parent_directory = os.path.dirname(filename)
         parent_directory = os.path.join(config.LOGS_DIR, parent_directory)
 
@@ -17,18 +103,44 @@ class Logger:
         log_file_name = os.path.join(
             parent_directory, os.path.basename(filename) + ".log"
         )
-        logging_level = config.LOGGING_LEVEL
         formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
         )
-        logger = logging.getLogger(name)
-
         handler = TimedRotatingFileHandler(
             filename=log_file_name, when="midnight", interval=1, backupCount=30
         )
         handler.suffix = "%Y-%m-%d"
         handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(logging_level)
+        Logger._dispatcher.handlers[name] = handler
+
+        queue_handler = _DroppingQueueHandler(Logger._queue)
+        sample_rate = config.LOGGING_CONFIG.LOG_INFO_SAMPLE_RATE
+        if sample_rate < 1:
+            queue_handler.addFilter(_InfoSampler(sample_rate))
 
+        logger = logging.getLogger(name)
+        logger.addHandler(queue_handler)
+        logger.setLevel(config.LOGGING_LEVEL)
+
+        if Logger._listener is None:
+            Logger._listener = QueueListener(Logger._queue, Logger._dispatcher)
+            Logger._listener.start()
+            atexit.register(Logger.shutdown)
         return logger
+
+    @staticmethod
+    def shutdown() -> None:
+        """Write out the queued records and stop the writer thread."""
+        with Logger._lock:
+            if Logger._listener is not None:
+                Logger._listener.stop()
+                Logger._listener = None
+                Logger._dispatcher.close()
+
+
+CallbackGauge(
+    "legacy_log_queue_depth",
+    "Records waiting for the legacy log writer thread.",
+    (),
+    lambda: [((), Logger._queue.qsize())],
+)
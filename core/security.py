@@ -1,17 +1,30 @@
 import jwt
 from datetime import datetime, timedelta
-from passlib.hash import argon2
-
 
+from app.core.security import get_password_hasher
 from instance.config import config
 
 
-def get_password_hash(password: str) -> str:
-    return argon2.hash(password)
+# Argon2 runs in the app's bounded process pool, so each process has a single
+# pool and the app's shutdown handler closes it; calls beyond the pool's queue
+# limits are rejected with 503 + Retry-After.
+async def get_password_hash(password: str) -> str:
+    return await get_password_hasher().hash(password)
+
 
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    valid, _ = await get_password_hasher().verify_and_update(
+        plain_password, hashed_password
+    )
+    return valid
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return argon2.verify(plain_password, hashed_password)
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await get_password_hasher().verify_and_update(
+        plain_password, hashed_password
+    )
 
 
 def create_jwt_token(payload: dict, typ: str = "access") -> str:
@@ -17,5 +17,24 @@ class CRUDInventory(CRUDBase[Inventory, InventoryCreate, InventoryUpdate]):
             results = await session.execute(stmt)
             return results.scalars().all()
 
+    async def get_available_for_update(
+        self, db: AsyncSession, *, product_ids: list[int]
+    ) -> list[Inventory]:
+        """
+        Non-empty lots of the given products, oldest first per product, locked
+        in that order.
+
+        Runs in the caller's transaction and keeps the session open, so the
+        row locks are held until the caller commits.
+        """
+        stmt = (
+            select(self.model)
+            .filter(self.model.product_id.in_(product_ids), self.model.quantity > 0)
+            .order_by(self.model.product_id, self.model.created_at, self.model.id)
+            .with_for_update()
+        )
+        results = await db.execute(stmt)
+        return list(results.scalars().all())
+
 
 inventory = CRUDInventory(Inventory)
@@ -26,6 +26,24 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
             result = await session.execute(stmt)
             return result.scalar_one_or_none()
 
+    async def get_active_for_update(
+        self, db: AsyncSession, *, ids: list[int]
+    ) -> list[Product]:
+        """
+        Active products with the given ids, locked in id order.
+
+        Runs in the caller's transaction and keeps the session open, so the
+        row locks are held until the caller commits.
+        """
+        stmt = (
+            select(self.model)
+            .filter(self.model.id.in_(ids), self.model.is_active == True)
+            .order_by(self.model.id)
+            .with_for_update()
+        )
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
     async def get_multi_with_category(
         self,
         db: AsyncSession,
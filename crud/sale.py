@@ -1,7 +1,8 @@
-from typing import Iterable
+from typing import Iterable, Optional
 from datetime import datetime
 
-from sqlalchemy import select
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import ColumnElement, DateTime, Select, func, literal_column, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from crud.base import CRUDBase
@@ -9,10 +10,80 @@ from models.sale import Sale
 from models.product import Product
 from models.category import Category
 from models.sale_item import SaleItem
-from crud.schemas import SaleCreate, SaleUpdate
+from crud.schemas import SaleCreate, SaleItemCreate, SaleUpdate
+
+
+# date_trunc units and strftime format plus modifiers giving the start of a
+# bucket; weeks start on Monday, like the weekly pandas periods
+_TRUNC_UNITS = {"daily": "day", "weekly": "week", "monthly": "month", "yearly": "year"}
+_SQLITE_BUCKETS = {
+    "daily": ("%Y-%m-%d 00:00:00",),
+    "weekly": ("%Y-%m-%d 00:00:00", "weekday 0", "-6 days"),
+    "monthly": ("%Y-%m-01 00:00:00",),
+    "yearly": ("%Y-01-01 00:00:00",),
+}
+
+
+def _bucket_start(dialect: str, bucket: str) -> ColumnElement[datetime]:
+    # Literal SQL rather than bound parameters, so the select list and GROUP BY
+    # render the same expression
+    if dialect == "postgresql":
+        unit = literal_column(f"'{_TRUNC_UNITS[bucket]}'")
+        return func.date_trunc(unit, Sale.created_at, type_=DateTime)
+    arguments = [literal_column(f"'{value}'") for value in _SQLITE_BUCKETS[bucket]]
+    return func.strftime(arguments[0], Sale.created_at, *arguments[1:], type_=DateTime)
 
 
 class CRUDSale(CRUDBase[Sale, SaleCreate, SaleUpdate]):
+    async def create_with_items(
+        self, db: AsyncSession, *, obj_in: SaleCreate, items_in: list[SaleItemCreate]
+    ) -> tuple[Sale, list[SaleItem]]:
+        """
+        Insert a sale and its items and commit.
+
+        The single commit also writes whatever else is pending in the session,
+        such as the inventory and product rows of the purchase.
+        """
+        async with db as session:
+            sale_obj = self.model(**jsonable_encoder(obj_in))
+            session.add(sale_obj)
+            await session.flush()
+            sale_items = [
+                SaleItem(**{**jsonable_encoder(item_in), "sale_id": sale_obj.id})
+                for item_in in items_in
+            ]
+            session.add_all(sale_items)
+            await session.commit()
+            return sale_obj, sale_items
+
+    def _filter_sales_lines(
+        self,
+        stmt: Select,
+        *,
+        start_date: datetime,
+        end_date: datetime,
+        product_ids: list[int],
+        category_ids: list[int],
+    ) -> Select:
+        stmt = (
+            stmt.select_from(self.model)
+            .join(
+                SaleItem,
+                SaleItem.sale_id == self.model.id,
+            )
+            .join(
+                Product,
+                Product.id == SaleItem.product_id,
+            )
+            .join(Category, Category.id == Product.category_id)
+        )
+        stmt = stmt.filter(self.model.created_at.between(start_date, end_date))
+        if product_ids:
+            stmt = stmt.filter(SaleItem.product_id.in_(product_ids))
+        elif category_ids:
+            stmt = stmt.filter(Category.id.in_(category_ids))
+        return stmt
+
     async def get_sales_data(
         self,
         db: AsyncSession,
@@ -20,7 +91,7 @@ class CRUDSale(CRUDBase[Sale, SaleCreate, SaleUpdate]):
         start_date: datetime,
         end_date: datetime,
         product_ids: list[int],
-        category_ids: list[int]
+        category_ids: list[int],
     ) -> Iterable:
         async with db as session:
             stmt = select(
@@ -36,22 +107,62 @@ class CRUDSale(CRUDBase[Sale, SaleCreate, SaleUpdate]):
                 Category.category_name,
                 Category.category_slug,
             )
-            stmt = (
-                stmt.join(
-                    SaleItem,
-                    SaleItem.sale_id == self.model.id,
-                )
-                .join(
-                    Product,
-                    Product.id == SaleItem.product_id,
-                )
-                .join(Category, Category.id == Product.category_id)
+            stmt = self._filter_sales_lines(
+                stmt,
+                start_date=start_date,
+                end_date=end_date,
+                product_ids=product_ids,
+                category_ids=category_ids,
+            )
+
+            results = await session.execute(stmt)
+            return results.all()
+
+    async def get_sales_aggregates(
+        self,
+        db: AsyncSession,
+        *,
+        start_date: datetime,
+        end_date: datetime,
+        product_ids: list[int],
+        category_ids: list[int],
+        bucket: Optional[str] = None,
+    ) -> Iterable:
+        """
+        Quantity and revenue sold per product, and per ``bucket`` (daily,
+        weekly, monthly or yearly) when given, summed by the database.
+
+        Rows have the ``product_id``, ``product_name``, ``category_id``,
+        ``category_name`` and ``quantity`` columns of ``get_sales_data`` plus
+        ``revenue``; with a bucket, ``created_at`` is the start of the bucket.
+        """
+        async with db as session:
+            columns = [
+                SaleItem.product_id,
+                Product.product_name,
+                Product.category_id,
+                Category.category_name,
+            ]
+            group_by = list(columns)
+            order_by = [SaleItem.product_id]
+            if bucket:
+                bucket_start = _bucket_start(session.get_bind().dialect.name, bucket)
+                columns.insert(0, bucket_start.label("created_at"))
+                group_by.insert(0, bucket_start)
+                order_by.insert(0, bucket_start)
+            stmt = select(
+                *columns,
+                func.sum(SaleItem.quantity).label("quantity"),
+                func.sum(SaleItem.quantity * SaleItem.price_per_unit).label("revenue"),
+            )
+            stmt = self._filter_sales_lines(
+                stmt,
+                start_date=start_date,
+                end_date=end_date,
+                product_ids=product_ids,
+                category_ids=category_ids,
             )
-            stmt = stmt.filter(self.model.created_at.between(start_date, end_date))
-            if product_ids:
-                stmt = stmt.filter(SaleItem.product_id.in_(product_ids))
-            elif category_ids:
-                stmt = stmt.filter(Category.id.in_(category_ids))
+            stmt = stmt.group_by(*group_by).order_by(*order_by)
 
             results = await session.execute(stmt)
             return results.all()
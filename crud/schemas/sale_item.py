@@ -10,7 +10,8 @@ class SaleItemBase(BaseModel):
 
 
 class SaleItemCreate(SaleItemBase):
-    ...
+    # Set by crud.sale.create_with_items once the sale has an id
+    sale_id: int | None = None
 
 
 class SaleItemUpdate(SaleItemBase):
@@ -41,7 +41,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
         # Create the user, and hash the password
         obj_in = jsonable_encoder(obj_in)
-        obj_in["hashed_password"] = get_password_hash(obj_in.pop("password"))
+        obj_in["hashed_password"] = await get_password_hash(obj_in.pop("password"))
         # Commit the user to the database
         return await super().create(db, obj_in=obj_in)
 
@@ -66,11 +66,35 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             update_data = obj_in.model_dump(exclude_unset=True)
         # If the password is set, hash it
         if update_data.new_password:
-            hashed_password = get_password_hash(update_data.new_password)
+            hashed_password = await get_password_hash(update_data.new_password)
             update_data.hashed_password = hashed_password
 
         return super().update(db, db_obj=db_obj, obj_in=update_data)
 
+    async def update_password_hash(
+        self, db: AsyncSession, *, db_obj: User, hashed_password: str
+    ) -> User:
+        """Replace the stored password hash of a user.
+
+        Used to upgrade hashes made with outdated Argon2 parameters after a
+        successful login.
+
+        Args:
+            db (AsyncSession): SQLAlchemy session
+            db_obj (User): The user object
+            hashed_password (str): The new password hash
+
+        Returns:
+            User: The updated user object
+        """
+
+        async with db as session:
+            db_obj.hashed_password = hashed_password
+            session.add(db_obj)
+            await session.commit()
+            await session.refresh(db_obj)
+            return db_obj
+
     async def touch_last_login(self, db: AsyncSession, *, db_obj: User) -> User:
         """Update the last login time of a user.
 
@@ -3,6 +3,9 @@ import dotenv
 import logging
 from pydantic_settings import BaseSettings
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import timed_pool
 
 try:
     APPLICATION_SETTINGS_PATH: str = os.environ.get("APPLICATION_SETTINGS")
@@ -35,6 +38,13 @@ class JWTConfig(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
 
+class LoggingConfig(BaseSettings):
+    # Records waiting for the log writer thread; records beyond it are dropped.
+    LOG_QUEUE_SIZE: int = 10000
+    # Share of INFO and lower records written by the endpoint loggers.
+    LOG_INFO_SAMPLE_RATE: float = 1.0
+
+
 class Environment(BaseSettings):
     APP_ENVIRONMENT: str
 
@@ -48,12 +58,15 @@ class Configuration:
     PROD_DB_CONFIG: ProductionDBConfig = ProductionDBConfig()
 
     # SQLAlchemy Engines
+    # Timed pools report checkout waits as db_pool_wait_seconds on /metrics
     SQLALCHEMY_ENGINES: dict = {
         "development": create_async_engine(
             DEV_DB_CONFIG.DEV_CONN_STRING.format(
                 filename=DEV_DB_CONFIG.DEV_DB_SQLITE_FILENAME
             ),
             echo=False,
+            poolclass=timed_pool(AsyncAdaptedQueuePool),
+            pool_logging_name="legacy_development",
         ),
         "production": create_async_engine(
             PROD_DB_CONFIG.PROD_CONN_STRING.format(
@@ -64,6 +77,8 @@ class Configuration:
                 database=PROD_DB_CONFIG.POSTGRES_DB,
             ),
             echo=False,
+            poolclass=timed_pool(AsyncAdaptedQueuePool),
+            pool_logging_name="legacy_production",
         ),
     }
 
@@ -88,6 +103,7 @@ class Configuration:
     # Logging
     LOGS_DIR: str = ".logs"
     LOGGING_LEVEL: int = logging.WARNING
+    LOGGING_CONFIG: LoggingConfig = LoggingConfig()
 
     # API
     API_PREFIX: str = "ecommerce"
@@ -4,12 +4,23 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.api.routes import api_router
+from app.core.autocomplete import autocomplete, start_autocomplete
 from app.core.config import get_settings
-from app.core.exceptions import sqlalchemy_exception_handler, validation_exception_handler
-from app.core.middleware import RequestLoggingMiddleware
+from app.core.exceptions import (
+    query_budget_exception_handler,
+    sqlalchemy_exception_handler,
+    validation_exception_handler,
+)
+from app.core.metrics import instrument_engine, metrics_endpoint
+from app.core.middleware import RequestTimingMiddleware
+from app.core.query_budget import QueryBudgetExceeded
+from app.core.security import get_password_hasher
+from app.db.replicas import ReadYourWritesMiddleware
+from app.db.session import replicas, start_replica_checks
 
 settings = get_settings()
 
@@ -18,6 +29,24 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+logger = logging.getLogger(__name__)
+
+
+def instrument_legacy_engines() -> None:
+    """Export statement latency and pool gauges of the legacy engines on /metrics.
+
+    Their pool wait time is recorded by the timed pools of ``instance/config.py``.
+    """
+
+    try:
+        from instance.config import config as legacy_config
+    except (ImportError, ValidationError) as exc:
+        logger.info("Legacy engines not instrumented: %s", exc)
+        return
+    for name, engine in legacy_config.SQLALCHEMY_ENGINES.items():
+        instrument_engine(engine.sync_engine, f"legacy_{name}")
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     swagger_ui_parameters={
@@ -25,10 +54,20 @@ app = FastAPI(
     },
 )
 
+app.add_event_handler("startup", start_replica_checks)
+app.add_event_handler("startup", start_autocomplete)
+app.add_event_handler("startup", instrument_legacy_engines)
+app.add_event_handler("shutdown", autocomplete.stop)
+app.add_event_handler("shutdown", replicas.stop)
+app.add_event_handler("shutdown", get_password_hasher().shutdown)
+
 app.add_exception_handler(SQLAlchemyError, sqlalchemy_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
+app.add_exception_handler(QueryBudgetExceeded, query_budget_exception_handler)
 
-app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(RequestTimingMiddleware)
+# Outside the timing middleware, to see whether the request committed.
+app.add_middleware(ReadYourWritesMiddleware, replicas=replicas)
 
 security = HTTPBearer()
 
@@ -41,3 +80,4 @@ app.add_middleware(
 )
 
 app.include_router(api_router)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)